@@ -29,6 +29,14 @@ const attendanceSchema = new mongoose.Schema({
       required: true
     }
   }],
+  // Packed form written by the MCP server (ERP_ATTENDANCE_ENCODING=packed):
+  // one character per day of the month starting at attendanceStart
+  attendanceStart: {
+    type: Date
+  },
+  attendanceDays: {
+    type: String
+  },
   totalDays: {
     type: Number,
     default: 0
@@ -49,6 +57,26 @@ const attendanceSchema = new mongoose.Schema({
   timestamps: true
 });
 
+// Packed day codes: P = present, A = absent, D = do not mark, '-' = not marked
+const PACKED_STATUS = { P: 'P', A: 'A', D: 'DNM' };
+
+// Expand a packed month into the attendance list so readers see one shape
+function expandPackedAttendance(doc, ret) {
+  if (ret.attendanceDays) {
+    const start = new Date(ret.attendanceStart);
+    ret.attendance = [...ret.attendanceDays].flatMap((code, i) => PACKED_STATUS[code] ? [{
+      date: new Date(Date.UTC(start.getUTCFullYear(), start.getUTCMonth(), i + 1)),
+      status: PACKED_STATUS[code]
+    }] : []);
+    delete ret.attendanceStart;
+    delete ret.attendanceDays;
+  }
+  return ret;
+}
+
+attendanceSchema.set('toObject', { transform: expandPackedAttendance });
+attendanceSchema.set('toJSON', { transform: expandPackedAttendance });
+
 // Compound index for efficient queries
 attendanceSchema.index({ studentRoll: 1, month: 1, year: 1 }, { unique: true });
 
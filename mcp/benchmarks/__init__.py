@@ -0,0 +1,6 @@
+"""
+Benchmarks for the ERP MCP server.
+
+Run from the mcp/ directory against a local, disposable mongod, e.g.:
+    python -m benchmarks.bench_student_loader
+"""
@@ -0,0 +1,34 @@
+"""
+Round-trip and latency benchmark for the overview entry points that share
+get_erp_counts: get_erp_analytics, get_executive_summary and erp://dashboard.
+"""
+
+import asyncio
+import time
+
+import server
+from benchmarks.common import connect
+
+RUNS = 20
+
+
+async def main():
+    client, db, counter = connect()
+    entry_points = [
+        ("get_erp_analytics", lambda: server.get_erp_analytics({})),
+        ("get_executive_summary", lambda: server.get_executive_summary({})),
+        ("erp://dashboard", lambda: server.handle_read_resource("erp://dashboard")),
+    ]
+    print(f"{'entry point':>24} {'round-trips':>12} {'mean ms':>10}")
+    for name, call in entry_points:
+        counter.reset()
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            await call()
+        elapsed = (time.perf_counter() - start) * 1000 / RUNS
+        print(f"{name:>24} {counter.count / RUNS:>12.1f} {elapsed:>10.2f}")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
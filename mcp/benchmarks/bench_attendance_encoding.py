@@ -0,0 +1,118 @@
+"""
+Storage and transfer benchmark for the compact attendance encoding on a year
+of data: collection and index sizes, bytes read from MongoDB by get_attendance
+for every student, and percentage computation over the expanded list versus
+the packed string. The migration is run to packed and back, and the decoded
+documents are checked to be unchanged.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+import bson
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+import server
+from benchmarks.common import BENCH_DATABASE, BENCH_MONGODB_URI, bind_server
+from benchmarks.datagen import _attendance, _insert
+
+
+class ReplyBytes(monitoring.CommandListener):
+    """Sum the BSON size of find/getMore replies (bytes over the wire from MongoDB)"""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        if event.command_name in ("find", "getMore"):
+            self.bytes += len(bson.encode(event.reply))
+
+    def failed(self, event):
+        pass
+
+
+async def sizes(db):
+    stats = await db.command("collStats", "attendances")
+    return {
+        "documents": stats["count"],
+        "data_mb": stats["size"] / 1e6,
+        "avg_doc_bytes": stats.get("avgObjSize", 0),
+        "storage_mb": stats["storageSize"] / 1e6,
+        "index_mb": stats["totalIndexSize"] / 1e6,
+    }
+
+
+async def read_all(rolls, listener):
+    listener.bytes = 0
+    start = time.perf_counter()
+    decoded = []
+    for roll in rolls:
+        result = await server.get_attendance({"student_roll": roll, "limit": 12})
+        decoded.append(json.loads(result[0].text))
+    return decoded, listener.bytes, (time.perf_counter() - start) * 1000
+
+
+def percentage_timing(docs):
+    start = time.perf_counter()
+    for doc in docs:
+        present = sum(1 for r in doc["attendance"] if r["status"] == "P")
+        round(present / len(doc["attendance"]) * 100, 2)
+    expanded = (time.perf_counter() - start) * 1000
+    packed_days = [server.pack_attendance(doc["attendance"])[1] for doc in docs]
+    start = time.perf_counter()
+    for days in packed_days:
+        server.packed_counts(days)
+    return expanded, (time.perf_counter() - start) * 1000
+
+
+def report(label, stats, wire_bytes, elapsed):
+    print(f"{label:>9} {stats['documents']:>9} {stats['avg_doc_bytes']:>9.0f} {stats['data_mb']:>9.2f} "
+          f"{stats['storage_mb']:>10.2f} {stats['index_mb']:>9.2f} {wire_bytes / 1e6:>9.2f} {elapsed:>9.0f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=2000)
+    args = parser.parse_args()
+
+    listener = ReplyBytes()
+    client = AsyncIOMotorClient(BENCH_MONGODB_URI, event_listeners=[listener])
+    db = client[BENCH_DATABASE]
+    bind_server(db)
+
+    await db.attendances.drop()
+    students = [{"_id": ObjectId(), "roll": 100000 + i} for i in range(args.students)]
+    await _insert(db.attendances, _attendance(students, 12, 2025, datetime(2025, 1, 1)))
+    await db.attendances.create_indexes(server.INDEX_REGISTRY["attendances"])
+    rolls = [s["roll"] for s in students]
+
+    sample = await db.attendances.find().limit(10_000).to_list(length=None)
+    expanded_ms, packed_ms = percentage_timing(sample)
+    print(f"percentage over {len(sample)} months: expanded {expanded_ms:.1f} ms, packed {packed_ms:.1f} ms")
+
+    print(f"{'form':>9} {'docs':>9} {'avg B':>9} {'data MB':>9} {'storage MB':>10} {'index MB':>9} "
+          f"{'wire MB':>9} {'read ms':>9}")
+    expanded, wire, elapsed = await read_all(rolls, listener)
+    report("expanded", await sizes(db), wire, elapsed)
+
+    await server.migrate_attendance_encoding({"to": "packed"})
+    await db.command("compact", "attendances")
+    packed, wire, elapsed = await read_all(rolls, listener)
+    report("packed", await sizes(db), wire, elapsed)
+
+    await server.migrate_attendance_encoding({"to": "expanded"})
+    restored, _, _ = await read_all(rolls, listener)
+    print(f"decoded responses identical: {expanded == packed}, migration reversible: {expanded == restored}")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,63 @@
+"""
+Class attendance benchmark: marking one day for a section with one
+mark_attendance_day call per student versus a single record_class_attendance
+call (one student lookup, one pre-read and one unordered bulk_write).
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import server
+from benchmarks.common import connect
+
+SIZES = [60, 120, 500]
+DATES = ["2025-01-06", "2025-01-07", "2025-01-08"]
+
+
+async def seed(db, n: int):
+    await db.students.drop()
+    await db.attendances.drop()
+    now = datetime.now()
+    await db.students.insert_many([
+        {"roll": 1000 + i, "fullName": f"Student {i}", "email": f"s{i}@bench.test",
+         "phone": "0000000000", "isActive": True, "createdAt": now, "updatedAt": now}
+        for i in range(n)
+    ])
+    await db.attendances.create_index([("studentRoll", 1), ("month", 1), ("year", 1)], unique=True)
+
+
+def _records(n: int):
+    return [{"roll": 1000 + i, "status": "A" if i % 7 == 0 else "P"} for i in range(n)]
+
+
+async def per_student(date: str, records):
+    for record in records:
+        await server.mark_attendance_day({"student_roll": record["roll"], "date": date, "status": record["status"]})
+
+
+async def whole_class(date: str, records):
+    await server.record_class_attendance({"date": date, "records": records})
+
+
+async def main():
+    client, db, counter = connect()
+    print(f"{'students':>8} {'mode':>12} {'round-trips':>12} {'ms':>10}")
+    for n in SIZES:
+        records = _records(n)
+        for mode, fn in (("per-student", per_student), ("class", whole_class)):
+            await seed(db, n)
+            # First date creates the month documents, later dates append a day
+            for date in DATES:
+                counter.reset()
+                start = time.perf_counter()
+                await fn(date, records)
+                elapsed = (time.perf_counter() - start) * 1000
+            marked = await db.attendances.count_documents({"totalDays": len(DATES)})
+            assert marked == n, (mode, marked)
+            print(f"{n:>8} {mode:>12} {counter.count:>12} {elapsed:>10.1f}")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+"""
+Latency benchmark for student search: unanchored case-insensitive $regex
+(the default path) versus the text-index path of search_students.
+"""
+
+import asyncio
+import random
+from datetime import datetime
+
+import server
+from benchmarks.common import connect, percentile, timed
+
+STUDENTS = 100_000
+RUNS = 30
+FIRST_NAMES = ["Aarav", "Diya", "Ishaan", "Meera", "Rohan", "Sara", "Vikram", "Zoya", "Kabir", "Anika"]
+LAST_NAMES = ["Sharma", "Iyer", "Khan", "Reddy", "Das", "Menon", "Patel", "Singh", "Nair", "Gupta"]
+
+
+async def seed(db):
+    await db.students.drop()
+    rng = random.Random(42)
+    now = datetime.now()
+    batch = []
+    for i in range(STUDENTS):
+        batch.append({
+            "roll": 100000 + i,
+            "fullName": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}",
+            "email": f"student{i}@bench.test",
+            "phone": "0000000000",
+            "isActive": True,
+            "createdAt": now,
+            "updatedAt": now,
+        })
+        if len(batch) == 10_000:
+            await db.students.insert_many(batch)
+            batch = []
+    if batch:
+        await db.students.insert_many(batch)
+    await server.ensure_indexes()
+
+
+async def main():
+    client, db, counter = connect()
+    await seed(db)
+    print(f"{'query':>10} {'mode':>6} {'p50 ms':>9} {'p95 ms':>9}")
+    # Common names match early in a regex scan; a unique suffix forces a full scan
+    for term in ("Meera", "Reddy", "99999"):
+        for mode, args in (("regex", {"name": term, "limit": 20}), ("text", {"text": term, "limit": 20})):
+            samples = []
+            for _ in range(RUNS):
+                with timed(samples):
+                    await server.search_students(args)
+            print(f"{term:>10} {mode:>6} {percentile(samples, 50):>9.2f} {percentile(samples, 95):>9.2f}")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+"""
+Throughput benchmark for response serialization on a 10k-document payload:
+json.dumps(default=str) (the previous approach) versus to_json on its
+stdlib and orjson paths. Needs no database.
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+import server
+
+DOCUMENTS = 10_000
+RUNS = 5
+
+
+def make_payload():
+    start = datetime(2025, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "student": ObjectId(),
+            "studentRoll": 1000 + i,
+            "month": "January 2025",
+            "year": 2025,
+            "attendance": [
+                {"date": start + timedelta(days=d), "status": "P" if (i + d) % 5 else "A"}
+                for d in range(22)
+            ],
+            "totalDays": 22,
+            "presentDays": 18,
+            "absentDays": 4,
+            "attendancePercentage": 81.82,
+            "createdAt": start,
+            "updatedAt": start,
+        }
+        for i in range(DOCUMENTS)
+    ]
+
+
+def measure(label, fn, payload):
+    best = float("inf")
+    size = 0
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        size = len(fn(payload))
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:>28} {best * 1000:>9.1f} ms {DOCUMENTS / best:>12,.0f} docs/s {size / 1e6:>8.2f} MB")
+
+
+def main():
+    payload = make_payload()
+    measure("json.dumps(default=str)", lambda p: json.dumps(p, default=str), payload)
+    measure("json.dumps(indent=2)", lambda p: json.dumps(p, indent=2, default=str), payload)
+    orjson = server.orjson
+    server.orjson = None
+    measure("to_json (stdlib)", server.to_json, payload)
+    server.orjson = orjson
+    if orjson is not None:
+        measure("to_json (orjson)", server.to_json, payload)
+    else:
+        print("orjson not installed; skipping the orjson path")
+
+
+if __name__ == "__main__":
+    main()
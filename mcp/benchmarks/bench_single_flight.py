@@ -0,0 +1,56 @@
+"""
+Single-flight benchmark: a burst of identical concurrent reads (the calls a
+dashboard session fires at once) with coalescing off versus on. With it on,
+DB round-trips per burst should stay flat as the fan-out grows; the leaders
+and joined columns show how many calls computed and how many shared a result.
+"""
+
+import asyncio
+import time
+
+import server
+from benchmarks.common import connect
+from benchmarks.datagen import generate
+
+STUDENTS = 10_000
+FAN_OUTS = [1, 10, 50]
+
+# One session's opening burst
+BURST = [
+    ("tool", "get_executive_summary", {}),
+    ("resource", "erp://dashboard", None),
+    ("tool", "get_pending_actions", {}),
+    ("tool", "get_weekly_timetable", {"semester": 3}),
+]
+
+
+async def _call(kind: str, name: str, args):
+    if kind == "tool":
+        return await server.handle_call_tool(name, args)
+    return await server.handle_read_resource(name)
+
+
+async def burst(fan_out: int):
+    await asyncio.gather(*(_call(*call) for call in BURST for _ in range(fan_out)))
+
+
+async def main():
+    client, db, counter = connect()
+    await generate(db, STUDENTS)
+    print(f"{'fan-out':>7} {'coalescing':>10} {'round-trips':>12} {'leaders':>8} {'joined':>7} {'ms':>10}")
+    for fan_out in FAN_OUTS:
+        for enabled in (False, True):
+            server.single_flight.enabled = enabled
+            await burst(1)  # warm the pool and dashboard state
+            counter.reset()
+            server.single_flight.leaders = server.single_flight.joined = 0
+            start = time.perf_counter()
+            await burst(fan_out)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{fan_out:>7} {'on' if enabled else 'off':>10} {counter.count:>12} "
+                  f"{server.single_flight.leaders:>8} {server.single_flight.joined:>7} {elapsed:>10.1f}")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""
+Round-trip benchmark for student enrichment: one find_one per record (the
+previous behaviour) versus StudentLoader's single batched $in query.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import server
+from benchmarks.common import connect
+
+SIZES = [10, 100, 1000]
+
+
+async def seed(db, n: int):
+    await db.students.drop()
+    await db.attendances.drop()
+    now = datetime.now()
+    await db.students.insert_many([
+        {"roll": 1000 + i, "fullName": f"Student {i}", "email": f"s{i}@bench.test",
+         "phone": "0000000000", "isActive": True, "createdAt": now, "updatedAt": now}
+        for i in range(n)
+    ])
+    await db.attendances.insert_many([
+        {"studentRoll": 1000 + i, "month": "January 2025", "year": 2025,
+         "attendance": [], "totalDays": 20, "presentDays": 10, "absentDays": 10,
+         "attendancePercentage": 50.0}
+        for i in range(n)
+    ])
+
+
+async def naive(records):
+    names = {}
+    for r in records:
+        student = await server.students_collection.find_one({"roll": r["studentRoll"]})
+        if student:
+            names[r["studentRoll"]] = student["fullName"]
+    return names
+
+
+async def batched(records):
+    students = await server.StudentLoader(server.STUDENT_NAME_PROJECTION).load_many(
+        r["studentRoll"] for r in records
+    )
+    return {roll: s["fullName"] for roll, s in students.items()}
+
+
+async def main():
+    client, db, counter = connect()
+    print(f"{'records':>8} {'mode':>8} {'round-trips':>12} {'ms':>10}")
+    for n in SIZES:
+        await seed(db, n)
+        records = await db.attendances.find().to_list(length=None)
+        for mode, fn in (("naive", naive), ("batched", batched)):
+            counter.reset()
+            start = time.perf_counter()
+            names = await fn(records)
+            elapsed = (time.perf_counter() - start) * 1000
+            assert len(names) == n
+            print(f"{n:>8} {mode:>8} {counter.count:>12} {elapsed:>10.1f}")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,181 @@
+"""
+Transport benchmark: N MCP clients each served by their own stdio server
+process versus the same N clients sharing one streamable HTTP server
+(one process, one connection pool, one set of caches).
+
+Reports time until every client has finished initialize, total wall time,
+call latency percentiles and the MongoDB connections open while every
+session is still connected.
+
+    python -m benchmarks.bench_transport --clients 1,8,32 --calls 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import List
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+from benchmarks.common import BENCH_DATABASE, BENCH_MONGODB_URI, connect, percentile
+from benchmarks.datagen import generate
+
+SERVER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server.py")
+PORT = 8765
+
+# The read mix each client issues, round-robin
+CALLS = [
+    ("tool", "get_erp_analytics", {}),
+    ("tool", "get_students_at_risk", {"threshold": 75}),
+    ("resource", "erp://dashboard", None),
+    ("tool", "get_pending_actions", {"include_leave_details": False}),
+]
+
+
+def _bench_config() -> str:
+    """Write a config.json pointing the server at the bench database"""
+    with open(os.path.join(os.path.dirname(SERVER_PATH), "config.json")) as f:
+        config = json.load(f)
+    config["mongodb"] = {**config.get("mongodb", {}), "uri": BENCH_MONGODB_URI, "database": BENCH_DATABASE}
+    handle, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(handle, "w") as f:
+        json.dump(config, f)
+    return path
+
+
+async def _session_calls(session: ClientSession, calls: int, latencies: List[float]):
+    for i in range(calls):
+        kind, name, args = CALLS[i % len(CALLS)]
+        start = time.perf_counter()
+        if kind == "tool":
+            await session.call_tool(name, args)
+        else:
+            await session.read_resource(name)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def _run_clients(open_session, clients: int, calls: int, db):
+    """Run clients concurrently; returns (ms until all initialized, ms until all calls
+    finished, latencies, MongoDB connections open while every session was still alive)"""
+    latencies: List[float] = []
+    ready, finished, release = asyncio.Event(), asyncio.Event(), asyncio.Event()
+    initialized, done = [], []
+    start = time.perf_counter()
+
+    async def client():
+        async with open_session() as session:
+            await session.initialize()
+            initialized.append(time.perf_counter())
+            if len(initialized) == clients:
+                ready.set()
+            await ready.wait()
+            await _session_calls(session, calls, latencies)
+            done.append(time.perf_counter())
+            if len(done) == clients:
+                finished.set()
+            await release.wait()
+
+    async def sample():
+        await finished.wait()
+        try:
+            return await _connections(db)
+        finally:
+            release.set()
+
+    *_, connections = await asyncio.gather(*(client() for _ in range(clients)), sample())
+    return (max(initialized) - start) * 1000, (max(done) - start) * 1000, latencies, connections
+
+
+def _stdio_session(env):
+    @asynccontextmanager
+    async def open_session():
+        params = StdioServerParameters(command=sys.executable, args=[SERVER_PATH], env=env)
+        async with stdio_client(params) as (read, write):
+            async with ClientSession(read, write) as session:
+                yield session
+    return open_session
+
+
+def _http_session():
+    @asynccontextmanager
+    async def open_session():
+        async with streamablehttp_client(f"http://127.0.0.1:{PORT}/mcp") as (read, write, _):
+            async with ClientSession(read, write) as session:
+                yield session
+    return open_session
+
+
+async def _wait_for_port(port: int, timeout: float = 30.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def _connections(db) -> int:
+    status = await db.client.admin.command("serverStatus")
+    return status["connections"]["current"]
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", default="1,8,32", help="Comma-separated client counts")
+    parser.add_argument("--calls", type=int, default=20, help="Calls per client")
+    parser.add_argument("--workers", type=int, default=1, help="HTTP server worker processes")
+    parser.add_argument("--students", type=int, default=1_000)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse data already in the bench database")
+    args = parser.parse_args(argv)
+
+    client, db, _ = connect()
+    if not args.skip_seed:
+        await generate(db, args.students)
+    config_path = _bench_config()
+    env = {**os.environ, "ERP_CONFIG": config_path}
+
+    print(f"{'clients':>7} {'transport':>9} {'ready ms':>9} {'total ms':>9} {'calls/s':>8} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'db conns':>8}")
+    try:
+        for clients in [int(n) for n in args.clients.split(",")]:
+            for transport in ("stdio", "http"):
+                process = None
+                if transport == "http":
+                    process = await asyncio.create_subprocess_exec(
+                        sys.executable, SERVER_PATH, "--transport", "http", "--port", str(PORT),
+                        "--workers", str(args.workers), env=env,
+                        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+                    )
+                    await _wait_for_port(PORT)
+                    open_session = _http_session()
+                else:
+                    open_session = _stdio_session(env)
+                try:
+                    ready_ms, total_ms, latencies, connections = await _run_clients(
+                        open_session, clients, args.calls, db
+                    )
+                finally:
+                    if process is not None:
+                        process.terminate()
+                        await process.wait()
+                print(f"{clients:>7} {transport:>9} {ready_ms:>9.0f} {total_ms:>9.0f} "
+                      f"{len(latencies) / total_ms * 1000:>8.1f} {percentile(latencies, 50):>7.1f} "
+                      f"{percentile(latencies, 95):>7.1f} {connections:>8}")
+    finally:
+        os.unlink(config_path)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""
+Shared helpers for benchmarks: a dedicated bench database, DB round-trip
+counting via pymongo command monitoring, and timing utilities.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+import server
+
+BENCH_MONGODB_URI = os.getenv("BENCH_MONGODB_URI", "mongodb://localhost:27017")
+BENCH_DATABASE = os.getenv("BENCH_DATABASE", "erp_bench")
+
+# Commands issued by the driver itself rather than by tool code
+_DRIVER_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue"}
+
+
+class RoundTripCounter(monitoring.CommandListener):
+    """Count database commands (round-trips) issued through a client"""
+
+    def __init__(self):
+        self.count = 0
+        self.by_command: Dict[str, int] = {}
+
+    def started(self, event):
+        if event.command_name in _DRIVER_COMMANDS:
+            return
+        self.count += 1
+        self.by_command[event.command_name] = self.by_command.get(event.command_name, 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def reset(self):
+        self.count = 0
+        self.by_command = {}
+
+
+def connect():
+    """Create a bench client/database and point server.py's collections at it"""
+    counter = RoundTripCounter()
+    client = AsyncIOMotorClient(BENCH_MONGODB_URI, event_listeners=[counter])
+    db = client[BENCH_DATABASE]
+    bind_server(db)
+    return client, db, counter
+
+
+def bind_server(db):
+    """Rebind the database and collection globals in server.py to the given database"""
+    server.db = db
+    server.students_collection = db.students
+    server.faculty_collection = db.faculties
+    server.courses_collection = db.courses
+    server.attendance_collection = db.attendances
+    server.leave_requests_collection = db.leaverequests
+    server.timetables_collection = db.timetables
+
+
+@contextmanager
+def timed(results: List[float]):
+    """Append the elapsed wall time (ms) of the block to results"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        results.append((time.perf_counter() - start) * 1000)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
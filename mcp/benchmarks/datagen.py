@@ -0,0 +1,238 @@
+"""
+Deterministic synthetic ERP data generator.
+
+Produces students, faculty, courses, monthly attendance, leave requests and
+timetables shaped like the documents server.py writes. Documents are
+generated and inserted in batches so memory stays flat at every scale.
+"""
+
+import calendar
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+SCALES = {
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+FIRST_NAMES = ["Aarav", "Diya", "Ishaan", "Meera", "Rohan", "Sara", "Vikram", "Zoya", "Kabir", "Anika",
+               "Arjun", "Nila", "Dev", "Priya", "Kiran", "Tara", "Rahul", "Asha", "Neil", "Lakshmi"]
+LAST_NAMES = ["Sharma", "Iyer", "Khan", "Reddy", "Das", "Menon", "Patel", "Singh", "Nair", "Gupta"]
+SUBJECTS = ["Mathematics", "Physics", "Chemistry", "Data Structures", "Algorithms", "Databases",
+            "Operating Systems", "Networks", "Statistics", "Machine Learning", "Compilers", "Economics"]
+DESIGNATIONS = ["Professor", "Associate Professor", "Assistant Professor", "Lecturer"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+SEMESTERS = 8
+PERIODS = 8
+BATCH_SIZE = 5_000
+
+
+def sizes(students: int) -> Dict[str, int]:
+    """Collection sizes derived from the student count"""
+    return {
+        "students": students,
+        "faculty": max(10, students // 20),
+        "courses": max(SEMESTERS * 5, students // 50),
+        "leaves": students // 3,
+    }
+
+
+def _batched(docs: Iterator[Dict[str, Any]], size: int = BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _students(n: int, now: datetime) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(1)
+    for i in range(n):
+        yield {
+            "roll": 100000 + i,
+            "fullName": f"{_name(rng)} {i}",
+            "email": f"student{i}@bench.test",
+            "phone": f"9{i:09d}",
+            "semester": i % SEMESTERS + 1,
+            "isActive": rng.random() > 0.03,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+
+
+def _faculty(n: int, now: datetime) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(2)
+    for i in range(n):
+        yield {
+            "employeeId": f"EMP{i:06d}",
+            "fullName": f"Dr. {_name(rng)} {i}",
+            "email": f"faculty{i}@bench.test",
+            "designation": rng.choice(DESIGNATIONS),
+            "subjectsHandled": rng.sample(SUBJECTS, rng.randint(1, 3)),
+            "isActive": rng.random() > 0.05,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+
+
+def _courses(n: int, faculty_ids: List[Any], now: datetime) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(3)
+    for i in range(n):
+        subject = SUBJECTS[i % len(SUBJECTS)]
+        yield {
+            "code": f"C{i:05d}",
+            "title": f"{subject} {i // len(SUBJECTS) + 1}",
+            "credits": rng.choice([2, 3, 4]),
+            "semester": i % SEMESTERS + 1,
+            "description": f"Synthetic {subject} course",
+            "facultyInCharge": rng.choice(faculty_ids) if rng.random() > 0.1 else None,
+            "isActive": rng.random() > 0.05,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+
+
+def _attendance(students: List[Dict[str, Any]], months: int, year: int, now: datetime) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(4)
+    for student in students:
+        # Each student has a stable propensity; roughly 15% fall below 75%
+        propensity = rng.uniform(0.55, 0.75) if rng.random() < 0.15 else rng.uniform(0.78, 0.99)
+        for month in range(1, months + 1):
+            days = [
+                datetime(year, month, day)
+                for day in range(1, calendar.monthrange(year, month)[1] + 1)
+                if datetime(year, month, day).weekday() < 5
+            ]
+            records = []
+            for day in days:
+                roll = rng.random()
+                status = "P" if roll < propensity else ("DNM" if roll > 0.98 else "A")
+                records.append({"date": day, "status": status})
+            present = sum(1 for r in records if r["status"] == "P")
+            absent = sum(1 for r in records if r["status"] == "A")
+            yield {
+                "student": student["_id"],
+                "studentRoll": student["roll"],
+                "month": f"{calendar.month_name[month]} {year}",
+                "year": year,
+                "attendance": records,
+                "totalDays": len(records),
+                "presentDays": present,
+                "absentDays": absent,
+                "attendancePercentage": round(present / len(records) * 100, 2),
+                "createdAt": now,
+                "updatedAt": now,
+            }
+
+
+def _leaves(n: int, students: List[Dict[str, Any]], faculty_ids: List[Any], year: int,
+            now: datetime) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(5)
+    for _ in range(n):
+        student = rng.choice(students)
+        start = datetime(year, 1, 1) + timedelta(days=rng.randrange(365))
+        days = rng.randint(1, 5)
+        status = rng.choices(["pending", "approved", "rejected"], weights=[2, 6, 2])[0]
+        leave = {
+            "student": student["_id"],
+            "studentRoll": student["roll"],
+            "startDate": start,
+            "endDate": start + timedelta(days=days - 1),
+            "reason": rng.choice(["Medical", "Family event", "Competition", "Personal"]),
+            "comments": "",
+            "totalDays": days,
+            "status": status,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        if status != "pending":
+            leave["handledBy"] = rng.choice(faculty_ids)
+            leave["handledAt"] = now
+        yield leave
+
+
+def _timetables(courses: List[Dict[str, Any]], now: datetime) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(6)
+    by_semester: Dict[int, List[Dict[str, Any]]] = {}
+    for course in courses:
+        by_semester.setdefault(course["semester"], []).append(course)
+    for semester in range(1, SEMESTERS + 1):
+        semester_courses = by_semester.get(semester, [])
+        for day in DAYS:
+            slots = []
+            for period in range(1, PERIODS + 1):
+                if period == 4 or not semester_courses:
+                    slots.append({"period": period, "type": "break", "courseCode": "BREAK", "room": None})
+                    continue
+                course = rng.choice(semester_courses)
+                slot = {
+                    "period": period,
+                    "type": rng.choices(["lecture", "lab", "tutorial"], weights=[6, 2, 2])[0],
+                    "courseCode": course["code"],
+                    "course": course["_id"],
+                    "room": f"R{semester}{rng.randint(1, 4):02d}",
+                }
+                if course.get("facultyInCharge"):
+                    slot["faculty"] = course["facultyInCharge"]
+                slots.append(slot)
+            yield {
+                "dayOfWeek": day,
+                "semester": semester,
+                "slots": slots,
+                "isActive": True,
+                "createdAt": now,
+                "updatedAt": now,
+            }
+
+
+async def _insert(collection, docs: Iterator[Dict[str, Any]]) -> int:
+    count = 0
+    for batch in _batched(docs):
+        await collection.insert_many(batch, ordered=False)
+        count += len(batch)
+    return count
+
+
+async def generate(db, students: int, months: int = 6, year: int = 2025) -> Dict[str, int]:
+    """Drop and regenerate every ERP collection in db; returns document counts"""
+    now = datetime(year, 1, 1)
+    n = sizes(students)
+    for name in ("students", "faculties", "courses", "attendances", "leaverequests", "timetables"):
+        await db[name].drop()
+
+    counts = {
+        "students": await _insert(db.students, _students(n["students"], now)),
+        "faculties": await _insert(db.faculties, _faculty(n["faculty"], now)),
+    }
+    faculty_ids = [f["_id"] async for f in db.faculties.find({}, {"_id": 1})]
+    counts["courses"] = await _insert(db.courses, _courses(n["courses"], faculty_ids, now))
+    courses = await db.courses.find({}, {"code": 1, "semester": 1, "facultyInCharge": 1}).to_list(length=None)
+    counts["timetables"] = await _insert(db.timetables, _timetables(courses, now))
+
+    # Attendance and leaves need student ids; walk students in batches
+    # (keeping an evenly spaced sample of students for leave requests)
+    counts["attendances"] = 0
+    sample_every = max(1, students // 10_000)
+    student_sample = []
+    batch = []
+    async for student in db.students.find({}, {"roll": 1}).sort("_id", 1):
+        batch.append(student)
+        if student["roll"] % sample_every == 0:
+            student_sample.append(student)
+        if len(batch) == BATCH_SIZE:
+            counts["attendances"] += await _insert(db.attendances, _attendance(batch, months, year, now))
+            batch = []
+    if batch:
+        counts["attendances"] += await _insert(db.attendances, _attendance(batch, months, year, now))
+    counts["leaverequests"] = await _insert(db.leaverequests, _leaves(n["leaves"], student_sample, faculty_ids, year, now))
+    return counts
@@ -0,0 +1,259 @@
+"""
+Benchmark every tool dispatched by handle_call_tool and every resource served
+by handle_read_resource against synthetic data in a local mongod.
+
+    python -m benchmarks.run_suite --scale 10k --runs 50
+    python -m benchmarks.run_suite --scale 10k --skip-seed --only get_student,erp://dashboard
+
+Reports p50/p95/p99 latency and DB round-trips per call, and writes the
+results as JSON (benchmarks/results/ by default) so runs can be compared.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import pymongo
+from pydantic import AnyUrl
+
+import server
+from benchmarks.common import BENCH_DATABASE, connect, percentile
+from benchmarks.datagen import SCALES, generate
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class Fixtures:
+    """Ids sampled from the seeded data, used to build realistic arguments"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.rolls: List[int] = []
+        self.student_ids: List[str] = []
+        self.employee_ids: List[str] = []
+        self.faculty_ids: List[str] = []
+        self.course_codes: List[str] = []
+        self.course_ids: List[str] = []
+        self.leave_ids: List[str] = []
+        self.sequence = 0
+
+    async def load(self, db):
+        students = await db.students.aggregate([{"$sample": {"size": 500}}, {"$project": {"roll": 1}}]).to_list(None)
+        self.rolls = [s["roll"] for s in students]
+        self.student_ids = [str(s["_id"]) for s in students]
+        faculty = await db.faculties.find({}, {"employeeId": 1}).limit(200).to_list(None)
+        self.employee_ids = [f["employeeId"] for f in faculty]
+        self.faculty_ids = [str(f["_id"]) for f in faculty]
+        courses = await db.courses.find({}, {"code": 1}).limit(200).to_list(None)
+        self.course_codes = [c["code"] for c in courses]
+        self.course_ids = [str(c["_id"]) for c in courses]
+        leaves = await db.leaverequests.find({}, {"_id": 1}).limit(500).to_list(None)
+        self.leave_ids = [str(l["_id"]) for l in leaves]
+
+    def pick(self, values: List[Any]) -> Any:
+        return self.rng.choice(values)
+
+    def next_id(self) -> int:
+        """A fresh number for records created by write tools"""
+        self.sequence += 1
+        return 9_000_000 + self.sequence * 1000 + self.rng.randrange(1000)
+
+
+def tool_cases(fx: Fixtures) -> Dict[str, Callable[[], Dict[str, Any]]]:
+    """Argument factories keyed by benchmark case; the tool name precedes any ':'"""
+    def attendance_days():
+        return [{"date": f"2025-07-{day:02d}", "status": fx.rng.choice("PPPPA")} for day in range(1, 23)]
+
+    def slots():
+        return [
+            {"period": p, "type": "lecture", "courseCode": fx.pick(fx.course_codes),
+             "faculty": fx.pick(fx.faculty_ids), "room": f"B{fx.rng.randint(1, 99)}"}
+            for p in range(1, 5)
+        ]
+
+    return {
+        "get_student": lambda: {"roll": fx.pick(fx.rolls)},
+        "create_student": lambda: (lambda n: {"roll": n, "fullName": f"Bench {n}", "email": f"b{n}@bench.test", "phone": "1"})(fx.next_id()),
+        "update_student": lambda: {"student_id": fx.pick(fx.student_ids), "phone": str(fx.rng.randrange(10**9))},
+        "delete_student": lambda: {"student_id": fx.pick(fx.student_ids)},
+        "search_students": lambda: {"name": fx.rng.choice(["Meera", "Rohan", "Iyer"]), "limit": 20},
+        "search_students:text": lambda: {"text": fx.rng.choice(["Meera", "Rohan", "Iyer"]), "limit": 20},
+        "get_faculty": lambda: {"employee_id": fx.pick(fx.employee_ids)},
+        "create_faculty": lambda: (lambda n: {"employeeId": f"B{n}", "fullName": f"Bench {n}", "email": f"f{n}@bench.test", "designation": "Lecturer"})(fx.next_id()),
+        "update_faculty": lambda: {"faculty_id": fx.pick(fx.faculty_ids), "designation": "Professor"},
+        "delete_faculty": lambda: {"faculty_id": fx.pick(fx.faculty_ids)},
+        "get_course": lambda: {"code": fx.pick(fx.course_codes)},
+        "create_course": lambda: (lambda n: {"code": f"B{n}", "title": "Bench", "credits": 3, "semester": 1})(fx.next_id()),
+        "update_course": lambda: {"course_id": fx.pick(fx.course_ids), "credits": 4},
+        "delete_course": lambda: {"course_id": fx.pick(fx.course_ids)},
+        "record_attendance": lambda: {"student_roll": fx.pick(fx.rolls), "month": "July 2025", "year": 2025, "attendance_data": attendance_days()},
+        "mark_attendance_day": lambda: {"student_roll": fx.pick(fx.rolls), "date": f"2025-07-{fx.rng.randint(1, 28):02d}", "status": fx.rng.choice("PPPPA")},
+        "record_class_attendance": lambda: {"date": f"2025-07-{fx.rng.randint(1, 28):02d}", "records": [
+            {"roll": roll, "status": fx.rng.choice("PPPPA")} for roll in fx.rng.sample(fx.rolls, 60)
+        ]},
+        "get_attendance": lambda: {"student_roll": fx.pick(fx.rolls)},
+        "calculate_attendance_stats": lambda: {"student_roll": fx.pick(fx.rolls)},
+        "calculate_attendance_stats:all": lambda: {"month": "March 2025", "year": 2025},
+        "create_leave_request": lambda: {"student_roll": fx.pick(fx.rolls), "start_date": "2025-08-04", "end_date": "2025-08-05", "reason": "Bench"},
+        "update_leave_request": lambda: {"leave_id": fx.pick(fx.leave_ids), "status": fx.rng.choice(["approved", "rejected"]), "handled_by": fx.pick(fx.faculty_ids)},
+        "get_leave_requests": lambda: {"status": "pending", "limit": 100},
+        "create_timetable": lambda: {"dayOfWeek": "Sunday", "semester": fx.rng.randint(1, 8), "slots": slots()},
+        "get_timetable": lambda: {"dayOfWeek": fx.rng.choice(["Monday", "Tuesday", "Friday"]), "semester": fx.rng.randint(1, 8)},
+        "get_weekly_timetable": lambda: {"semester": fx.rng.randint(1, 8)},
+        "get_erp_analytics": lambda: {},
+        "complex_query:students_with_low_attendance": lambda: {"query_type": "students_with_low_attendance"},
+        "complex_query:faculty_workload": lambda: {"query_type": "faculty_workload"},
+        "complex_query:course_enrollment_stats": lambda: {"query_type": "course_enrollment_stats"},
+        "complex_query:leave_request_trends": lambda: {"query_type": "leave_request_trends"},
+        "complex_query:timetable_conflicts": lambda: {"query_type": "timetable_conflicts"},
+        "search_faculty": lambda: {"subject": fx.rng.choice(["Physics", "Databases"])},
+        "get_students_at_risk": lambda: {},
+        "get_pending_actions": lambda: {},
+        "bulk_create_students": lambda: (lambda n: {"students": [
+            {"roll": roll, "fullName": f"Bulk {roll}", "email": f"bulk{roll}@bench.test", "phone": "1"}
+            for roll in range(n * 100, n * 100 + 100)
+        ]})(fx.next_id()),
+        "bulk_create_faculty": lambda: (lambda n: {"faculty": [
+            {"employeeId": f"BF{n}-{i}", "fullName": "Bulk", "email": f"bf{n}-{i}@bench.test", "designation": "Lecturer"}
+            for i in range(100)
+        ]})(fx.next_id()),
+        "bulk_create_courses": lambda: (lambda n: {"courses": [
+            {"code": f"BC{n}-{i}", "title": "Bulk", "credits": 3, "semester": 1} for i in range(100)
+        ]})(fx.next_id()),
+        "export_collection": lambda: {"collection": "students", "format": "json", "page_size": 1000},
+        "export_collection:csv": lambda: {"collection": "attendances", "format": "csv", "page_size": 1000},
+        "get_executive_summary": lambda: {},
+        "check_indexes": lambda: {},
+        "migrate_attendance_encoding": lambda: {"to": "packed", "dry_run": True},
+    }
+
+
+def resource_cases(fx: Fixtures) -> Dict[str, Callable[[], str]]:
+    return {
+        "erp://system-instructions": lambda: "erp://system-instructions",
+        "erp://students": lambda: "erp://students",
+        "erp://faculty": lambda: "erp://faculty",
+        "erp://courses": lambda: "erp://courses",
+        "erp://attendance": lambda: "erp://attendance",
+        "erp://leave-requests": lambda: "erp://leave-requests",
+        "erp://timetables": lambda: "erp://timetables",
+        "erp://dashboard": lambda: "erp://dashboard",
+        "erp://metrics": lambda: "erp://metrics",
+        "erp://student/{roll}": lambda: f"erp://student/{fx.pick(fx.rolls)}",
+    }
+
+
+async def measure(call: Callable[[], Any], runs: int, counter) -> Dict[str, Any]:
+    samples, errors, response_bytes = [], 0, 0
+    counter.reset()
+    for _ in range(runs):
+        start = time.perf_counter()
+        try:
+            result = await call()
+        except Exception:
+            errors += 1
+            result = None
+        samples.append((time.perf_counter() - start) * 1000)
+        if isinstance(result, list):
+            texts = [item.text for item in result]
+            response_bytes += sum(len(t) for t in texts)
+            errors += int(texts[0].startswith("Error"))
+        elif isinstance(result, str):
+            response_bytes += len(result)
+    return {
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "mean_ms": round(sum(samples) / len(samples), 3),
+        "round_trips": round(counter.count / runs, 2),
+        "response_bytes": response_bytes // runs,
+        "errors": errors,
+    }
+
+
+def print_row(name: str, stats: Dict[str, Any]):
+    print(f"{name:<46} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+          f"{stats['round_trips']:>8.1f} {stats['errors']:>4}")
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--months", type=int, default=6, help="Attendance months per student")
+    parser.add_argument("--runs", type=int, default=30, help="Calls per tool/resource")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse data already in the bench database")
+    parser.add_argument("--only", help="Comma-separated case names to run")
+    parser.add_argument("--output", help="Results file (default benchmarks/results/<timestamp>-<scale>.json)")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for argument selection")
+    args = parser.parse_args(argv)
+
+    client, db, counter = connect()
+    results: Dict[str, Any] = {
+        "scale": args.scale,
+        "runs": args.runs,
+        "startedAt": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "pymongo": pymongo.version,
+            "mongod": (await db.command("buildInfo"))["version"],
+            "database": BENCH_DATABASE,
+            "orjson": server.orjson is not None,
+        },
+    }
+
+    if not args.skip_seed:
+        start = time.perf_counter()
+        results["documents"] = await generate(db, SCALES[args.scale], months=args.months)
+        results["seedSeconds"] = round(time.perf_counter() - start, 1)
+        print(f"Seeded {results['documents']} in {results['seedSeconds']}s")
+    await server.ensure_indexes()
+    await server.dashboard_state.seed()
+
+    fx = Fixtures(random.Random(args.seed))
+    await fx.load(db)
+    only = set(args.only.split(",")) if args.only else None
+
+    tools = tool_cases(fx)
+    listed = {tool.name for tool in await server.handle_list_tools()}
+    results["untested_tools"] = sorted(listed - {case.split(":")[0] for case in tools})
+
+    print(f"{'case':<46} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'trips':>8} {'err':>4}")
+    results["tools"] = {}
+    for case, make_args in tools.items():
+        if only and case not in only:
+            continue
+        name = case.split(":")[0]
+        stats = await measure(lambda: server.handle_call_tool(name, make_args()), args.runs, counter)
+        results["tools"][case] = stats
+        print_row(case, stats)
+
+    results["resources"] = {}
+    for case, make_uri in resource_cases(fx).items():
+        if only and case not in only:
+            continue
+        stats = await measure(lambda: server.handle_read_resource(AnyUrl(make_uri())), args.runs, counter)
+        results["resources"][case] = stats
+        print_row(case, stats)
+
+    if results["untested_tools"]:
+        print(f"No benchmark case for: {', '.join(results['untested_tools'])}", file=sys.stderr)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{args.scale}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
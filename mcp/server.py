@@ -4,14 +4,28 @@ ERP MCP Server - MongoDB-backed Model Context Protocol server
 Provides intelligent access to ERP data with natural language capabilities
 """
 
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 import asyncio
+import calendar
 import json
 import logging
+import math
 import os
+import threading
+import weakref
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime, date
 from typing import Any, Dict, List, Optional, Union
+from urllib.parse import parse_qsl
 from dataclasses import dataclass
 
+from pydantic import AnyUrl
+
 from mcp.server import Server
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
@@ -22,12 +36,14 @@ from mcp.types import (
     TextContent,
     ImageContent,
     EmbeddedResource,
+    InitializedNotification,
     LoggingLevel
 )
 
 # MongoDB imports
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import DuplicateKeyError
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 from bson import ObjectId
 from bson.errors import InvalidId
 
@@ -35,31 +51,819 @@ from bson.errors import InvalidId
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# MongoDB connection
-MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/erp")
-client = AsyncIOMotorClient(MONGODB_URI)
-db = client.erp
+# Startup timings in ms, reported by `python server.py --profile-startup`
+STARTUP_TIMINGS: Dict[str, float] = {}
+_last_startup_phase = _IMPORT_STARTED
+
+def startup_phase(name: str, start: Optional[float] = None):
+    """Record a startup phase that began at start, or at the previous phase when start is omitted"""
+    global _last_startup_phase
+    now = time.perf_counter()
+    STARTUP_TIMINGS[name] = round((now - (_last_startup_phase if start is None else start)) * 1000, 2)
+    if start is None:
+        _last_startup_phase = now
+
+startup_phase("imports")
+
+# Instrumentation: per-tool and per-resource call metrics, exposed as erp://metrics
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_METRIC_NAMES = 200
+
+class CallStats:
+    """Counters and latency histogram for one tool or resource"""
+    __slots__ = ("calls", "errors", "in_flight", "buckets", "latency_sum", "db_round_trips", "response_bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.db_round_trips = 0
+        self.response_bytes = 0
+
+    def percentile_ms(self, pct: float) -> Optional[float]:
+        """Estimate a percentile as the upper bound of the bucket holding it"""
+        if not self.calls:
+            return None
+        rank = pct / 100 * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound * 1000
+        return float("inf")
+
+class _CallRecord:
+    __slots__ = ("stats", "response_bytes", "error")
+
+    def __init__(self, stats: CallStats):
+        self.stats = stats
+        self.response_bytes = 0
+        self.error = False
+
+    def observe(self, result: List[TextContent]):
+        """Record the size of a tool response and whether it reports an error"""
+        self.response_bytes = sum(len(item.text.encode("utf-8")) for item in result)
+        self.error = bool(result) and result[0].text.startswith("Error")
+
+_current_call: ContextVar[Optional[_CallRecord]] = ContextVar("erp_current_call", default=None)
+
+def _label_value(value: str) -> str:
+    """Escape a Prometheus label value (backslash, double quote, newline)"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Metrics:
+    """Process-wide call metrics; cheap enough to leave on in production"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.stats: Dict[tuple, CallStats] = {}
+        self.db_commands = 0
+        self._lock = threading.Lock()
+
+    def _stats(self, kind: str, name: str) -> CallStats:
+        key = (kind, name)
+        stats = self.stats.get(key)
+        if stats is None:
+            if len(self.stats) >= MAX_METRIC_NAMES:
+                key = (kind, "other")
+            stats = self.stats.setdefault(key, CallStats())
+        return stats
+
+    @asynccontextmanager
+    async def track(self, kind: str, name: str):
+        """Time a call and attribute DB commands issued inside it"""
+        stats = self._stats(kind, name)
+        record = _CallRecord(stats)
+        token = _current_call.set(record)
+        stats.in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record.error = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_call.reset(token)
+            stats.in_flight -= 1
+            stats.calls += 1
+            stats.errors += record.error
+            stats.latency_sum += elapsed
+            stats.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+            stats.response_bytes += record.response_bytes
+
+    def pool_checkout(self, duration: Optional[float], failed: bool):
+        """Called from driver threads when a connection checkout completes or times out"""
+        with self._lock:
+            stats = self._stats("pool", "checkout")
+            stats.calls += 1
+            stats.errors += failed
+            stats.in_flight += not failed
+            if duration is not None:
+                stats.latency_sum += duration
+                stats.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+
+    def pool_checkin(self):
+        with self._lock:
+            self._stats("pool", "checkout").in_flight -= 1
+
+    def db_command(self):
+        """Called from driver threads for every command sent to MongoDB"""
+        record = _current_call.get()
+        with self._lock:
+            self.db_commands += 1
+            if record is not None:
+                record.stats.db_round_trips += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        report = {"uptimeSeconds": round(time.time() - self.started_at, 1), "dbCommands": self.db_commands}
+        for (kind, name), s in sorted(self.stats.items()):
+            report.setdefault(f"{kind}s", {})[name] = {
+                "calls": s.calls,
+                "errors": s.errors,
+                "inFlight": s.in_flight,
+                "latencyMs": {
+                    "mean": round(s.latency_sum / s.calls * 1000, 3) if s.calls else None,
+                    "p50": s.percentile_ms(50),
+                    "p95": s.percentile_ms(95),
+                    "p99": s.percentile_ms(99)
+                },
+                "dbRoundTrips": s.db_round_trips,
+                "dbRoundTripsPerCall": round(s.db_round_trips / s.calls, 2) if s.calls else None,
+                "responseBytes": s.response_bytes
+            }
+        return report
+
+    def prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format"""
+        lines = []
+        def family(metric, kind, help_text):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+        items = [((kind, _label_value(name)), stats) for (kind, name), stats in sorted(self.stats.items())]
+        
+        family("erp_mcp_calls_total", "counter", "Calls handled, by kind (tool/resource) and name")
+        lines.extend(f'erp_mcp_calls_total{{kind="{k}",name="{n}"}} {s.calls}' for (k, n), s in items)
+        family("erp_mcp_errors_total", "counter", "Calls that raised or returned an error")
+        lines.extend(f'erp_mcp_errors_total{{kind="{k}",name="{n}"}} {s.errors}' for (k, n), s in items)
+        family("erp_mcp_in_flight", "gauge", "Calls currently executing")
+        lines.extend(f'erp_mcp_in_flight{{kind="{k}",name="{n}"}} {s.in_flight}' for (k, n), s in items)
+        family("erp_mcp_db_round_trips_total", "counter", "MongoDB commands issued while handling calls")
+        lines.extend(f'erp_mcp_db_round_trips_total{{kind="{k}",name="{n}"}} {s.db_round_trips}' for (k, n), s in items)
+        family("erp_mcp_response_bytes_total", "counter", "Bytes of response text returned")
+        lines.extend(f'erp_mcp_response_bytes_total{{kind="{k}",name="{n}"}} {s.response_bytes}' for (k, n), s in items)
+        family("erp_mcp_call_duration_seconds", "histogram", "Call latency")
+        for (k, n), s in items:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), s.buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'erp_mcp_call_duration_seconds_bucket{{kind="{k}",name="{n}",le="{le}"}} {cumulative}')
+            lines.append(f'erp_mcp_call_duration_seconds_sum{{kind="{k}",name="{n}"}} {s.latency_sum}')
+            lines.append(f'erp_mcp_call_duration_seconds_count{{kind="{k}",name="{n}"}} {s.calls}')
+        family("erp_mcp_db_commands_total", "counter", "All MongoDB commands issued by the process")
+        lines.append(f"erp_mcp_db_commands_total {self.db_commands}")
+        return "\n".join(lines) + "\n"
+
+    async def export_prometheus(self, path: str, interval: float):
+        """Periodically write the Prometheus text file, replacing it atomically"""
+        while True:
+            try:
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "w") as f:
+                    f.write(self.prometheus())
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Could not write metrics file {path}: {e}")
+            await asyncio.sleep(interval)
+
+metrics = Metrics()
+
+class _CommandCounter(monitoring.CommandListener):
+    def started(self, event):
+        metrics.db_command()
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+class _PoolListener(monitoring.ConnectionPoolListener):
+    """Record connection checkout waits as the ("pool", "checkout") metric.
+    
+    Checkout events carry a duration from pymongo 4.7; older drivers count checkouts only.
+    """
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        metrics.pool_checkout(getattr(event, "duration", None), failed=False)
+
+    def connection_check_out_failed(self, event):
+        metrics.pool_checkout(getattr(event, "duration", None), failed=True)
+
+    def connection_checked_in(self, event):
+        metrics.pool_checkin()
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+# Server configuration: config.json, with environment variables taking precedence
+CONFIG_PATH = os.getenv("ERP_CONFIG", os.path.join(os.path.dirname(__file__), "config.json"))
+config = {}
+if os.path.exists(CONFIG_PATH):
+    try:
+        with open(CONFIG_PATH, 'r') as f:
+            config = json.load(f)
+    except Exception as e:
+        logger.warning(f"Could not load config: {e}")
+mongodb_config = config.get("mongodb", {})
+
+# Driver pool options and the environment variable overriding each
+POOL_OPTION_ENV = {
+    "maxPoolSize": "ERP_MAX_POOL_SIZE",
+    "minPoolSize": "ERP_MIN_POOL_SIZE",
+    "maxIdleTimeMS": "ERP_MAX_IDLE_TIME_MS",
+    "waitQueueTimeoutMS": "ERP_WAIT_QUEUE_TIMEOUT_MS",
+    "serverSelectionTimeoutMS": "ERP_SERVER_SELECTION_TIMEOUT_MS",
+}
+
+def _number_setting(env: str, default: Any, source: str, number: type) -> Any:
+    """A numeric setting from a non-empty environment variable, else default (labelled source in errors)"""
+    value = os.getenv(env, "").strip()
+    if value:
+        source = env
+    else:
+        value = default
+    if value is None:
+        return None
+    try:
+        return number(value)
+    except (TypeError, ValueError):
+        kind = "an integer" if number is int else "a number"
+        raise ValueError(f"{source} must be {kind}, got {value!r}") from None
+
+def _int_setting(env: str, default: Any, config_key: Optional[str] = None) -> Optional[int]:
+    """An integer setting from a non-empty environment variable, else from config.json (or the default)"""
+    source = f"config.json {config_key}" if config_key else "default"
+    return _number_setting(env, default, source, int)
+
+def _float_setting(env: str, default: float) -> float:
+    """A numeric setting from a non-empty environment variable, else the default"""
+    return _number_setting(env, default, "default", float)
+
+def _pool_options() -> Dict[str, int]:
+    options = {}
+    for option, env in POOL_OPTION_ENV.items():
+        value = _int_setting(env, mongodb_config.get("pool", {}).get(option), f"mongodb.pool.{option}")
+        if value is not None:
+            options[option] = value
+    return options
+
+pool_options = _pool_options()
+# Server-side time limit for reads issued through the shared query helpers
+OPERATION_MAX_TIME_MS = _int_setting("ERP_MAX_TIME_MS", mongodb_config.get("maxTimeMS", 30000), "mongodb.maxTimeMS")
+startup_phase("config")
+
+# MongoDB connection. The client is created on first use rather than at import,
+# so the MCP initialize handshake is answered before any driver or network work.
+MONGODB_URI = os.getenv("MONGODB_URI", mongodb_config.get("uri", "mongodb://localhost:27017/erp"))
+MONGODB_DATABASE = mongodb_config.get("database", "erp")
+
+class LazyHandle:
+    """Stands in for a driver object (client, database, collection) and builds it on first attribute access"""
+    __slots__ = ("_factory", "_target")
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._target = None
+
+    @property
+    def created(self) -> bool:
+        return self._target is not None
+
+    def resolve(self):
+        if self._target is None:
+            self._target = self._factory()
+        return self._target
+
+    def __getattr__(self, attr):
+        return getattr(self.resolve(), attr)
+
+    def __getitem__(self, key):
+        return self.resolve()[key]
+
+def _create_client() -> AsyncIOMotorClient:
+    start = time.perf_counter()
+    motor_client = AsyncIOMotorClient(MONGODB_URI, event_listeners=[_CommandCounter(), _PoolListener()], **pool_options)
+    startup_phase("db client", start)
+    return motor_client
+
+client = LazyHandle(_create_client)
+db = LazyHandle(lambda: client[MONGODB_DATABASE])
+
+async def warm_pool():
+    """Ping the server and open minPoolSize connections so the first tool call finds them ready"""
+    start = time.perf_counter()
+    await client.admin.command("ping")
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(pool_options.get("minPoolSize", 0))))
+    logger.info(f"Connection pool warmed in {(time.perf_counter() - start) * 1000:.0f} ms ({pool_options})")
 
 # Collections
-students_collection = db.students
-faculty_collection = db.faculties
-courses_collection = db.courses
-attendance_collection = db.attendances
-leave_requests_collection = db.leaverequests
-timetables_collection = db.timetables
-
-# Load system instructions
+students_collection = LazyHandle(lambda: db.students)
+faculty_collection = LazyHandle(lambda: db.faculties)
+courses_collection = LazyHandle(lambda: db.courses)
+attendance_collection = LazyHandle(lambda: db.attendances)
+leave_requests_collection = LazyHandle(lambda: db.leaverequests)
+timetables_collection = LazyHandle(lambda: db.timetables)
+
+# System instructions, read on first request for erp://system-instructions
 SYSTEM_INSTRUCTIONS_PATH = os.path.join(os.path.dirname(__file__), "system_instructions.json")
-system_instructions = {}
-if os.path.exists(SYSTEM_INSTRUCTIONS_PATH):
+_system_instructions: Optional[Dict[str, Any]] = None
+
+def load_system_instructions() -> Dict[str, Any]:
+    global _system_instructions
+    if _system_instructions is None:
+        _system_instructions = {}
+        if os.path.exists(SYSTEM_INSTRUCTIONS_PATH):
+            try:
+                with open(SYSTEM_INSTRUCTIONS_PATH, 'r') as f:
+                    _system_instructions = json.load(f)
+            except Exception as e:
+                logger.warning(f"Could not load system instructions: {e}")
+    return _system_instructions
+
+# JSON serialization for tool and resource responses
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Direct converters for the BSON types that appear in documents; anything else falls back to str
+_JSON_CONVERTERS = {
+    ObjectId: str,
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+}
+
+def _json_default(value: Any) -> Any:
+    converter = _JSON_CONVERTERS.get(type(value))
+    return converter(value) if converter else str(value)
+
+# Matches orjson: UTF-8 text rather than \u escapes, and no NaN/Infinity literals
+_json_encoder = json.JSONEncoder(default=_json_default, separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+_json_encoder_indent = json.JSONEncoder(default=_json_default, indent=2, ensure_ascii=False, allow_nan=False)
+
+def _finite(obj: Any) -> Any:
+    """Copy of obj with NaN and infinite floats replaced by None, as orjson writes them"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+def to_json(obj: Any, indent: bool = False) -> str:
+    """Serialize a response payload to compact JSON, using orjson when installed.
+    
+    ObjectIds become hex strings and datetimes ISO 8601 strings on both paths,
+    non-ASCII text is written as UTF-8 and NaN/Infinity become null.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, default=_json_default, option=option).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits; the stdlib encoder handles them
+            pass
+    encoder = _json_encoder_indent if indent else _json_encoder
+    try:
+        return encoder.encode(obj)
+    except ValueError:
+        # Out-of-range floats; orjson writes them as null
+        return encoder.encode(_finite(obj))
+
+# Tool registry: tool functions register themselves with @tool and get a
+# validator compiled once from their inputSchema, so dispatch is a dict
+# lookup and malformed arguments are rejected before any database I/O
+_JSON_TYPES = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool) or isinstance(v, float) and v.is_integer(),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+}
+
+def _compile_schema(schema: Dict[str, Any], path: str = "arguments"):
+    """Compile a JSON schema (the subset used by the tool list) into a checking function"""
+    checks = []
+    expected = schema.get("type")
+    # Null is only accepted where the schema lists it, e.g. "type": ["string", "null"]
+    types = expected if isinstance(expected, list) else [expected] if expected else []
+    nullable = "null" in types
+    types = [t for t in types if t != "null"]
+    if types:
+        type_checks = [_JSON_TYPES[t] for t in types]
+        def check_type(value, path):
+            if not any(is_type(value) for is_type in type_checks):
+                raise ValueError(f"{path} must be of type {' or '.join(types)}")
+        checks.append(check_type)
+    if "enum" in schema:
+        allowed = schema["enum"]
+        def check_enum(value, path):
+            if value not in allowed:
+                raise ValueError(f"{path} must be one of {', '.join(map(str, allowed))}")
+        checks.append(check_enum)
+    if "required" in schema:
+        required = schema["required"]
+        def check_required(value, path):
+            missing = [key for key in required if value.get(key) is None]
+            if missing:
+                raise ValueError(f"{path} is missing required field(s): {', '.join(missing)}")
+        checks.append(check_required)
+    if "properties" in schema:
+        properties = {key: _compile_schema(sub) for key, sub in schema["properties"].items()}
+        def check_properties(value, path):
+            for key, item in value.items():
+                check = properties.get(key)
+                if check is not None:
+                    check(item, f"{path}.{key}")
+        checks.append(check_properties)
+    if "items" in schema:
+        check_item = _compile_schema(schema["items"])
+        def check_items(value, path):
+            for i, item in enumerate(value):
+                check_item(item, f"{path}[{i}]")
+        checks.append(check_items)
+    
+    def validate(value, path=path):
+        if value is None:
+            if nullable:
+                return
+            raise ValueError(f"{path} must not be null")
+        for check in checks:
+            check(value, path)
+    return validate
+
+class RegisteredTool:
+    __slots__ = ("handler", "validate", "defaults", "coalesce")
+
+    def __init__(self, handler, validate, defaults: Dict[str, Any], coalesce: bool):
+        self.handler = handler
+        self.validate = validate
+        self.defaults = defaults
+        self.coalesce = coalesce
+
+_TOOL_HANDLERS: Dict[str, Any] = {}
+TOOL_REGISTRY: Dict[str, RegisteredTool] = {}
+
+def tool(handler):
+    """Register a tool function under its own name; see build_tool_registry()"""
+    _TOOL_HANDLERS[handler.__name__] = handler
+    return handler
+
+def build_tool_registry():
+    """Pair every declared Tool with its handler and compile its argument validator"""
+    missing = [t.name for t in TOOLS if t.name not in _TOOL_HANDLERS]
+    if missing:
+        raise RuntimeError(f"Tools declared without a handler: {', '.join(missing)}")
+    for t in TOOLS:
+        defaults = {
+            key: spec["default"] for key, spec in t.inputSchema.get("properties", {}).items() if "default" in spec
+        }
+        TOOL_REGISTRY[t.name] = RegisteredTool(
+            _TOOL_HANDLERS[t.name], _compile_schema(t.inputSchema), defaults, t.name in COALESCED_TOOLS
+        )
+
+# Single-flight coalescing: identical concurrent reads share one in-flight computation
+SINGLE_FLIGHT_ENABLED = os.getenv("ERP_SINGLE_FLIGHT", "1").lower() not in ("0", "false", "no")
+# Tools that only read; every other tool is treated as a write and bypasses coalescing
+COALESCED_TOOLS = {
+    "get_student", "search_students", "get_faculty", "search_faculty", "get_course",
+    "get_attendance", "calculate_attendance_stats", "get_leave_requests", "get_timetable",
+    "get_weekly_timetable", "get_erp_analytics", "complex_query", "get_students_at_risk",
+    "get_pending_actions", "get_executive_summary",
+}
+# Resources served from process memory gain nothing from coalescing
+UNCOALESCED_RESOURCES = {"erp://metrics", "erp://system-instructions"}
+
+class SingleFlight:
+    """Share one in-flight computation between concurrent callers with the same key.
+    
+    Nothing is cached: an entry lives only while its computation runs. Writes call
+    forget() so a read that starts after a write never joins a computation that
+    began before it. The shared task is shielded, so a caller that is cancelled
+    does not cancel the result for the others.
+    """
+
+    def __init__(self, enabled: bool = SINGLE_FLIGHT_ENABLED):
+        self.enabled = enabled
+        self.in_flight: Dict[Any, asyncio.Future] = {}
+        self.leaders = 0
+        self.joined = 0
+
+    @staticmethod
+    def key(kind: str, name: str, arguments: Dict[str, Any]) -> tuple:
+        return kind, name, json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str)
+
+    async def run(self, key: tuple, compute):
+        if not self.enabled:
+            return await compute()
+        future = self.in_flight.get(key)
+        if future is None:
+            self.leaders += 1
+            future = asyncio.ensure_future(compute())
+            self.in_flight[key] = future
+            future.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.joined += 1
+        return await asyncio.shield(future)
+
+    def _finished(self, key: tuple, future: asyncio.Future):
+        if self.in_flight.get(key) is future:
+            del self.in_flight[key]
+        if not future.cancelled():
+            future.exception()  # retrieved here in case every caller was cancelled
+
+    def forget(self):
+        self.in_flight.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        started = self.leaders + self.joined
+        return {
+            "enabled": self.enabled,
+            "computations": self.leaders,
+            "joined": self.joined,
+            "fanOut": round(started / self.leaders, 2) if self.leaders else None,
+            "inFlight": len(self.in_flight)
+        }
+
+single_flight = SingleFlight()
+
+# Batched student lookups
+class StudentLoader:
+    """Resolve students by roll with one $in query per batch, cached for the life of a request"""
+
+    def __init__(self, projection: Optional[Dict[str, int]] = None):
+        self.projection = projection
+        self._cache: Dict[int, Optional[Dict[str, Any]]] = {}
+
+    async def load_many(self, rolls) -> Dict[int, Dict[str, Any]]:
+        """Return {roll: student} for every roll that exists, fetching only uncached rolls"""
+        rolls = list(dict.fromkeys(rolls))
+        missing = [roll for roll in rolls if roll not in self._cache]
+        if missing:
+            cursor = students_collection.find({"roll": {"$in": missing}}, self.projection)
+            async for student in cursor:
+                self._cache[student["roll"]] = student
+            for roll in missing:
+                self._cache.setdefault(roll, None)
+        return {roll: self._cache[roll] for roll in rolls if self._cache[roll] is not None}
+
+    async def load(self, roll: int) -> Optional[Dict[str, Any]]:
+        """Return a single student by roll, or None"""
+        return (await self.load_many([roll])).get(roll)
+
+# Projection used when only the student's name is needed for enrichment
+STUDENT_NAME_PROJECTION = {"roll": 1, "fullName": 1}
+
+# Attendance percentage below which a student is considered at risk
+AT_RISK_THRESHOLD = 75
+
+# Index registry, applied at startup by ensure_indexes()
+INDEX_REGISTRY = {
+    "students": [
+        IndexModel([("roll", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)], unique=True),
+        # Keyset pages of active records are walked in _id order
+        IndexModel([("isActive", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("fullName", TEXT)], name="student_text"),
+    ],
+    "faculties": [
+        IndexModel([("employeeId", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("isActive", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel(
+            [("fullName", TEXT), ("subjectsHandled", TEXT), ("designation", TEXT)],
+            name="faculty_text",
+            weights={"fullName": 10, "subjectsHandled": 5, "designation": 2}
+        ),
+    ],
+    "courses": [
+        IndexModel([("code", ASCENDING)], unique=True),
+        IndexModel([("isActive", ASCENDING), ("_id", ASCENDING)]),
+        # Serves the faculty -> courses join in faculty_workload
+        IndexModel([("facultyInCharge", ASCENDING), ("isActive", ASCENDING)]),
+    ],
+    "attendances": [
+        # Also serves every studentRoll-only lookup through its prefix
+        IndexModel([("studentRoll", ASCENDING), ("month", ASCENDING), ("year", ASCENDING)], unique=True),
+        # At-risk pages are walked in (attendancePercentage, _id) order
+        IndexModel([("attendancePercentage", ASCENDING), ("_id", ASCENDING)]),
+        # Small index for the default at-risk threshold filtered by month/year
+        IndexModel(
+            [("year", ASCENDING), ("month", ASCENDING), ("attendancePercentage", ASCENDING), ("_id", ASCENDING)],
+            name="at_risk_page_by_month",
+            partialFilterExpression={"attendancePercentage": {"$lt": AT_RISK_THRESHOLD}}
+        ),
+    ],
+    "leaverequests": [
+        IndexModel([("status", ASCENDING), ("startDate", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("studentRoll", ASCENDING), ("startDate", DESCENDING)]),
+        IndexModel([("startDate", ASCENDING)]),
+    ],
+    "timetables": [
+        IndexModel([("semester", ASCENDING), ("dayOfWeek", ASCENDING), ("isActive", ASCENDING)]),
+    ],
+}
+
+async def ensure_indexes() -> Dict[str, Any]:
+    """Create every registered index; existing identical indexes are a no-op"""
+    async def apply(name: str, models: List[IndexModel]):
+        try:
+            return name, await db[name].create_indexes(models)
+        except Exception as e:
+            logger.warning(f"Could not create indexes on {name}: {e}")
+            return name, f"Error: {str(e)}"
+    
+    results = await asyncio.gather(*(apply(name, models) for name, models in INDEX_REGISTRY.items()))
+    return dict(results)
+
+# Representative query shape of each indexed tool, checked by check_indexes
+QUERY_SHAPES = [
+    ("erp://students", "students", {"isActive": True}, [("_id", 1)]),
+    ("get_student", "students", {"roll": 1001}, None),
+    ("student_loader", "students", {"roll": {"$in": [1001, 1002]}}, None),
+    ("search_students(text)", "students", {"$text": {"$search": "john"}}, None),
+    ("get_faculty", "faculties", {"employeeId": "EMP001"}, None),
+    ("search_faculty(text)", "faculties", {"$text": {"$search": "mathematics"}}, None),
+    ("get_course", "courses", {"code": "MATH101"}, None),
+    ("get_attendance", "attendances", {"studentRoll": 1001, "month": "January 2025", "year": 2025}, None),
+    ("erp://student/{roll}", "attendances", {"studentRoll": 1001}, [("year", -1), ("month", 1)]),
+    ("get_students_at_risk", "attendances", {"attendancePercentage": {"$lt": AT_RISK_THRESHOLD}},
+     [("attendancePercentage", 1), ("_id", 1)]),
+    ("get_students_at_risk(month)", "attendances",
+     {"attendancePercentage": {"$lt": AT_RISK_THRESHOLD}, "month": "January 2025", "year": 2025},
+     [("attendancePercentage", 1), ("_id", 1)]),
+    ("get_leave_requests(status)", "leaverequests", {"status": "pending"}, [("_id", 1)]),
+    ("get_leave_requests(student)", "leaverequests", {"studentRoll": 1001}, None),
+    ("get_leave_requests(date_range)", "leaverequests", {"startDate": {"$gte": datetime(2025, 1, 1)}}, None),
+    ("get_timetable", "timetables", {"semester": 1, "dayOfWeek": "Monday", "isActive": True}, None),
+    ("get_weekly_timetable", "timetables", {"semester": 1, "isActive": True}, None),
+]
+
+def _plan_stages(plan: Any) -> List[str]:
+    """Collect every stage name in an explain plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+@tool
+async def check_indexes(args: Dict[str, Any]) -> List[TextContent]:
+    """Explain each registered query shape and flag any collection scan"""
     try:
-        with open(SYSTEM_INSTRUCTIONS_PATH, 'r') as f:
-            system_instructions = json.load(f)
+        async def explain(label, collection, query, sort):
+            cursor = db[collection].find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            plan = await cursor.explain()
+            stages = _plan_stages(plan.get("queryPlanner", {}).get("winningPlan", {}))
+            return {"shape": label, "collection": collection, "stages": stages, "collscan": "COLLSCAN" in stages}
+        
+        report = await asyncio.gather(*(explain(*shape) for shape in QUERY_SHAPES))
+        result = {
+            "collscans": [r["shape"] for r in report if r["collscan"]],
+            "shapes": report
+        }
+        if args.get("create_missing") and result["collscans"]:
+            result["created"] = await ensure_indexes()
+        return [TextContent(type="text", text=to_json(result))]
     except Exception as e:
-        logger.warning(f"Could not load system instructions: {e}")
+        return [TextContent(type="text", text=f"Error checking indexes: {str(e)}")]
+
+# Keyset pagination for list tools and collection resources
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def _encode_page_token(state: Dict[str, Any]) -> str:
+    """Pack a resume point (e.g. the last _id seen) into an opaque URL-safe token"""
+    from base64 import urlsafe_b64encode
+    from bson import json_util
+    return urlsafe_b64encode(json_util.dumps(state).encode()).decode()
+
+def _decode_page_token(token: str) -> Dict[str, Any]:
+    from base64 import urlsafe_b64decode
+    from bson import json_util
+    try:
+        state = json_util.loads(urlsafe_b64decode(token.encode()).decode())
+        state["after"]
+        return state
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def _after_filter(query: Dict[str, Any], after: Any, sort_key: Optional[str] = None,
+                  key_value: Any = None) -> Dict[str, Any]:
+    """Restrict query to documents after the given _id, or after (key_value, _id) when sorted on sort_key"""
+    if sort_key is None:
+        after_query = {"_id": {"$gt": after}}
+    else:
+        after_query = {"$or": [
+            {sort_key: {"$gt": key_value}},
+            {sort_key: key_value, "_id": {"$gt": after}}
+        ]}
+    return {"$and": [query, after_query]} if query else after_query
+
+async def _find_page(collection, query: Dict[str, Any], args: Dict[str, Any],
+                     default_limit: int = DEFAULT_PAGE_SIZE, sort_key: Optional[str] = None):
+    """Fetch one page of query in _id order, resuming after args["after"].
+    
+    With sort_key the page is ordered by (sort_key, _id) instead, so a range
+    filter on sort_key and the sort are served by one (sort_key, _id) index.
+    Returns the documents and page info with next_cursor and truncated. One
+    extra document is fetched only to learn whether another page exists.
+    """
+    limit = min(max(int(args.get("limit", default_limit)), 1), MAX_PAGE_SIZE)
+    if args.get("after"):
+        state = _decode_page_token(args["after"])
+        if sort_key is not None and "key" not in state:
+            raise ValueError("Invalid cursor")
+        query = _after_filter(query, state["after"], sort_key, state.get("key"))
+    sort = [("_id", ASCENDING)] if sort_key is None else [(sort_key, ASCENDING), ("_id", ASCENDING)]
+    cursor = collection.find(query, max_time_ms=OPERATION_MAX_TIME_MS)
+    docs = await cursor.sort(sort).limit(limit + 1).to_list(length=limit + 1)
+    truncated = len(docs) > limit
+    docs = docs[:limit]
+    next_cursor = None
+    if truncated:
+        state = {"after": docs[-1]["_id"]}
+        if sort_key is not None:
+            state["key"] = docs[-1].get(sort_key)
+        next_cursor = _encode_page_token(state)
+    page = {
+        "count": len(docs),
+        "truncated": truncated,
+        "next_cursor": next_cursor
+    }
+    return docs, page
+
+def _page_response(items: Any, page: Dict[str, Any]) -> List[TextContent]:
+    """Tool response: the items, followed by the page info"""
+    return [
+        TextContent(type="text", text=to_json(items)),
+        TextContent(type="text", text=to_json(page))
+    ]
+
+PAGINATION_PROPERTIES = {
+    "limit": {"type": "integer", "description": f"Page size (default {DEFAULT_PAGE_SIZE}, max {MAX_PAGE_SIZE})"},
+    "after": {"type": "string", "description": "next_cursor from the previous page"}
+}
 
 # MCP Server instance
-server = Server("erp-mcp-server")
+class ERPServer(Server):
+    """Server whose initialization options advertise resource list changes and subscriptions"""
+    subscriptions = True
+
+    def create_initialization_options(self, notification_options=None, experimental_capabilities=None) -> InitializationOptions:
+        options = super().create_initialization_options(
+            notification_options or NotificationOptions(resources_changed=True),
+            experimental_capabilities
+        )
+        options.capabilities.resources.subscribe = self.subscriptions
+        return options
+
+server = ERPServer("erp-mcp-server", version="1.1.0")
 
 @server.list_resources()
 async def handle_list_resources() -> List[Resource]:
@@ -74,37 +878,37 @@ async def handle_list_resources() -> List[Resource]:
         Resource(
             uri="erp://students",
             name="Students",
-            description="All student records in the ERP system",
+            description="All student records in the ERP system (paginated: ?limit=N&after=<next_cursor>)",
             mimeType="application/json"
         ),
         Resource(
             uri="erp://faculty", 
             name="Faculty",
-            description="All faculty records in the ERP system",
+            description="All faculty records in the ERP system (paginated: ?limit=N&after=<next_cursor>)",
             mimeType="application/json"
         ),
         Resource(
             uri="erp://courses",
             name="Courses", 
-            description="All course records in the ERP system",
+            description="All course records in the ERP system (paginated: ?limit=N&after=<next_cursor>)",
             mimeType="application/json"
         ),
         Resource(
             uri="erp://attendance",
             name="Attendance",
-            description="All attendance records in the ERP system", 
+            description="All attendance records in the ERP system (paginated: ?limit=N&after=<next_cursor>)", 
             mimeType="application/json"
         ),
         Resource(
             uri="erp://leave-requests",
             name="Leave Requests",
-            description="All leave request records in the ERP system",
+            description="All leave request records in the ERP system (paginated: ?limit=N&after=<next_cursor>)",
             mimeType="application/json"
         ),
         Resource(
             uri="erp://timetables",
             name="Timetables",
-            description="All timetable records in the ERP system",
+            description="All timetable records in the ERP system (paginated: ?limit=N&after=<next_cursor>)",
             mimeType="application/json"
         ),
         Resource(
@@ -113,6 +917,12 @@ async def handle_list_resources() -> List[Resource]:
             description="Real-time ERP system overview: counts, pending actions, at-risk students, and key metrics",
             mimeType="application/json"
         ),
+        Resource(
+            uri="erp://metrics",
+            name="Server Metrics",
+            description="Per-tool and per-resource call counts, errors, latency percentiles, DB round-trips and response sizes",
+            mimeType="application/json"
+        ),
         Resource(
             uri="erp://student/{roll}",
             name="Student by Roll",
@@ -122,46 +932,68 @@ async def handle_list_resources() -> List[Resource]:
     ]
     return resources
 
+RESOURCE_URIS = {
+    "erp://system-instructions", "erp://students", "erp://faculty", "erp://courses", "erp://attendance",
+    "erp://leave-requests", "erp://timetables", "erp://dashboard", "erp://metrics"
+}
+
+def _resource_name(uri: str) -> str:
+    """Metric name for a resource URI, with parameters stripped"""
+    if uri.startswith("erp://student/"):
+        return "erp://student/{roll}"
+    return uri if uri in RESOURCE_URIS else "unknown"
+
 @server.read_resource()
-async def handle_read_resource(uri: str) -> str:
-    """Read ERP resource data"""
+async def handle_read_resource(uri: AnyUrl) -> str:
+    """Read ERP resource data.
+    
+    Collection resources are paginated with ?limit=N&after=<next_cursor>.
+    """
+    uri, _, query_string = str(uri).partition("?")
+    params = dict(parse_qsl(query_string))
+    async with metrics.track("resource", _resource_name(uri)) as call:
+        if uri in UNCOALESCED_RESOURCES:
+            result = await _read_resource(uri, params)
+        else:
+            result = await single_flight.run(single_flight.key("resource", uri, params), lambda: _read_resource(uri, params))
+        call.response_bytes = len(result.encode("utf-8"))
+        return result
+
+async def _read_resource(uri: str, params: Dict[str, str]) -> str:
     if uri == "erp://system-instructions":
         # Return system instructions for interaction guidelines
-        return json.dumps(system_instructions, indent=2, default=str)
+        return to_json(load_system_instructions(), indent=True)
     
     elif uri == "erp://students":
-        cursor = students_collection.find({"isActive": True})
-        students = await cursor.to_list(length=1000)
-        return json.dumps(students, default=str)
+        students, page = await _find_page(students_collection, {"isActive": True}, params)
+        return to_json({"items": students, **page})
     
     elif uri == "erp://faculty":
-        cursor = faculty_collection.find({"isActive": True})
-        faculty = await cursor.to_list(length=1000)
-        return json.dumps(faculty, default=str)
+        faculty, page = await _find_page(faculty_collection, {"isActive": True}, params)
+        return to_json({"items": faculty, **page})
     
     elif uri == "erp://courses":
-        cursor = courses_collection.find({"isActive": True})
-        courses = await cursor.to_list(length=1000)
-        return json.dumps(courses, default=str)
+        courses, page = await _find_page(courses_collection, {"isActive": True}, params)
+        return to_json({"items": courses, **page})
     
     elif uri == "erp://attendance":
-        cursor = attendance_collection.find()
-        attendance = await cursor.to_list(length=1000)
-        return json.dumps(attendance, default=str)
+        attendance, page = await _find_page(attendance_collection, {}, params)
+        return to_json({"items": [decode_attendance(a) for a in attendance], **page})
     
     elif uri == "erp://leave-requests":
-        cursor = leave_requests_collection.find()
-        leave_requests = await cursor.to_list(length=1000)
-        return json.dumps(leave_requests, default=str)
+        leave_requests, page = await _find_page(leave_requests_collection, {}, params)
+        return to_json({"items": leave_requests, **page})
     
     elif uri == "erp://timetables":
-        cursor = timetables_collection.find({"isActive": True})
-        timetables = await cursor.to_list(length=1000)
-        return json.dumps(timetables, default=str)
+        timetables, page = await _find_page(timetables_collection, {"isActive": True}, params)
+        return to_json({"items": timetables, **page})
     
     elif uri == "erp://dashboard":
         return await _get_dashboard_data()
     
+    elif uri == "erp://metrics":
+        return to_json({**metrics.snapshot(), "entityCache": entity_cache.snapshot(), "singleFlight": single_flight.snapshot()})
+    
     elif uri.startswith("erp://student/"):
         try:
             roll = int(uri.split("/")[-1])
@@ -169,10 +1001,10 @@ async def handle_read_resource(uri: str) -> str:
             if not student:
                 raise ValueError(f"Student with roll {roll} not found")
             # Enrich with attendance and leave info
-            att = await attendance_collection.find_one({"studentRoll": roll}, sort=[("year", -1), ("month", 1)])
+            att = decode_attendance(await attendance_collection.find_one({"studentRoll": roll}, sort=[("year", -1), ("month", 1)]))
             leaves = await leave_requests_collection.find({"studentRoll": roll}).to_list(length=5)
             enriched = {**student, "recentAttendance": att, "recentLeaves": leaves}
-            return json.dumps(enriched, default=str)
+            return to_json(enriched)
         except ValueError as e:
             raise e
         except (IndexError, ValueError):
@@ -181,535 +1013,723 @@ async def handle_read_resource(uri: str) -> str:
     else:
         raise ValueError(f"Unknown resource: {uri}")
 
-# Student Management Tools
-@server.list_tools()
-async def handle_list_tools() -> List[Tool]:
-    """List available ERP management tools"""
-    return [
-        # Student Management
-        Tool(
-            name="get_student",
-            description="Get student information by roll number or ObjectId",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "roll": {"type": "integer", "description": "Student roll number"},
-                    "student_id": {"type": "string", "description": "Student ObjectId"}
-                }
+# Tool definitions, built once at import and served from memory
+TOOLS: List[Tool] = [
+    # Student Management
+    Tool(
+        name="get_student",
+        description="Get student information by roll number or ObjectId",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "roll": {"type": "integer", "description": "Student roll number"},
+                "student_id": {"type": "string", "description": "Student ObjectId"}
             }
-        ),
-        Tool(
-            name="create_student", 
-            description="Create a new student record",
-            inputSchema={
-                "type": "object",
-                "required": ["roll", "fullName", "email", "phone"],
-                "properties": {
-                    "roll": {"type": "integer", "description": "Student roll number"},
-                    "fullName": {"type": "string", "description": "Student full name"},
-                    "email": {"type": "string", "description": "Student email"},
-                    "phone": {"type": "string", "description": "Student phone number"},
-                    "isActive": {"type": "boolean", "description": "Student active status", "default": True}
-                }
+        }
+    ),
+    Tool(
+        name="create_student", 
+        description="Create a new student record",
+        inputSchema={
+            "type": "object",
+            "required": ["roll", "fullName", "email", "phone"],
+            "properties": {
+                "roll": {"type": "integer", "description": "Student roll number"},
+                "fullName": {"type": "string", "description": "Student full name"},
+                "email": {"type": "string", "description": "Student email"},
+                "phone": {"type": "string", "description": "Student phone number"},
+                "semester": {"type": "integer", "description": "Current semester (enrolls the student in that semester's timetabled courses)"},
+                "isActive": {"type": "boolean", "description": "Student active status", "default": True}
             }
-        ),
-        Tool(
-            name="update_student",
-            description="Update student information",
-            inputSchema={
-                "type": "object", 
-                "required": ["student_id"],
-                "properties": {
-                    "student_id": {"type": "string", "description": "Student ObjectId"},
-                    "roll": {"type": "integer", "description": "Student roll number"},
-                    "fullName": {"type": "string", "description": "Student full name"},
-                    "email": {"type": "string", "description": "Student email"},
-                    "phone": {"type": "string", "description": "Student phone number"},
-                    "isActive": {"type": "boolean", "description": "Student active status"}
-                }
+        }
+    ),
+    Tool(
+        name="update_student",
+        description="Update student information",
+        inputSchema={
+            "type": "object", 
+            "required": ["student_id"],
+            "properties": {
+                "student_id": {"type": "string", "description": "Student ObjectId"},
+                "roll": {"type": "integer", "description": "Student roll number"},
+                "fullName": {"type": "string", "description": "Student full name"},
+                "email": {"type": "string", "description": "Student email"},
+                "phone": {"type": "string", "description": "Student phone number"},
+                "semester": {"type": "integer", "description": "Current semester"},
+                "isActive": {"type": "boolean", "description": "Student active status"}
             }
-        ),
-        Tool(
-            name="delete_student",
-            description="Delete student record (soft delete by setting isActive to false)",
-            inputSchema={
-                "type": "object",
-                "required": ["student_id"],
-                "properties": {
-                    "student_id": {"type": "string", "description": "Student ObjectId"}
-                }
+        }
+    ),
+    Tool(
+        name="delete_student",
+        description="Delete student record (soft delete by setting isActive to false)",
+        inputSchema={
+            "type": "object",
+            "required": ["student_id"],
+            "properties": {
+                "student_id": {"type": "string", "description": "Student ObjectId"}
             }
-        ),
-        Tool(
-            name="search_students",
-            description="Search students by various criteria",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Search by name (partial match)"},
-                    "email": {"type": "string", "description": "Search by email"},
-                    "roll_range": {"type": "object", "properties": {
-                        "min": {"type": "integer"},
-                        "max": {"type": "integer"}
-                    }, "description": "Search by roll number range"},
-                    "isActive": {"type": "boolean", "description": "Filter by active status"}
-                }
+        }
+    ),
+    Tool(
+        name="search_students",
+        description="Search students by various criteria",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Search by name (partial match)"},
+                "text": {"type": "string", "description": "Full-text search on name words; returns the top `limit` matches by relevance (default 20)"},
+                "email": {"type": "string", "description": "Search by email"},
+                "roll_range": {"type": "object", "properties": {
+                    "min": {"type": "integer"},
+                    "max": {"type": "integer"}
+                }, "description": "Search by roll number range"},
+                "isActive": {"type": "boolean", "description": "Filter by active status"},
+                **PAGINATION_PROPERTIES
             }
-        ),
-        
-        # Faculty Management
-        Tool(
-            name="get_faculty",
-            description="Get faculty information by employee ID or ObjectId",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "employee_id": {"type": "string", "description": "Faculty employee ID"},
-                    "faculty_id": {"type": "string", "description": "Faculty ObjectId"}
-                }
+        }
+    ),
+    
+    # Faculty Management
+    Tool(
+        name="get_faculty",
+        description="Get faculty information by employee ID or ObjectId",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "employee_id": {"type": "string", "description": "Faculty employee ID"},
+                "faculty_id": {"type": "string", "description": "Faculty ObjectId"}
             }
-        ),
-        Tool(
-            name="create_faculty",
-            description="Create a new faculty record", 
-            inputSchema={
-                "type": "object",
-                "required": ["employeeId", "fullName", "email", "designation"],
-                "properties": {
-                    "employeeId": {"type": "string", "description": "Faculty employee ID"},
-                    "fullName": {"type": "string", "description": "Faculty full name"},
-                    "email": {"type": "string", "description": "Faculty email"},
-                    "designation": {"type": "string", "description": "Faculty designation"},
-                    "subjectsHandled": {"type": "array", "items": {"type": "string"}, "description": "Subjects handled"},
-                    "isActive": {"type": "boolean", "description": "Faculty active status", "default": True}
-                }
+        }
+    ),
+    Tool(
+        name="create_faculty",
+        description="Create a new faculty record", 
+        inputSchema={
+            "type": "object",
+            "required": ["employeeId", "fullName", "email", "designation"],
+            "properties": {
+                "employeeId": {"type": "string", "description": "Faculty employee ID"},
+                "fullName": {"type": "string", "description": "Faculty full name"},
+                "email": {"type": "string", "description": "Faculty email"},
+                "designation": {"type": "string", "description": "Faculty designation"},
+                "subjectsHandled": {"type": "array", "items": {"type": "string"}, "description": "Subjects handled"},
+                "isActive": {"type": "boolean", "description": "Faculty active status", "default": True}
             }
-        ),
-        Tool(
-            name="update_faculty",
-            description="Update faculty information",
-            inputSchema={
-                "type": "object",
-                "required": ["faculty_id"],
-                "properties": {
-                    "faculty_id": {"type": "string", "description": "Faculty ObjectId"},
-                    "employeeId": {"type": "string", "description": "Faculty employee ID"},
-                    "fullName": {"type": "string", "description": "Faculty full name"},
-                    "email": {"type": "string", "description": "Faculty email"},
-                    "designation": {"type": "string", "description": "Faculty designation"},
-                    "subjectsHandled": {"type": "array", "items": {"type": "string"}, "description": "Subjects handled"},
-                    "isActive": {"type": "boolean", "description": "Faculty active status"}
-                }
+        }
+    ),
+    Tool(
+        name="update_faculty",
+        description="Update faculty information",
+        inputSchema={
+            "type": "object",
+            "required": ["faculty_id"],
+            "properties": {
+                "faculty_id": {"type": "string", "description": "Faculty ObjectId"},
+                "employeeId": {"type": "string", "description": "Faculty employee ID"},
+                "fullName": {"type": "string", "description": "Faculty full name"},
+                "email": {"type": "string", "description": "Faculty email"},
+                "designation": {"type": "string", "description": "Faculty designation"},
+                "subjectsHandled": {"type": "array", "items": {"type": "string"}, "description": "Subjects handled"},
+                "isActive": {"type": "boolean", "description": "Faculty active status"}
             }
-        ),
-        Tool(
-            name="delete_faculty",
-            description="Delete faculty record (soft delete by setting isActive to false)",
-            inputSchema={
-                "type": "object",
-                "required": ["faculty_id"],
-                "properties": {
-                    "faculty_id": {"type": "string", "description": "Faculty ObjectId"}
-                }
+        }
+    ),
+    Tool(
+        name="delete_faculty",
+        description="Delete faculty record (soft delete by setting isActive to false)",
+        inputSchema={
+            "type": "object",
+            "required": ["faculty_id"],
+            "properties": {
+                "faculty_id": {"type": "string", "description": "Faculty ObjectId"}
             }
-        ),
-        
-        # Course Management
-        Tool(
-            name="get_course",
-            description="Get course information by code or ObjectId",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "code": {"type": "string", "description": "Course code"},
-                    "course_id": {"type": "string", "description": "Course ObjectId"}
-                }
+        }
+    ),
+    
+    # Course Management
+    Tool(
+        name="get_course",
+        description="Get course information by code or ObjectId",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "code": {"type": "string", "description": "Course code"},
+                "course_id": {"type": "string", "description": "Course ObjectId"}
             }
-        ),
-        Tool(
-            name="create_course",
-            description="Create a new course record",
-            inputSchema={
-                "type": "object",
-                "required": ["code", "title", "credits", "semester"],
-                "properties": {
-                    "code": {"type": "string", "description": "Course code"},
-                    "title": {"type": "string", "description": "Course title"},
-                    "credits": {"type": "integer", "description": "Course credits"},
-                    "semester": {"type": "integer", "description": "Course semester"},
-                    "description": {"type": "string", "description": "Course description"},
-                    "facultyInCharge": {"type": "string", "description": "Faculty ObjectId in charge"},
-                    "isActive": {"type": "boolean", "description": "Course active status", "default": True}
-                }
+        }
+    ),
+    Tool(
+        name="create_course",
+        description="Create a new course record",
+        inputSchema={
+            "type": "object",
+            "required": ["code", "title", "credits", "semester"],
+            "properties": {
+                "code": {"type": "string", "description": "Course code"},
+                "title": {"type": "string", "description": "Course title"},
+                "credits": {"type": "integer", "description": "Course credits"},
+                "semester": {"type": "integer", "description": "Course semester"},
+                "description": {"type": "string", "description": "Course description"},
+                "facultyInCharge": {"type": "string", "description": "Faculty ObjectId in charge"},
+                "isActive": {"type": "boolean", "description": "Course active status", "default": True}
             }
-        ),
-        Tool(
-            name="update_course",
-            description="Update course information",
-            inputSchema={
-                "type": "object",
-                "required": ["course_id"],
-                "properties": {
-                    "course_id": {"type": "string", "description": "Course ObjectId"},
-                    "code": {"type": "string", "description": "Course code"},
-                    "title": {"type": "string", "description": "Course title"},
-                    "credits": {"type": "integer", "description": "Course credits"},
-                    "semester": {"type": "integer", "description": "Course semester"},
-                    "description": {"type": "string", "description": "Course description"},
-                    "facultyInCharge": {"type": "string", "description": "Faculty ObjectId in charge"},
-                    "isActive": {"type": "boolean", "description": "Course active status"}
-                }
+        }
+    ),
+    Tool(
+        name="update_course",
+        description="Update course information",
+        inputSchema={
+            "type": "object",
+            "required": ["course_id"],
+            "properties": {
+                "course_id": {"type": "string", "description": "Course ObjectId"},
+                "code": {"type": "string", "description": "Course code"},
+                "title": {"type": "string", "description": "Course title"},
+                "credits": {"type": "integer", "description": "Course credits"},
+                "semester": {"type": "integer", "description": "Course semester"},
+                "description": {"type": "string", "description": "Course description"},
+                "facultyInCharge": {"type": ["string", "null"], "description": "Faculty ObjectId in charge (null to unassign)"},
+                "isActive": {"type": "boolean", "description": "Course active status"}
             }
-        ),
-        Tool(
-            name="delete_course",
-            description="Delete course record (soft delete by setting isActive to false)",
-            inputSchema={
-                "type": "object",
-                "required": ["course_id"],
-                "properties": {
-                    "course_id": {"type": "string", "description": "Course ObjectId"}
-                }
+        }
+    ),
+    Tool(
+        name="delete_course",
+        description="Delete course record (soft delete by setting isActive to false)",
+        inputSchema={
+            "type": "object",
+            "required": ["course_id"],
+            "properties": {
+                "course_id": {"type": "string", "description": "Course ObjectId"}
             }
-        ),
-        
-        # Attendance Management
-        Tool(
-            name="record_attendance",
-            description="Record attendance for a student",
-            inputSchema={
-                "type": "object",
-                "required": ["student_roll", "month", "year", "attendance_data"],
-                "properties": {
-                    "student_roll": {"type": "integer", "description": "Student roll number"},
-                    "month": {"type": "string", "description": "Month (e.g., 'January 2025')"},
-                    "year": {"type": "integer", "description": "Year"},
-                    "attendance_data": {"type": "array", "items": {
-                        "type": "object",
-                        "properties": {
-                            "date": {"type": "string", "format": "date"},
-                            "status": {"type": "string", "enum": ["P", "A", "DNM"]}
-                        }
-                    }, "description": "Array of attendance records"}
-                }
+        }
+    ),
+    
+    # Attendance Management
+    Tool(
+        name="record_attendance",
+        description="Record attendance for a student",
+        inputSchema={
+            "type": "object",
+            "required": ["student_roll", "month", "year", "attendance_data"],
+            "properties": {
+                "student_roll": {"type": "integer", "description": "Student roll number"},
+                "month": {"type": "string", "description": "Month (e.g., 'January 2025')"},
+                "year": {"type": "integer", "description": "Year"},
+                "attendance_data": {"type": "array", "items": {
+                    "type": "object",
+                    "properties": {
+                        "date": {"type": "string", "format": "date"},
+                        "status": {"type": "string", "enum": ["P", "A", "DNM"]}
+                    }
+                }, "description": "Array of attendance records"}
             }
-        ),
-        Tool(
-            name="get_attendance",
-            description="Get attendance records for a student",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "student_roll": {"type": "integer", "description": "Student roll number"},
-                    "month": {"type": "string", "description": "Month (e.g., 'January 2025')"},
-                    "year": {"type": "integer", "description": "Year"}
-                }
+        }
+    ),
+    Tool(
+        name="mark_attendance_day",
+        description="Mark a single day's attendance for a student, updating the month's totals in place",
+        inputSchema={
+            "type": "object",
+            "required": ["student_roll", "date", "status"],
+            "properties": {
+                "student_roll": {"type": "integer", "description": "Student roll number"},
+                "date": {"type": "string", "format": "date", "description": "Day to mark (YYYY-MM-DD)"},
+                "status": {"type": "string", "enum": ["P", "A", "DNM"]}
             }
-        ),
-        Tool(
-            name="calculate_attendance_stats",
-            description="Calculate attendance statistics for a student or all students",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "student_roll": {"type": "integer", "description": "Student roll number (optional)"},
-                    "month": {"type": "string", "description": "Month (optional)"},
-                    "year": {"type": "integer", "description": "Year (optional)"}
-                }
+        }
+    ),
+    Tool(
+        name="record_class_attendance",
+        description="Mark one day's attendance for a whole class in a single bulk write, returning the outcome for each roll",
+        inputSchema={
+            "type": "object",
+            "required": ["date", "records"],
+            "properties": {
+                "date": {"type": "string", "format": "date", "description": "Day to mark (YYYY-MM-DD)"},
+                "course_code": {"type": "string", "description": "Course the class was held for (checked to exist)"},
+                "semester": {"type": "integer", "description": "Semester of the class"},
+                "records": {"type": "array", "items": {
+                    "type": "object",
+                    "required": ["roll", "status"],
+                    "properties": {
+                        "roll": {"type": "integer"},
+                        "status": {"type": "string", "enum": ["P", "A", "DNM"]}
+                    }
+                }, "description": "Roll number and status for each student in the class"}
             }
-        ),
-        
-        # Leave Request Management
-        Tool(
-            name="create_leave_request",
-            description="Create a new leave request",
-            inputSchema={
-                "type": "object",
-                "required": ["student_roll", "start_date", "end_date", "reason"],
-                "properties": {
-                    "student_roll": {"type": "integer", "description": "Student roll number"},
-                    "start_date": {"type": "string", "format": "date"},
-                    "end_date": {"type": "string", "format": "date"},
-                    "reason": {"type": "string", "description": "Reason for leave"},
-                    "comments": {"type": "string", "description": "Additional comments"}
-                }
+        }
+    ),
+    Tool(
+        name="get_attendance",
+        description="Get attendance records for a student",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "student_roll": {"type": "integer", "description": "Student roll number"},
+                "month": {"type": "string", "description": "Month (e.g., 'January 2025')"},
+                "year": {"type": "integer", "description": "Year"},
+                **PAGINATION_PROPERTIES
             }
-        ),
-        Tool(
-            name="update_leave_request",
-            description="Update leave request status (approve/reject)",
-            inputSchema={
-                "type": "object",
-                "required": ["leave_id", "status", "handled_by"],
-                "properties": {
-                    "leave_id": {"type": "string", "description": "Leave request ObjectId"},
-                    "status": {"type": "string", "enum": ["approved", "rejected"]},
-                    "handled_by": {"type": "string", "description": "Faculty ObjectId handling the request"},
-                    "comments": {"type": "string", "description": "Additional comments"}
-                }
+        }
+    ),
+    Tool(
+        name="calculate_attendance_stats",
+        description="Calculate attendance statistics for a student or all students",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "student_roll": {"type": "integer", "description": "Student roll number (optional)"},
+                "month": {"type": "string", "description": "Month (optional)"},
+                "year": {"type": "integer", "description": "Year (optional)"}
             }
-        ),
-        Tool(
-            name="get_leave_requests",
-            description="Get leave requests with optional filtering",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "student_roll": {"type": "integer", "description": "Student roll number"},
-                    "status": {"type": "string", "enum": ["pending", "approved", "rejected"]},
-                    "date_range": {"type": "object", "properties": {
-                        "start": {"type": "string", "format": "date"},
-                        "end": {"type": "string", "format": "date"}
-                    }}
-                }
+        }
+    ),
+    
+    # Leave Request Management
+    Tool(
+        name="create_leave_request",
+        description="Create a new leave request",
+        inputSchema={
+            "type": "object",
+            "required": ["student_roll", "start_date", "end_date", "reason"],
+            "properties": {
+                "student_roll": {"type": "integer", "description": "Student roll number"},
+                "start_date": {"type": "string", "format": "date"},
+                "end_date": {"type": "string", "format": "date"},
+                "reason": {"type": "string", "description": "Reason for leave"},
+                "comments": {"type": "string", "description": "Additional comments"}
             }
-        ),
-        
-        # Timetable Management
-        Tool(
-            name="create_timetable",
-            description="Create timetable for a day and semester",
-            inputSchema={
-                "type": "object",
-                "required": ["dayOfWeek", "semester", "slots"],
-                "properties": {
-                    "dayOfWeek": {"type": "string", "enum": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]},
-                    "semester": {"type": "integer", "description": "Semester number"},
-                    "slots": {"type": "array", "items": {
-                        "type": "object",
-                        "properties": {
-                            "period": {"type": "integer"},
-                            "type": {"type": "string", "enum": ["lecture", "break", "lab", "tutorial"]},
-                            "courseCode": {"type": "string"},
-                            "course": {"type": "string", "description": "Course ObjectId reference"},
-                            "faculty": {"type": "string", "description": "Faculty ObjectId reference"},
-                            "room": {"type": "string"}
-                        },
-                        "required": ["period", "type", "courseCode"]
-                    }, "description": "Time slots for the day"}
-                }
+        }
+    ),
+    Tool(
+        name="update_leave_request",
+        description="Update leave request status (approve/reject)",
+        inputSchema={
+            "type": "object",
+            "required": ["leave_id", "status", "handled_by"],
+            "properties": {
+                "leave_id": {"type": "string", "description": "Leave request ObjectId"},
+                "status": {"type": "string", "enum": ["approved", "rejected"]},
+                "handled_by": {"type": "string", "description": "Faculty ObjectId handling the request"},
+                "comments": {"type": "string", "description": "Additional comments"}
             }
-        ),
-        Tool(
-            name="get_timetable",
-            description="Get timetable for a specific day and semester",
-            inputSchema={
-                "type": "object",
-                "required": ["dayOfWeek", "semester"],
-                "properties": {
-                    "dayOfWeek": {"type": "string", "enum": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]},
-                    "semester": {"type": "integer", "description": "Semester number"}
-                }
+        }
+    ),
+    Tool(
+        name="get_leave_requests",
+        description="Get leave requests with optional filtering",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "student_roll": {"type": "integer", "description": "Student roll number"},
+                "status": {"type": "string", "enum": ["pending", "approved", "rejected"]},
+                "date_range": {"type": "object", "properties": {
+                    "start": {"type": "string", "format": "date"},
+                    "end": {"type": "string", "format": "date"}
+                }},
+                **PAGINATION_PROPERTIES
             }
-        ),
-        Tool(
-            name="get_weekly_timetable",
-            description="Get complete weekly timetable for a semester",
-            inputSchema={
-                "type": "object",
-                "required": ["semester"],
-                "properties": {
-                    "semester": {"type": "integer", "description": "Semester number"}
-                }
+        }
+    ),
+    
+    # Timetable Management
+    Tool(
+        name="create_timetable",
+        description="Create timetable for a day and semester",
+        inputSchema={
+            "type": "object",
+            "required": ["dayOfWeek", "semester", "slots"],
+            "properties": {
+                "dayOfWeek": {"type": "string", "enum": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]},
+                "semester": {"type": "integer", "description": "Semester number"},
+                "slots": {"type": "array", "items": {
+                    "type": "object",
+                    "properties": {
+                        "period": {"type": "integer"},
+                        "type": {"type": "string", "enum": ["lecture", "break", "lab", "tutorial"]},
+                        "courseCode": {"type": "string"},
+                        "course": {"type": "string", "description": "Course ObjectId reference"},
+                        "faculty": {"type": "string", "description": "Faculty ObjectId reference"},
+                        "room": {"type": "string"}
+                    },
+                    "required": ["period", "type", "courseCode"]
+                }, "description": "Time slots for the day"}
             }
-        ),
-        
-        # Analytics and Complex Queries
-        Tool(
-            name="get_erp_analytics",
-            description="Get comprehensive ERP analytics and insights",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "semester": {"type": "integer", "description": "Filter by semester"},
-                    "month": {"type": "string", "description": "Filter by month"},
-                    "year": {"type": "integer", "description": "Filter by year"}
-                }
+        }
+    ),
+    Tool(
+        name="get_timetable",
+        description="Get timetable for a specific day and semester",
+        inputSchema={
+            "type": "object",
+            "required": ["dayOfWeek", "semester"],
+            "properties": {
+                "dayOfWeek": {"type": "string", "enum": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]},
+                "semester": {"type": "integer", "description": "Semester number"}
             }
-        ),
-        Tool(
-            name="complex_query",
-            description="Execute complex queries across multiple collections",
-            inputSchema={
-                "type": "object",
-                "required": ["query_type"],
-                "properties": {
-                    "query_type": {"type": "string", "enum": [
-                        "students_with_low_attendance",
-                        "faculty_workload",
-                        "course_enrollment_stats",
-                        "leave_request_trends",
-                        "timetable_conflicts"
-                    ]},
-                    "parameters": {"type": "object", "description": "Query-specific parameters"}
-                }
+        }
+    ),
+    Tool(
+        name="get_weekly_timetable",
+        description="Get complete weekly timetable for a semester",
+        inputSchema={
+            "type": "object",
+            "required": ["semester"],
+            "properties": {
+                "semester": {"type": "integer", "description": "Semester number"}
             }
-        ),
-        
-        # Advanced Features (Project Showcase)
-        Tool(
-            name="search_faculty",
-            description="Search faculty by name, email, designation, or subjects they teach",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Search by name (partial match)"},
-                    "email": {"type": "string", "description": "Search by email"},
-                    "designation": {"type": "string", "description": "Filter by designation"},
-                    "subject": {"type": "string", "description": "Find faculty who teach this subject"},
-                    "isActive": {"type": "boolean", "description": "Filter by active status"}
-                }
+        }
+    ),
+    
+    # Analytics and Complex Queries
+    Tool(
+        name="get_erp_analytics",
+        description="Get comprehensive ERP analytics and insights",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "semester": {"type": "integer", "description": "Filter by semester"},
+                "month": {"type": "string", "description": "Filter by month"},
+                "year": {"type": "integer", "description": "Filter by year"}
             }
-        ),
-        Tool(
-            name="get_students_at_risk",
-            description="Get students with low attendance who may need intervention (default threshold 75%)",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "threshold": {"type": "integer", "description": "Attendance percentage threshold (default 75)", "default": 75},
-                    "month": {"type": "string", "description": "Filter by month"},
-                    "year": {"type": "integer", "description": "Filter by year"},
-                    "limit": {"type": "integer", "description": "Max results to return (default 20)", "default": 20}
-                }
+        }
+    ),
+    Tool(
+        name="complex_query",
+        description="Execute complex queries across multiple collections",
+        inputSchema={
+            "type": "object",
+            "required": ["query_type"],
+            "properties": {
+                "query_type": {"type": "string", "enum": [
+                    "students_with_low_attendance",
+                    "faculty_workload",
+                    "course_enrollment_stats",
+                    "leave_request_trends",
+                    "timetable_conflicts"
+                ]},
+                "parameters": {"type": "object", "description": "Query-specific parameters (students_with_low_attendance accepts threshold, limit and after; leave_request_trends accepts group_by: month, week, student or duration, year, and limit for student groups; faculty_workload accepts limit)"}
             }
-        ),
-        Tool(
-            name="get_pending_actions",
-            description="Get a summary of items requiring attention: pending leave requests, low attendance alerts",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "include_leave_details": {"type": "boolean", "description": "Include full leave request details", "default": True}
-                }
+        }
+    ),
+    
+    # Advanced Features (Project Showcase)
+    Tool(
+        name="search_faculty",
+        description="Search faculty by name, email, designation, or subjects they teach",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Search by name (partial match)"},
+                "email": {"type": "string", "description": "Search by email"},
+                "designation": {"type": "string", "description": "Filter by designation"},
+                "subject": {"type": "string", "description": "Find faculty who teach this subject"},
+                "text": {"type": "string", "description": "Full-text search across name, subjects and designation; returns the top `limit` matches by relevance (default 20)"},
+                "isActive": {"type": "boolean", "description": "Filter by active status"},
+                **PAGINATION_PROPERTIES
             }
-        ),
-        Tool(
-            name="bulk_create_students",
-            description="Create multiple students in one operation (useful for batch enrollment)",
-            inputSchema={
-                "type": "object",
-                "required": ["students"],
-                "properties": {
-                    "students": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "required": ["roll", "fullName", "email", "phone"],
-                            "properties": {
-                                "roll": {"type": "integer"},
-                                "fullName": {"type": "string"},
-                                "email": {"type": "string"},
-                                "phone": {"type": "string"}
-                            }
+        }
+    ),
+    Tool(
+        name="get_students_at_risk",
+        description="Get students with low attendance who may need intervention, lowest first (default threshold 75%)",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "threshold": {"type": "integer", "description": "Attendance percentage threshold (default 75)", "default": 75},
+                "month": {"type": "string", "description": "Filter by month"},
+                "year": {"type": "integer", "description": "Filter by year"},
+                "limit": {"type": "integer", "description": "Max results to return (default 20)", "default": 20},
+                "after": PAGINATION_PROPERTIES["after"]
+            }
+        }
+    ),
+    Tool(
+        name="get_pending_actions",
+        description="Get a summary of items requiring attention: pending leave requests, low attendance alerts",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "include_leave_details": {"type": "boolean", "description": "Include full leave request details", "default": True}
+            }
+        }
+    ),
+    Tool(
+        name="bulk_create_students",
+        description="Create multiple students in one operation (useful for batch enrollment)",
+        inputSchema={
+            "type": "object",
+            "required": ["students"],
+            "properties": {
+                "students": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "required": ["roll", "fullName", "email", "phone"],
+                        "properties": {
+                            "roll": {"type": "integer"},
+                            "fullName": {"type": "string"},
+                            "email": {"type": "string"},
+                            "phone": {"type": "string"},
+                            "semester": {"type": "integer"}
                         }
                     }
-                }
+                },
+                "batch_size": {"type": "integer", "description": "Documents per insert batch (default 1000, max 10000)", "default": 1000}
             }
-        ),
-        Tool(
-            name="export_collection",
-            description="Export a collection as JSON or CSV format for reports and backup",
-            inputSchema={
-                "type": "object",
-                "required": ["collection"],
-                "properties": {
-                    "collection": {"type": "string", "enum": ["students", "faculties", "courses", "attendances", "leaverequests", "timetables"]},
-                    "format": {"type": "string", "enum": ["json", "csv"], "default": "json"},
-                    "filters": {"type": "object", "description": "Optional filters (e.g. isActive: true)"}
-                }
+        }
+    ),
+    Tool(
+        name="bulk_create_faculty",
+        description="Create multiple faculty members in one operation",
+        inputSchema={
+            "type": "object",
+            "required": ["faculty"],
+            "properties": {
+                "faculty": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "required": ["employeeId", "fullName", "email", "designation"],
+                        "properties": {
+                            "employeeId": {"type": "string"},
+                            "fullName": {"type": "string"},
+                            "email": {"type": "string"},
+                            "designation": {"type": "string"},
+                            "subjectsHandled": {"type": "array", "items": {"type": "string"}}
+                        }
+                    }
+                },
+                "batch_size": {"type": "integer", "description": "Documents per insert batch (default 1000, max 10000)", "default": 1000}
             }
-        ),
-        Tool(
-            name="get_executive_summary",
-            description="Generate a human-readable executive summary report of the ERP system",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "include_recommendations": {"type": "boolean", "description": "Include AI-style recommendations", "default": True}
-                }
+        }
+    ),
+    Tool(
+        name="bulk_create_courses",
+        description="Create multiple courses in one operation",
+        inputSchema={
+            "type": "object",
+            "required": ["courses"],
+            "properties": {
+                "courses": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "required": ["code", "title", "credits", "semester"],
+                        "properties": {
+                            "code": {"type": "string"},
+                            "title": {"type": "string"},
+                            "credits": {"type": "integer"},
+                            "semester": {"type": "integer"},
+                            "description": {"type": "string"},
+                            "facultyInCharge": {"type": "string", "description": "Faculty ObjectId in charge"}
+                        }
+                    }
+                },
+                "batch_size": {"type": "integer", "description": "Documents per insert batch (default 1000, max 10000)", "default": 1000}
             }
-        )
-    ]
+        }
+    ),
+    Tool(
+        name="export_collection",
+        description="Export a collection as JSON, NDJSON or CSV for reports and backup, as pages or streamed to a file",
+        inputSchema={
+            "type": "object",
+            "required": ["collection"],
+            "properties": {
+                "collection": {"type": "string", "enum": ["students", "faculties", "courses", "attendances", "leaverequests", "timetables"]},
+                "format": {"type": "string", "enum": ["json", "ndjson", "csv"], "default": "json"},
+                "filters": {"type": "object", "description": "Optional filters (e.g. isActive: true)"},
+                "output_path": {"type": "string", "description": "Stream the full export to this file (relative to the export directory) instead of returning a page"},
+                "resume_after": {"type": "string", "description": "Resume an output_path export after this _id (the last_id of a previous run)"},
+                "page_size": {"type": "integer", "description": "Documents per returned page (default 5000, max 50000)", "default": 5000},
+                "continuation_token": {"type": "string", "description": "Token from a previous page to fetch the next one"}
+            }
+        }
+    ),
+    Tool(
+        name="get_executive_summary",
+        description="Generate a human-readable executive summary report of the ERP system",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "include_recommendations": {"type": "boolean", "description": "Include AI-style recommendations", "default": True}
+            }
+        }
+    ),
+    
+    # Maintenance
+    Tool(
+        name="check_indexes",
+        description="Explain each tool's query shape and report any that fall back to a collection scan",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "create_missing": {"type": "boolean", "description": "Apply the index registry if any collection scan is found", "default": False}
+            }
+        }
+    ),
+    Tool(
+        name="migrate_attendance_encoding",
+        description="Convert stored attendance months between the expanded per-day list and the compact packed form (reversible), reporting the size change",
+        inputSchema={
+            "type": "object",
+            "required": ["to"],
+            "properties": {
+                "to": {"type": "string", "enum": ["packed", "expanded"], "description": "Target storage form"},
+                "batch_size": {"type": "integer", "description": "Documents per read/bulk write batch (default 1000, max 10000)", "default": 1000},
+                "dry_run": {"type": "boolean", "description": "Only measure what would be converted", "default": False}
+            }
+        }
+    )
+]
+
+@server.list_tools()
+async def handle_list_tools() -> List[Tool]:
+    """List available ERP management tools"""
+    return TOOLS
 
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     """Handle tool calls for ERP management"""
+    async with metrics.track("tool", name if name in TOOL_REGISTRY else "unknown") as call:
+        result = await _call_tool(name, arguments)
+        call.observe(result)
+        return result
+
+async def _call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     try:
-        if name == "get_student":
-            return await get_student(arguments)
-        elif name == "create_student":
-            return await create_student(arguments)
-        elif name == "update_student":
-            return await update_student(arguments)
-        elif name == "delete_student":
-            return await delete_student(arguments)
-        elif name == "search_students":
-            return await search_students(arguments)
-        elif name == "get_faculty":
-            return await get_faculty(arguments)
-        elif name == "create_faculty":
-            return await create_faculty(arguments)
-        elif name == "update_faculty":
-            return await update_faculty(arguments)
-        elif name == "delete_faculty":
-            return await delete_faculty(arguments)
-        elif name == "get_course":
-            return await get_course(arguments)
-        elif name == "create_course":
-            return await create_course(arguments)
-        elif name == "update_course":
-            return await update_course(arguments)
-        elif name == "delete_course":
-            return await delete_course(arguments)
-        elif name == "record_attendance":
-            return await record_attendance(arguments)
-        elif name == "get_attendance":
-            return await get_attendance(arguments)
-        elif name == "calculate_attendance_stats":
-            return await calculate_attendance_stats(arguments)
-        elif name == "create_leave_request":
-            return await create_leave_request(arguments)
-        elif name == "update_leave_request":
-            return await update_leave_request(arguments)
-        elif name == "get_leave_requests":
-            return await get_leave_requests(arguments)
-        elif name == "create_timetable":
-            return await create_timetable(arguments)
-        elif name == "get_timetable":
-            return await get_timetable(arguments)
-        elif name == "get_weekly_timetable":
-            return await get_weekly_timetable(arguments)
-        elif name == "get_erp_analytics":
-            return await get_erp_analytics(arguments)
-        elif name == "complex_query":
-            return await complex_query(arguments)
-        elif name == "search_faculty":
-            return await search_faculty(arguments)
-        elif name == "get_students_at_risk":
-            return await get_students_at_risk(arguments)
-        elif name == "get_pending_actions":
-            return await get_pending_actions(arguments)
-        elif name == "bulk_create_students":
-            return await bulk_create_students(arguments)
-        elif name == "export_collection":
-            return await export_collection(arguments)
-        elif name == "get_executive_summary":
-            return await get_executive_summary(arguments)
-        else:
+        registered = TOOL_REGISTRY.get(name)
+        if registered is None:
             raise ValueError(f"Unknown tool: {name}")
+        arguments = arguments or {}
+        try:
+            registered.validate(arguments)
+        except ValueError as e:
+            return [TextContent(type="text", text=f"Error: invalid arguments for {name}: {str(e)}")]
+        if registered.coalesce:
+            key = single_flight.key("tool", name, {**registered.defaults, **arguments})
+            return await single_flight.run(key, lambda: registered.handler(arguments))
+        try:
+            return await registered.handler(arguments)
+        finally:
+            single_flight.forget()
     except Exception as e:
         logger.error(f"Error in tool {name}: {str(e)}")
         return [TextContent(type="text", text=f"Error: {str(e)}")]
 
+# Read-through cache for get_student, get_faculty and get_course
+ENTITY_CACHE_TTL_SECONDS = _float_setting("ERP_ENTITY_CACHE_TTL_SECONDS", 60)
+ENTITY_CACHE_MAX_BYTES = _int_setting("ERP_ENTITY_CACHE_MAX_BYTES", 16 * 1024 * 1024)
+# Unique lookup fields of each cached collection, besides _id
+ENTITY_CACHE_KEYS = {"students": "roll", "faculties": "employeeId", "courses": "code"}
+
+class EntityCache:
+    """Bounded LRU + TTL cache of documents, reachable by _id or the collection's lookup field.
+    
+    Each document is stored once and sized by its BSON encoding; least recently
+    used entries are evicted to stay under max_bytes. Write tools invalidate by
+    _id (or by lookup value for inserts), and a lookup that raced with an
+    invalidation is not cached.
+    """
+
+    def __init__(self, max_bytes: int = ENTITY_CACHE_MAX_BYTES, ttl: float = ENTITY_CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._aliases: Dict[tuple, tuple] = {}
+        self._generation = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def _drop(self, entry_key: tuple):
+        entry = self._entries.pop(entry_key, None)
+        if entry:
+            self.bytes -= entry["size"]
+            for alias in entry["aliases"]:
+                self._aliases.pop(alias, None)
+
+    async def get(self, collection, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Return the document whose field equals value, from cache or with one find_one"""
+        name = collection.name
+        entry_key = self._aliases.get((name, field, value))
+        entry = self._entries.get(entry_key) if entry_key else None
+        if entry and entry["expires"] > time.monotonic():
+            self._entries.move_to_end(entry_key)
+            self.stats["hits"] += 1
+            return entry["doc"]
+        if entry:
+            self.stats["expirations"] += 1
+            self._drop(entry_key)
+        
+        self.stats["misses"] += 1
+        generation = self._generation
+        doc = await collection.find_one({field: value})
+        if doc is not None and generation == self._generation:
+            self._put(name, doc)
+        return doc
+
+    def _put(self, name: str, doc: Dict[str, Any]):
+        import bson
+        
+        entry_key = (name, doc["_id"])
+        self._drop(entry_key)
+        size = len(bson.encode(doc))
+        if size > self.max_bytes:
+            return
+        aliases = [(name, "_id", doc["_id"])]
+        lookup_field = ENTITY_CACHE_KEYS.get(name)
+        if lookup_field and doc.get(lookup_field) is not None:
+            aliases.append((name, lookup_field, doc[lookup_field]))
+        self._entries[entry_key] = {"doc": doc, "size": size, "aliases": aliases,
+                                    "expires": time.monotonic() + self.ttl}
+        for alias in aliases:
+            self._aliases[alias] = entry_key
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def invalidate(self, name: str, doc_id: Any):
+        """Forget a document after it was updated or deleted"""
+        self._generation += 1
+        if (name, doc_id) in self._entries:
+            self.stats["invalidations"] += 1
+            self._drop((name, doc_id))
+
+    def invalidate_keys(self, name: str, field: str, values):
+        """Forget documents by lookup value, e.g. after a bulk insert"""
+        self._generation += 1
+        for value in values:
+            entry_key = self._aliases.get((name, field, value))
+            if entry_key:
+                self.stats["invalidations"] += 1
+                self._drop(entry_key)
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hitRate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "maxBytes": self.max_bytes,
+            "ttlSeconds": self.ttl
+        }
+
+entity_cache = EntityCache()
+
 # Student Management Functions
+@tool
 async def get_student(args: Dict[str, Any]) -> List[TextContent]:
     """Get student information"""
     if "roll" in args:
-        student = await students_collection.find_one({"roll": args["roll"]})
+        student = await entity_cache.get(students_collection, "roll", args["roll"])
     elif "student_id" in args:
         try:
-            student = await students_collection.find_one({"_id": ObjectId(args["student_id"])})
+            student = await entity_cache.get(students_collection, "_id", ObjectId(args["student_id"]))
         except InvalidId:
             return [TextContent(type="text", text="Invalid student ID format")]
     else:
@@ -718,8 +1738,9 @@ async def get_student(args: Dict[str, Any]) -> List[TextContent]:
     if not student:
         return [TextContent(type="text", text="Student not found")]
     
-    return [TextContent(type="text", text=json.dumps(student, default=str))]
+    return [TextContent(type="text", text=to_json(student))]
 
+@tool
 async def create_student(args: Dict[str, Any]) -> List[TextContent]:
     """Create a new student"""
     try:
@@ -728,60 +1749,89 @@ async def create_student(args: Dict[str, Any]) -> List[TextContent]:
             "fullName": args["fullName"],
             "email": args["email"],
             "phone": args["phone"],
+            "semester": args.get("semester"),
             "isActive": args.get("isActive", True),
             "createdAt": datetime.now(),
             "updatedAt": datetime.now()
         }
         
         result = await students_collection.insert_one(student_data)
+        dashboard_state.active_changed("students", None, student_data["isActive"])
         return [TextContent(type="text", text=f"Student created successfully with ID: {result.inserted_id}")]
     except DuplicateKeyError:
         return [TextContent(type="text", text="Student with this roll number or email already exists")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error creating student: {str(e)}")]
 
+@tool
 async def update_student(args: Dict[str, Any]) -> List[TextContent]:
     """Update student information"""
     try:
         student_id = ObjectId(args["student_id"])
         update_data = {"updatedAt": datetime.now()}
         
-        for field in ["roll", "fullName", "email", "phone", "isActive"]:
+        for field in ["roll", "fullName", "email", "phone", "semester", "isActive"]:
             if field in args:
                 update_data[field] = args[field]
         
-        result = await students_collection.update_one(
+        before = await students_collection.find_one_and_update(
             {"_id": student_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection={"isActive": 1, "roll": 1},
+            return_document=ReturnDocument.BEFORE
         )
+        entity_cache.invalidate("students", student_id)
         
-        if result.matched_count == 0:
+        if before is None:
             return [TextContent(type="text", text="Student not found")]
         
+        if "isActive" in update_data:
+            dashboard_state.active_changed("students", before.get("isActive"), update_data["isActive"])
+        if "fullName" in update_data:
+            dashboard_state.student_renamed(update_data.get("roll", before["roll"]), update_data["fullName"])
+        
         return [TextContent(type="text", text="Student updated successfully")]
     except InvalidId:
         return [TextContent(type="text", text="Invalid student ID format")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error updating student: {str(e)}")]
 
+@tool
 async def delete_student(args: Dict[str, Any]) -> List[TextContent]:
     """Soft delete student"""
     try:
         student_id = ObjectId(args["student_id"])
-        result = await students_collection.update_one(
+        before = await students_collection.find_one_and_update(
             {"_id": student_id},
-            {"$set": {"isActive": False, "updatedAt": datetime.now()}}
+            {"$set": {"isActive": False, "updatedAt": datetime.now()}},
+            projection={"isActive": 1},
+            return_document=ReturnDocument.BEFORE
         )
+        entity_cache.invalidate("students", student_id)
         
-        if result.matched_count == 0:
+        if before is None:
             return [TextContent(type="text", text="Student not found")]
         
+        dashboard_state.active_changed("students", before.get("isActive"), False)
+        
         return [TextContent(type="text", text="Student deactivated successfully")]
     except InvalidId:
         return [TextContent(type="text", text="Invalid student ID format")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error deleting student: {str(e)}")]
 
+# Relevance-ranked search backed by the text indexes in INDEX_REGISTRY
+TEXT_SEARCH_LIMIT = 20
+
+async def _text_search(collection, text: str, query: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Run a $text search combined with the other filters, best matches first (at most MAX_PAGE_SIZE)"""
+    limit = min(max(int(limit), 1), MAX_PAGE_SIZE)
+    score = {"score": {"$meta": "textScore"}}
+    cursor = collection.find({**query, "$text": {"$search": text}}, score, max_time_ms=OPERATION_MAX_TIME_MS)
+    cursor = cursor.sort([("score", {"$meta": "textScore"})]).limit(limit)
+    return await cursor.to_list(length=limit)
+
+@tool
 async def search_students(args: Dict[str, Any]) -> List[TextContent]:
     """Search students with various criteria"""
     query = {}
@@ -801,18 +1851,22 @@ async def search_students(args: Dict[str, Any]) -> List[TextContent]:
     if "isActive" in args:
         query["isActive"] = args["isActive"]
     
-    cursor = students_collection.find(query)
-    students = await cursor.to_list(length=1000)
-    return [TextContent(type="text", text=json.dumps(students, default=str))]
+    if "text" in args:
+        students = await _text_search(students_collection, args["text"], query, args.get("limit", TEXT_SEARCH_LIMIT))
+        page = {"count": len(students), "truncated": False, "next_cursor": None}
+    else:
+        students, page = await _find_page(students_collection, query, args)
+    return _page_response(students, page)
 
 # Faculty Management Functions
+@tool
 async def get_faculty(args: Dict[str, Any]) -> List[TextContent]:
     """Get faculty information"""
     if "employee_id" in args:
-        faculty = await faculty_collection.find_one({"employeeId": args["employee_id"]})
+        faculty = await entity_cache.get(faculty_collection, "employeeId", args["employee_id"])
     elif "faculty_id" in args:
         try:
-            faculty = await faculty_collection.find_one({"_id": ObjectId(args["faculty_id"])})
+            faculty = await entity_cache.get(faculty_collection, "_id", ObjectId(args["faculty_id"]))
         except InvalidId:
             return [TextContent(type="text", text="Invalid faculty ID format")]
     else:
@@ -821,8 +1875,9 @@ async def get_faculty(args: Dict[str, Any]) -> List[TextContent]:
     if not faculty:
         return [TextContent(type="text", text="Faculty not found")]
     
-    return [TextContent(type="text", text=json.dumps(faculty, default=str))]
+    return [TextContent(type="text", text=to_json(faculty))]
 
+@tool
 async def create_faculty(args: Dict[str, Any]) -> List[TextContent]:
     """Create a new faculty member"""
     try:
@@ -838,12 +1893,14 @@ async def create_faculty(args: Dict[str, Any]) -> List[TextContent]:
         }
         
         result = await faculty_collection.insert_one(faculty_data)
+        dashboard_state.active_changed("faculty", None, faculty_data["isActive"])
         return [TextContent(type="text", text=f"Faculty created successfully with ID: {result.inserted_id}")]
     except DuplicateKeyError:
         return [TextContent(type="text", text="Faculty with this employee ID or email already exists")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error creating faculty: {str(e)}")]
 
+@tool
 async def update_faculty(args: Dict[str, Any]) -> List[TextContent]:
     """Update faculty information"""
     try:
@@ -854,32 +1911,44 @@ async def update_faculty(args: Dict[str, Any]) -> List[TextContent]:
             if field in args:
                 update_data[field] = args[field]
         
-        result = await faculty_collection.update_one(
+        before = await faculty_collection.find_one_and_update(
             {"_id": faculty_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection={"isActive": 1},
+            return_document=ReturnDocument.BEFORE
         )
+        entity_cache.invalidate("faculties", faculty_id)
         
-        if result.matched_count == 0:
+        if before is None:
             return [TextContent(type="text", text="Faculty not found")]
         
+        if "isActive" in update_data:
+            dashboard_state.active_changed("faculty", before.get("isActive"), update_data["isActive"])
+        
         return [TextContent(type="text", text="Faculty updated successfully")]
     except InvalidId:
         return [TextContent(type="text", text="Invalid faculty ID format")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error updating faculty: {str(e)}")]
 
+@tool
 async def delete_faculty(args: Dict[str, Any]) -> List[TextContent]:
     """Soft delete faculty"""
     try:
         faculty_id = ObjectId(args["faculty_id"])
-        result = await faculty_collection.update_one(
+        before = await faculty_collection.find_one_and_update(
             {"_id": faculty_id},
-            {"$set": {"isActive": False, "updatedAt": datetime.now()}}
+            {"$set": {"isActive": False, "updatedAt": datetime.now()}},
+            projection={"isActive": 1},
+            return_document=ReturnDocument.BEFORE
         )
+        entity_cache.invalidate("faculties", faculty_id)
         
-        if result.matched_count == 0:
+        if before is None:
             return [TextContent(type="text", text="Faculty not found")]
         
+        dashboard_state.active_changed("faculty", before.get("isActive"), False)
+        
         return [TextContent(type="text", text="Faculty deactivated successfully")]
     except InvalidId:
         return [TextContent(type="text", text="Invalid faculty ID format")]
@@ -887,13 +1956,14 @@ async def delete_faculty(args: Dict[str, Any]) -> List[TextContent]:
         return [TextContent(type="text", text=f"Error deleting faculty: {str(e)}")]
 
 # Course Management Functions
+@tool
 async def get_course(args: Dict[str, Any]) -> List[TextContent]:
     """Get course information"""
     if "code" in args:
-        course = await courses_collection.find_one({"code": args["code"]})
+        course = await entity_cache.get(courses_collection, "code", args["code"])
     elif "course_id" in args:
         try:
-            course = await courses_collection.find_one({"_id": ObjectId(args["course_id"])})
+            course = await entity_cache.get(courses_collection, "_id", ObjectId(args["course_id"]))
         except InvalidId:
             return [TextContent(type="text", text="Invalid course ID format")]
     else:
@@ -902,8 +1972,9 @@ async def get_course(args: Dict[str, Any]) -> List[TextContent]:
     if not course:
         return [TextContent(type="text", text="Course not found")]
     
-    return [TextContent(type="text", text=json.dumps(course, default=str))]
+    return [TextContent(type="text", text=to_json(course))]
 
+@tool
 async def create_course(args: Dict[str, Any]) -> List[TextContent]:
     """Create a new course"""
     try:
@@ -933,12 +2004,14 @@ async def create_course(args: Dict[str, Any]) -> List[TextContent]:
         }
         
         result = await courses_collection.insert_one(course_data)
+        dashboard_state.active_changed("courses", None, course_data["isActive"])
         return [TextContent(type="text", text=f"Course created successfully with ID: {result.inserted_id}")]
     except DuplicateKeyError:
         return [TextContent(type="text", text="Course with this code already exists")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error creating course: {str(e)}")]
 
+@tool
 async def update_course(args: Dict[str, Any]) -> List[TextContent]:
     """Update course information"""
     try:
@@ -963,39 +2036,112 @@ async def update_course(args: Dict[str, Any]) -> List[TextContent]:
             else:
                 update_data["facultyInCharge"] = None
         
-        result = await courses_collection.update_one(
+        before = await courses_collection.find_one_and_update(
             {"_id": course_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection={"isActive": 1},
+            return_document=ReturnDocument.BEFORE
         )
+        entity_cache.invalidate("courses", course_id)
         
-        if result.matched_count == 0:
+        if before is None:
             return [TextContent(type="text", text="Course not found")]
         
+        if "isActive" in update_data:
+            dashboard_state.active_changed("courses", before.get("isActive"), update_data["isActive"])
+        
         return [TextContent(type="text", text="Course updated successfully")]
     except InvalidId:
         return [TextContent(type="text", text="Invalid course ID format")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error updating course: {str(e)}")]
 
+@tool
 async def delete_course(args: Dict[str, Any]) -> List[TextContent]:
     """Soft delete course"""
     try:
         course_id = ObjectId(args["course_id"])
-        result = await courses_collection.update_one(
+        before = await courses_collection.find_one_and_update(
             {"_id": course_id},
-            {"$set": {"isActive": False, "updatedAt": datetime.now()}}
+            {"$set": {"isActive": False, "updatedAt": datetime.now()}},
+            projection={"isActive": 1},
+            return_document=ReturnDocument.BEFORE
         )
+        entity_cache.invalidate("courses", course_id)
         
-        if result.matched_count == 0:
+        if before is None:
             return [TextContent(type="text", text="Course not found")]
         
+        dashboard_state.active_changed("courses", before.get("isActive"), False)
+        
         return [TextContent(type="text", text="Course deactivated successfully")]
     except InvalidId:
         return [TextContent(type="text", text="Invalid course ID format")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error deleting course: {str(e)}")]
 
+# Compact attendance encoding. A month can be stored either as the expanded
+# "attendance" list of {date, status} subdocuments or packed into
+# "attendanceDays", one character per day of the month ("-" = not marked)
+# starting at "attendanceStart". Reads always return the expanded form.
+ATTENDANCE_ENCODING = os.getenv("ERP_ATTENDANCE_ENCODING", "expanded")
+PACKED_CODES = {"P": "P", "A": "A", "DNM": "D"}
+UNPACKED_STATUS = {code: status for status, code in PACKED_CODES.items()}
+UNMARKED_DAY = "-"
+
+def pack_attendance(records: List[Dict[str, Any]]) -> Optional[tuple]:
+    """Pack a month's records into (attendanceStart, attendanceDays).
+
+    Returns None when the records cannot round-trip through the packed form:
+    dates spanning several months, times other than midnight, repeated days
+    or unknown statuses.
+    """
+    if not records:
+        return None
+    first = records[0]["date"]
+    if not isinstance(first, datetime):
+        return None
+    days = [UNMARKED_DAY] * calendar.monthrange(first.year, first.month)[1]
+    for record in records:
+        day = record["date"]
+        if (not isinstance(day, datetime) or (day.year, day.month) != (first.year, first.month)
+                or day != datetime(day.year, day.month, day.day) or days[day.day - 1] != UNMARKED_DAY
+                or record.get("status") not in PACKED_CODES or len(record) != 2):
+            return None
+        days[day.day - 1] = PACKED_CODES[record["status"]]
+    return datetime(first.year, first.month, 1), "".join(days)
+
+def unpack_attendance(start: datetime, days: str) -> List[Dict[str, Any]]:
+    """Expand attendanceDays back into the {date, status} list, in date order"""
+    return [
+        {"date": start.replace(day=i + 1), "status": UNPACKED_STATUS[code]}
+        for i, code in enumerate(days) if code != UNMARKED_DAY
+    ]
+
+def packed_counts(days: str) -> Dict[str, Any]:
+    """Counters and percentage of a packed month.
+
+    str.count scans the whole month in C, one pass per status, instead of
+    visiting a subdocument per day.
+    """
+    present, absent = days.count("P"), days.count("A")
+    total = len(days) - days.count(UNMARKED_DAY)
+    return {
+        "totalDays": total,
+        "presentDays": present,
+        "absentDays": absent,
+        "attendancePercentage": round(present / total * 100, 2) if total else 0
+    }
+
+def decode_attendance(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return an attendance document in expanded form, whatever its storage form"""
+    if doc and "attendanceDays" in doc:
+        start, days = doc.pop("attendanceStart"), doc.pop("attendanceDays")
+        doc["attendance"] = unpack_attendance(start, days)
+    return doc
+
 # Attendance Management Functions
+@tool
 async def record_attendance(args: Dict[str, Any]) -> List[TextContent]:
     """Record attendance for a student"""
     try:
@@ -1023,30 +2169,252 @@ async def record_attendance(args: Dict[str, Any]) -> List[TextContent]:
             "updatedAt": datetime.now()
         }
         
-        # Calculate statistics
-        total_days = len(attendance_data["attendance"])
-        present_days = sum(1 for record in attendance_data["attendance"] if record["status"] == "P")
-        absent_days = sum(1 for record in attendance_data["attendance"] if record["status"] == "A")
-        attendance_percentage = (present_days / total_days * 100) if total_days > 0 else 0
-        
-        attendance_data.update({
-            "totalDays": total_days,
-            "presentDays": present_days,
-            "absentDays": absent_days,
-            "attendancePercentage": round(attendance_percentage, 2)
-        })
+        # Store the month packed when configured and the records allow it, computing
+        # the statistics on whichever form is stored; either way, drop the fields
+        # of the other form
+        packed = pack_attendance(attendance_records) if ATTENDANCE_ENCODING == "packed" else None
+        if packed:
+            attendance_data["attendanceStart"], attendance_data["attendanceDays"] = packed
+            del attendance_data["attendance"]
+            attendance_data.update(packed_counts(packed[1]))
+            unset = {"attendance": ""}
+        else:
+            total_days = len(attendance_records)
+            present_days = sum(1 for record in attendance_records if record["status"] == "P")
+            absent_days = sum(1 for record in attendance_records if record["status"] == "A")
+            attendance_data.update({
+                "totalDays": total_days,
+                "presentDays": present_days,
+                "absentDays": absent_days,
+                "attendancePercentage": round(present_days / total_days * 100, 2) if total_days > 0 else 0
+            })
+            unset = {"attendanceStart": "", "attendanceDays": ""}
+        attendance_percentage = attendance_data["attendancePercentage"]
         
         # Use upsert to handle existing records
-        result = await attendance_collection.update_one(
+        before = await attendance_collection.find_one_and_update(
             {"studentRoll": args["student_roll"], "month": args["month"], "year": args["year"]},
-            {"$set": attendance_data},
-            upsert=True
+            {"$set": attendance_data, "$unset": unset},
+            projection={"attendancePercentage": 1},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+        await dashboard_state.attendance_changed(
+            args["student_roll"], args["month"], args["year"], student["fullName"],
+            before.get("attendancePercentage") if before else None, attendance_data["attendancePercentage"]
         )
         
         return [TextContent(type="text", text=f"Attendance recorded successfully. Percentage: {attendance_percentage:.2f}%")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error recording attendance: {str(e)}")]
 
+# Single-day attendance marks, applied in place by one update pipeline
+ATTENDANCE_COUNTERS = {"P": "presentDays", "A": "absentDays"}
+
+def _month_label(day: datetime) -> str:
+    """Month key used by attendance documents, e.g. 'January 2025'"""
+    return f"{calendar.month_name[day.month]} {day.year}"
+
+def _mark_day_pipeline(student_id: ObjectId, day: datetime, status: str) -> List[Dict[str, Any]]:
+    """Update pipeline that sets one day's status and adjusts the month counters.
+
+    The previous status of the day (if any) is looked up server-side, so the
+    counters move by +/-1 instead of being recounted from the whole month.
+    Months keep their storage form; new months use ATTENDANCE_ENCODING.
+    """
+    def is_status(expr, value):
+        return {"$cond": [{"$eq": [expr, value]}, 1, 0]}
+    
+    def is_null(field):
+        return {"$eq": [{"$ifNull": [field, None]}, None]}
+    
+    index = day.day - 1
+    month_days = calendar.monthrange(day.year, day.month)[1]
+    packed_days = {"$ifNull": ["$attendanceDays", UNMARKED_DAY * month_days]}
+    expanded_previous = {"$arrayElemAt": [{"$map": {
+        "input": {"$filter": {"input": {"$ifNull": ["$attendance", []]}, "cond": {"$eq": ["$$this.date", day]}}},
+        "in": "$$this.status"
+    }}, 0]}
+    packed_previous = {"$switch": {"branches": [
+        {"case": {"$eq": [{"$substrCP": [packed_days, index, 1]}, code]}, "then": name}
+        for name, code in PACKED_CODES.items()
+    ], "default": None}}
+    present_delta = {"$subtract": [is_status(status, "P"), is_status("$_previous", "P")]}
+    absent_delta = {"$subtract": [is_status(status, "A"), is_status("$_previous", "A")]}
+    return [
+        {"$set": {
+            "_packed": {"$or": [
+                {"$not": [is_null("$attendanceDays")]},
+                {"$and": [is_null("$attendance"), ATTENDANCE_ENCODING == "packed"]}
+            ]},
+            "_previous": {"$ifNull": [expanded_previous, packed_previous]}
+        }},
+        {"$set": {
+            "attendance": {"$cond": ["$_packed", "$$REMOVE", {"$cond": [
+                {"$eq": ["$_previous", None]},
+                {"$concatArrays": [{"$ifNull": ["$attendance", []]}, [{"date": day, "status": status}]]},
+                {"$map": {"input": "$attendance", "in": {"$cond": [
+                    {"$eq": ["$$this.date", day]}, {"date": day, "status": status}, "$$this"
+                ]}}}
+            ]}]},
+            "attendanceDays": {"$cond": ["$_packed", {"$concat": [
+                {"$substrCP": [packed_days, 0, index]},
+                PACKED_CODES[status],
+                {"$substrCP": [packed_days, index + 1, month_days]}
+            ]}, "$$REMOVE"]},
+            "attendanceStart": {"$cond": ["$_packed", datetime(day.year, day.month, 1), "$$REMOVE"]},
+            "totalDays": {"$add": [{"$ifNull": ["$totalDays", 0]},
+                                   {"$cond": [{"$eq": ["$_previous", None]}, 1, 0]}]},
+            "presentDays": {"$add": [{"$ifNull": ["$presentDays", 0]}, present_delta]},
+            "absentDays": {"$add": [{"$ifNull": ["$absentDays", 0]}, absent_delta]},
+            "student": student_id,
+            "createdAt": {"$ifNull": ["$createdAt", "$$NOW"]},
+            "updatedAt": "$$NOW"
+        }},
+        {"$set": {"attendancePercentage": {"$round": [
+            {"$multiply": [{"$divide": ["$presentDays", "$totalDays"]}, 100]}, 2
+        ]}}},
+        {"$unset": ["_previous", "_packed"]}
+    ]
+
+def _marked_day_result(before: Optional[Dict[str, Any]], day: datetime, status: str):
+    """Previous status of the marked day and the month's percentage after the pipeline ran.
+
+    before holds the document's counters and the marked day (via $elemMatch,
+    or attendanceDays when packed) as they were before the write, or None if
+    the month was just created.
+    """
+    before = before or {}
+    if "attendanceDays" in before:
+        previous = UNPACKED_STATUS.get(before["attendanceDays"][day.day - 1])
+    else:
+        previous = (before.get("attendance") or [{}])[0].get("status")
+    counts = {"totalDays": before.get("totalDays", 0) + (previous is None)}
+    for code, field in ATTENDANCE_COUNTERS.items():
+        counts[field] = before.get(field, 0) + (status == code) - (previous == code)
+    return previous, round(counts["presentDays"] / counts["totalDays"] * 100, 2)
+
+@tool
+async def mark_attendance_day(args: Dict[str, Any]) -> List[TextContent]:
+    """Mark one student's attendance for a single day"""
+    try:
+        day = datetime.strptime(args["date"], "%Y-%m-%d")
+        status = args["status"]
+        month = _month_label(day)
+        student = await students_collection.find_one({"roll": args["student_roll"]}, {"fullName": 1})
+        if not student:
+            return [TextContent(type="text", text="Student not found")]
+        
+        # Only the counters and the marked day come back, so the percentage
+        # after the write is derived locally instead of re-reading the month
+        before = await attendance_collection.find_one_and_update(
+            {"studentRoll": args["student_roll"], "month": month, "year": day.year},
+            _mark_day_pipeline(student["_id"], day, status),
+            projection={"totalDays": 1, "presentDays": 1, "attendancePercentage": 1,
+                        "attendance": {"$elemMatch": {"date": day}}, "attendanceDays": 1},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+        previous, percentage = _marked_day_result(before, day, status)
+        await dashboard_state.attendance_changed(
+            args["student_roll"], month, day.year, student["fullName"],
+            (before or {}).get("attendancePercentage"), percentage
+        )
+        
+        change = f"changed from {previous} to {status}" if previous else f"marked {status}"
+        return [TextContent(type="text", text=f"Attendance for {args['date']} {change}. Percentage: {percentage:.2f}%")]
+    except Exception as e:
+        return [TextContent(type="text", text=f"Error marking attendance: {str(e)}")]
+
+@tool
+async def record_class_attendance(args: Dict[str, Any]) -> List[TextContent]:
+    """Mark one day's attendance for a whole class in a single bulk write"""
+    try:
+        day = datetime.strptime(args["date"], "%Y-%m-%d")
+        month = _month_label(day)
+        
+        if "course_code" in args:
+            course = await courses_collection.find_one({"code": args["course_code"]}, {"semester": 1})
+            if not course:
+                return [TextContent(type="text", text=f"Course {args['course_code']} not found")]
+            if "semester" in args and course.get("semester") != args["semester"]:
+                return [TextContent(type="text", text=f"Course {args['course_code']} is not offered in semester {args['semester']}")]
+        
+        outcomes: Dict[int, str] = {}
+        marks: Dict[int, str] = {}
+        for entry in args["records"]:
+            if entry["roll"] in marks:
+                outcomes[entry["roll"]] = "duplicate roll in request"
+            else:
+                marks[entry["roll"]] = entry["status"]
+        
+        students = await StudentLoader(STUDENT_NAME_PROJECTION).load_many(marks)
+        for roll in marks.keys() - students.keys():
+            outcomes.setdefault(roll, "student not found")
+        rolls = [roll for roll in marks if roll in students and roll not in outcomes]
+        
+        # Counters and the marked day as they were before the write, one query
+        # for the class, so outcomes and dashboard updates need no re-read
+        before = {
+            doc["studentRoll"]: doc
+            async for doc in attendance_collection.find(
+                {"studentRoll": {"$in": rolls}, "month": month, "year": day.year},
+                {"studentRoll": 1, "totalDays": 1, "presentDays": 1, "attendancePercentage": 1,
+                 "attendance": {"$elemMatch": {"date": day}}, "attendanceDays": 1}
+            )
+        }
+        
+        failed = set()
+        if rolls:
+            operations = [
+                UpdateOne(
+                    {"studentRoll": roll, "month": month, "year": day.year},
+                    _mark_day_pipeline(students[roll]["_id"], day, marks[roll]),
+                    upsert=True
+                )
+                for roll in rolls
+            ]
+            try:
+                await attendance_collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                for write_error in e.details.get("writeErrors", []):
+                    roll = rolls[write_error["index"]]
+                    failed.add(roll)
+                    outcomes[roll] = f"error: {write_error.get('errmsg', 'write failed')}"
+        
+        for roll in rolls:
+            if roll in failed:
+                continue
+            status = marks[roll]
+            previous, percentage = _marked_day_result(before.get(roll), day, status)
+            if previous is None:
+                outcomes[roll] = "marked"
+            elif previous == status:
+                outcomes[roll] = "unchanged"
+            else:
+                outcomes[roll] = f"changed from {previous}"
+            await dashboard_state.attendance_changed(
+                roll, month, day.year, students[roll]["fullName"],
+                before.get(roll, {}).get("attendancePercentage"), percentage
+            )
+        
+        summary = {
+            "date": args["date"],
+            "month": month,
+            "course_code": args.get("course_code"),
+            "semester": args.get("semester"),
+            "total": len(args["records"]),
+            "written": len(rolls) - len(failed),
+            "outcomes": [
+                {"roll": entry["roll"], "status": entry["status"], "outcome": outcomes[entry["roll"]]}
+                for entry in args["records"]
+            ]
+        }
+        return [TextContent(type="text", text=to_json(summary))]
+    except Exception as e:
+        return [TextContent(type="text", text=f"Error recording class attendance: {str(e)}")]
+
+@tool
 async def get_attendance(args: Dict[str, Any]) -> List[TextContent]:
     """Get attendance records for a student"""
     try:
@@ -1057,12 +2425,14 @@ async def get_attendance(args: Dict[str, Any]) -> List[TextContent]:
         if "year" in args:
             query["year"] = args["year"]
         
-        cursor = attendance_collection.find(query)
-        attendance_records = await cursor.to_list(length=1000)
-        return [TextContent(type="text", text=json.dumps(attendance_records, default=str))]
+        attendance_records, page = await _find_page(attendance_collection, query, args)
+        return _page_response([decode_attendance(r) for r in attendance_records], page)
     except Exception as e:
         return [TextContent(type="text", text=f"Error getting attendance: {str(e)}")]
 
+LOW_ATTENDANCE_LIST_LIMIT = 100
+
+@tool
 async def calculate_attendance_stats(args: Dict[str, Any]) -> List[TextContent]:
     """Calculate attendance statistics"""
     try:
@@ -1075,43 +2445,134 @@ async def calculate_attendance_stats(args: Dict[str, Any]) -> List[TextContent]:
         if "year" in args:
             query["year"] = args["year"]
         
-        cursor = attendance_collection.find(query)
-        records = await cursor.to_list(length=1000)
-        
-        if not records:
+        # Totals over every matching month in one aggregation; only the lowest
+        # LOW_ATTENDANCE_LIST_LIMIT months below 75% are listed by name
+        below = {"$match": {"attendancePercentage": {"$lt": 75}}}
+        facets = await _aggregate(attendance_collection, [
+            {"$match": query},
+            {"$facet": {
+                "totals": [
+                    {"$group": {"_id": "$studentRoll", "days": {"$sum": "$totalDays"}, "present": {"$sum": "$presentDays"}}},
+                    {"$group": {"_id": None, "students": {"$sum": 1}, "days": {"$sum": "$days"}, "present": {"$sum": "$present"}}}
+                ],
+                "low": [
+                    below,
+                    {"$sort": {"attendancePercentage": 1, "_id": 1}},
+                    {"$limit": LOW_ATTENDANCE_LIST_LIMIT},
+                    {"$project": {"_id": 0, "studentRoll": 1, "attendancePercentage": 1}}
+                ],
+                "lowCount": [below, {"$count": "count"}]
+            }}
+        ])
+        totals = facets[0]["totals"][0] if facets[0]["totals"] else None
+        if not totals or not totals["students"]:
             return [TextContent(type="text", text="No attendance records found")]
         
         # Calculate overall statistics
-        total_students = len(set(record["studentRoll"] for record in records))
-        total_days = sum(record["totalDays"] for record in records)
-        total_present = sum(record["presentDays"] for record in records)
+        total_students = totals["students"]
+        total_days = totals["days"]
+        total_present = totals["present"]
         overall_percentage = (total_present / total_days * 100) if total_days > 0 else 0
         
         # Find students with low attendance (< 75%)
+        low_records = facets[0]["low"]
+        students = await StudentLoader(STUDENT_NAME_PROJECTION).load_many(r["studentRoll"] for r in low_records)
         low_attendance_students = []
-        for record in records:
-            if record["attendancePercentage"] < 75:
-                student = await students_collection.find_one({"roll": record["studentRoll"]})
-                if student:
-                    low_attendance_students.append({
-                        "roll": record["studentRoll"],
-                        "name": student["fullName"],
-                        "percentage": record["attendancePercentage"]
-                    })
+        for record in low_records:
+            student = students.get(record["studentRoll"])
+            if student:
+                low_attendance_students.append({
+                    "roll": record["studentRoll"],
+                    "name": student["fullName"],
+                    "percentage": record["attendancePercentage"]
+                })
         
         stats = {
             "total_students": total_students,
             "total_days": total_days,
             "total_present": total_present,
             "overall_percentage": round(overall_percentage, 2),
+            "low_attendance_count": facets[0]["lowCount"][0]["count"] if facets[0]["lowCount"] else 0,
             "low_attendance_students": low_attendance_students
         }
         
-        return [TextContent(type="text", text=json.dumps(stats, default=str))]
+        return [TextContent(type="text", text=to_json(stats))]
     except Exception as e:
         return [TextContent(type="text", text=f"Error calculating attendance stats: {str(e)}")]
 
+MIGRATION_BATCH_SIZE = 1000
+
+@tool
+async def migrate_attendance_encoding(args: Dict[str, Any]) -> List[TextContent]:
+    """Convert stored attendance months between the expanded and packed forms.
+
+    Each batch is one keyset-paged read and one unordered bulk_write. A write
+    only applies if the document's updatedAt is unchanged since it was read,
+    so a month marked during the migration is left for the next run.
+    """
+    import bson
+    
+    try:
+        target = args["to"]
+        batch_size = min(max(int(args.get("batch_size", MIGRATION_BATCH_SIZE)), 1), MAX_BULK_BATCH_SIZE)
+        dry_run = args.get("dry_run", False)
+        source_field = "attendance" if target == "packed" else "attendanceDays"
+        stats = {"to": target, "dry_run": dry_run, "converted": 0, "skipped": 0, "changed_concurrently": 0,
+                 "counters_fixed": 0, "bytes_before": 0, "bytes_after": 0, "skipped_ids": []}
+        
+        after = None
+        while True:
+            query = {source_field: {"$exists": True}}
+            if after is not None:
+                query["_id"] = {"$gt": after}
+            docs = await attendance_collection.find(query).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+            if not docs:
+                break
+            after = docs[-1]["_id"]
+            
+            operations = []
+            for doc in docs:
+                if target == "packed":
+                    packed = pack_attendance(doc["attendance"])
+                    if packed is None:
+                        stats["skipped"] += 1
+                        if len(stats["skipped_ids"]) < 20:
+                            stats["skipped_ids"].append(doc["_id"])
+                        continue
+                    # Counters are recomputed from the packed days, repairing any that drifted
+                    counts = packed_counts(packed[1])
+                    if any(doc.get(field) != value for field, value in counts.items()):
+                        stats["counters_fixed"] += 1
+                    converted = {k: v for k, v in doc.items() if k != "attendance"}
+                    converted["attendanceStart"], converted["attendanceDays"] = packed
+                    converted.update(counts)
+                    update = {"$set": {"attendanceStart": packed[0], "attendanceDays": packed[1], **counts},
+                              "$unset": {"attendance": ""}}
+                else:
+                    converted = decode_attendance(dict(doc))
+                    update = {"$set": {"attendance": converted["attendance"]},
+                              "$unset": {"attendanceStart": "", "attendanceDays": ""}}
+                stats["bytes_before"] += len(bson.encode(doc))
+                stats["bytes_after"] += len(bson.encode(converted))
+                operations.append(UpdateOne({"_id": doc["_id"], "updatedAt": doc.get("updatedAt")}, update))
+            
+            if operations and not dry_run:
+                result = await attendance_collection.bulk_write(operations, ordered=False)
+                stats["converted"] += result.modified_count
+                stats["changed_concurrently"] += len(operations) - result.matched_count
+            elif dry_run:
+                stats["converted"] += len(operations)
+            if len(docs) < batch_size:
+                break
+        
+        if stats["bytes_before"]:
+            stats["size_ratio"] = round(stats["bytes_after"] / stats["bytes_before"], 3)
+        return [TextContent(type="text", text=to_json(stats))]
+    except Exception as e:
+        return [TextContent(type="text", text=f"Error migrating attendance encoding: {str(e)}")]
+
 # Leave Request Management Functions
+@tool
 async def create_leave_request(args: Dict[str, Any]) -> List[TextContent]:
     """Create a new leave request"""
     try:
@@ -1138,10 +2599,12 @@ async def create_leave_request(args: Dict[str, Any]) -> List[TextContent]:
         }
         
         result = await leave_requests_collection.insert_one(leave_data)
+        dashboard_state.leave_status_changed(None, "pending")
         return [TextContent(type="text", text=f"Leave request created successfully with ID: {result.inserted_id}")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error creating leave request: {str(e)}")]
 
+@tool
 async def update_leave_request(args: Dict[str, Any]) -> List[TextContent]:
     """Update leave request status"""
     try:
@@ -1156,20 +2619,25 @@ async def update_leave_request(args: Dict[str, Any]) -> List[TextContent]:
         if "comments" in args:
             update_data["comments"] = args["comments"]
         
-        result = await leave_requests_collection.update_one(
+        before = await leave_requests_collection.find_one_and_update(
             {"_id": leave_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection={"status": 1},
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.matched_count == 0:
+        if before is None:
             return [TextContent(type="text", text="Leave request not found")]
         
+        dashboard_state.leave_status_changed(before.get("status"), update_data["status"])
+        
         return [TextContent(type="text", text=f"Leave request {args['status']} successfully")]
     except InvalidId:
         return [TextContent(type="text", text="Invalid leave request ID format")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error updating leave request: {str(e)}")]
 
+@tool
 async def get_leave_requests(args: Dict[str, Any]) -> List[TextContent]:
     """Get leave requests with optional filtering"""
     try:
@@ -1188,13 +2656,100 @@ async def get_leave_requests(args: Dict[str, Any]) -> List[TextContent]:
             if date_query:
                 query["startDate"] = date_query
         
-        cursor = leave_requests_collection.find(query)
-        leave_requests = await cursor.to_list(length=1000)
-        return [TextContent(type="text", text=json.dumps(leave_requests, default=str))]
+        leave_requests, page = await _find_page(leave_requests_collection, query, args)
+        return _page_response(leave_requests, page)
     except Exception as e:
         return [TextContent(type="text", text=f"Error getting leave requests: {str(e)}")]
 
 # Timetable Management Functions
+# Global room/faculty occupancy across all active timetables, used to reject
+# double bookings at write time and to report conflicts without rescanning
+TIMETABLE_INDEX_REFRESH_SECONDS = _float_setting("ERP_TIMETABLE_INDEX_REFRESH_SECONDS", 300)
+
+class TimetableOccupancy:
+    """Occupancy index keyed by (dayOfWeek, period).
+    
+    Each key maps rooms and faculty ids to the slots booked there, across all
+    semesters. It is built in one pass over active timetables, kept current by
+    create_timetable, and rebuilt when older than the refresh interval so
+    timetables written by other processes are picked up.
+    """
+
+    def __init__(self):
+        self.slots: Dict[tuple, Dict[str, Dict[Any, List[Dict[str, Any]]]]] = {}
+        self.built_at: Optional[float] = None
+        self.lock = asyncio.Lock()
+
+    @staticmethod
+    def _bookings(timetable: Dict[str, Any]):
+        """Yield (key, kind, resource, booking) for every room and faculty a timetable occupies"""
+        for slot in timetable["slots"]:
+            if not slot.get("period"):
+                continue
+            key = (timetable["dayOfWeek"], slot["period"])
+            booking = {"semester": timetable["semester"], "courseCode": slot.get("courseCode"),
+                       "timetable_id": timetable.get("_id")}
+            if slot.get("room"):
+                yield key, "rooms", slot["room"], booking
+            if slot.get("faculty"):
+                yield key, "faculty", slot["faculty"], booking
+
+    def add(self, timetable: Dict[str, Any]):
+        for key, kind, resource, booking in self._bookings(timetable):
+            occupied = self.slots.setdefault(key, {"rooms": {}, "faculty": {}})
+            occupied[kind].setdefault(resource, []).append(booking)
+
+    async def build(self):
+        """Rebuild the index with one pass over all active timetables"""
+        self.slots = {}
+        projection = {"dayOfWeek": 1, "semester": 1, "slots.period": 1, "slots.room": 1,
+                      "slots.faculty": 1, "slots.courseCode": 1}
+        async for timetable in timetables_collection.find({"isActive": True}, projection):
+            self.add(timetable)
+        self.built_at = asyncio.get_running_loop().time()
+
+    async def ensure_current(self):
+        if (self.built_at is None
+                or asyncio.get_running_loop().time() - self.built_at > TIMETABLE_INDEX_REFRESH_SECONDS):
+            await self.build()
+
+    def conflicts_with(self, timetable: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Bookings in timetable that collide with the index or with each other, in O(slots)"""
+        conflicts = []
+        pending: Dict[tuple, Dict[str, Any]] = {}
+        for key, kind, resource, booking in self._bookings(timetable):
+            taken = self.slots.get(key, {}).get(kind, {}).get(resource, []) + pending.get((key, kind, resource), [])
+            if taken:
+                conflicts.append(self._describe(key, kind, resource, taken + [booking]))
+            pending.setdefault((key, kind, resource), []).append(booking)
+        return conflicts
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Every room or faculty booked more than once for the same day and period"""
+        return [
+            self._describe(key, kind, resource, bookings)
+            for key, occupied in self.slots.items()
+            for kind, resources in occupied.items()
+            for resource, bookings in resources.items() if len(bookings) > 1
+        ]
+
+    @staticmethod
+    def _describe(key: tuple, kind: str, resource: Any, bookings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        day, period = key
+        label = "Room" if kind == "rooms" else "Faculty"
+        semesters = sorted({b["semester"] for b in bookings})
+        return {
+            "day": day,
+            "period": period,
+            "room" if kind == "rooms" else "faculty": str(resource),
+            "bookings": bookings,
+            "conflict": f"{label} {resource} booked {len(bookings)} times on {day} period {period} "
+                        f"(semesters {', '.join(map(str, semesters))})"
+        }
+
+timetable_occupancy = TimetableOccupancy()
+
+@tool
 async def create_timetable(args: Dict[str, Any]) -> List[TextContent]:
     """Create timetable for a day and semester"""
     try:
@@ -1233,11 +2788,20 @@ async def create_timetable(args: Dict[str, Any]) -> List[TextContent]:
             "updatedAt": datetime.now()
         }
         
-        result = await timetables_collection.insert_one(timetable_data)
+        # Check and insert under the lock so concurrent creates cannot both
+        # claim the same room or faculty slot
+        async with timetable_occupancy.lock:
+            await timetable_occupancy.ensure_current()
+            conflicts = timetable_occupancy.conflicts_with(timetable_data)
+            if conflicts:
+                return [TextContent(type="text", text="Timetable not created, double booking found: " + to_json(conflicts))]
+            result = await timetables_collection.insert_one(timetable_data)
+            timetable_occupancy.add(timetable_data)
         return [TextContent(type="text", text=f"Timetable created successfully with ID: {result.inserted_id}")]
     except Exception as e:
         return [TextContent(type="text", text=f"Error creating timetable: {str(e)}")]
 
+@tool
 async def get_timetable(args: Dict[str, Any]) -> List[TextContent]:
     """Get timetable for a specific day and semester"""
     try:
@@ -1250,10 +2814,11 @@ async def get_timetable(args: Dict[str, Any]) -> List[TextContent]:
         if not timetable:
             return [TextContent(type="text", text="Timetable not found")]
         
-        return [TextContent(type="text", text=json.dumps(timetable, default=str))]
+        return [TextContent(type="text", text=to_json(timetable))]
     except Exception as e:
         return [TextContent(type="text", text=f"Error getting timetable: {str(e)}")]
 
+@tool
 async def get_weekly_timetable(args: Dict[str, Any]) -> List[TextContent]:
     """Get complete weekly timetable for a semester"""
     try:
@@ -1268,99 +2833,452 @@ async def get_weekly_timetable(args: Dict[str, Any]) -> List[TextContent]:
         for timetable in timetables:
             weekly_schedule[timetable["dayOfWeek"]] = timetable
         
-        return [TextContent(type="text", text=json.dumps(weekly_schedule, default=str))]
+        return [TextContent(type="text", text=to_json(weekly_schedule))]
     except Exception as e:
         return [TextContent(type="text", text=f"Error getting weekly timetable: {str(e)}")]
 
-# Dashboard helper (for erp://dashboard resource)
-async def _get_dashboard_data() -> str:
-    """Generate real-time dashboard data"""
-    total_students = await students_collection.count_documents({"isActive": True})
-    total_faculty = await faculty_collection.count_documents({"isActive": True})
-    total_courses = await courses_collection.count_documents({"isActive": True})
-    pending_leaves = await leave_requests_collection.count_documents({"status": "pending"})
-    
-    low_attendance_cursor = attendance_collection.find({"attendancePercentage": {"$lt": 75}})
-    at_risk = await low_attendance_cursor.to_list(length=50)
-    at_risk_students = []
-    for r in at_risk[:10]:
-        s = await students_collection.find_one({"roll": r["studentRoll"]})
-        if s:
-            at_risk_students.append({"roll": r["studentRoll"], "name": s["fullName"], "percentage": r["attendancePercentage"]})
-    
-    dashboard = {
-        "generatedAt": datetime.now().isoformat(),
-        "summary": {
-            "students": total_students,
-            "faculty": total_faculty,
-            "courses": total_courses,
-        },
-        "alerts": {
-            "pendingLeaveRequests": pending_leaves,
-            "studentsAtRiskCount": len(at_risk),
-            "studentsAtRisk": at_risk_students,
+# Analytics engine: one aggregation per collection, run concurrently
+def _active_split(groups: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Turn $group-by-isActive output into active/inactive counts"""
+    counts = {group["_id"]: group["count"] for group in groups}
+    return {"active": counts.get(True, 0), "inactive": counts.get(False, 0)}
+
+def _facet_count(facet: List[Dict[str, Any]]) -> int:
+    """Read a {"$count": "count"} facet, which is empty when nothing matched"""
+    return facet[0]["count"] if facet else 0
+
+async def _aggregate(collection, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return await collection.aggregate(pipeline, maxTimeMS=OPERATION_MAX_TIME_MS).to_list(length=None)
+
+async def get_erp_counts() -> Dict[str, Dict[str, int]]:
+    """Compute every system-wide count in one concurrent round of aggregations.
+    
+    Shared by get_erp_analytics, get_executive_summary and the dashboard resource.
+    """
+    by_active = [{"$group": {"_id": "$isActive", "count": {"$sum": 1}}}]
+    by_status = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+    attendance_facets = [{"$facet": {
+        "total": [{"$count": "count"}],
+        "atRisk": [
+            {"$match": {"attendancePercentage": {"$lt": AT_RISK_THRESHOLD}}},
+            {"$count": "count"}
+        ]
+    }}]
+    
+    students, faculty, courses, attendance, leaves, timetables = await asyncio.gather(
+        _aggregate(students_collection, by_active),
+        _aggregate(faculty_collection, by_active),
+        _aggregate(courses_collection, by_active),
+        _aggregate(attendance_collection, attendance_facets),
+        _aggregate(leave_requests_collection, by_status),
+        _aggregate(timetables_collection, by_active),
+    )
+    
+    leave_counts = {group["_id"]: group["count"] for group in leaves}
+    attendance = attendance[0] if attendance else {"total": [], "atRisk": []}
+    return {
+        "students": _active_split(students),
+        "faculty": _active_split(faculty),
+        "courses": _active_split(courses),
+        "attendance": {
+            "total_records": _facet_count(attendance["total"]),
+            "at_risk": _facet_count(attendance["atRisk"])
         },
+        "leave_requests": {status: leave_counts.get(status, 0) for status in ("pending", "approved", "rejected")},
+        "timetables": _active_split(timetables)
     }
-    return json.dumps(dashboard, indent=2, default=str)
+
+# Dashboard helper (for erp://dashboard resource)
+DASHBOARD_PREVIEW_SIZE = 10
+DASHBOARD_RESYNC_SECONDS = _float_setting("ERP_DASHBOARD_RESYNC_SECONDS", 300)
+# Recounts repeated when write hooks fire while one is running
+DASHBOARD_SEED_ATTEMPTS = 3
+
+async def _load_at_risk_preview() -> List[Dict[str, Any]]:
+    """Fetch the first at-risk attendance records with student names"""
+    at_risk = await attendance_collection.find(
+        {"attendancePercentage": {"$lt": AT_RISK_THRESHOLD}}
+    ).to_list(length=DASHBOARD_PREVIEW_SIZE)
+    students = await StudentLoader(STUDENT_NAME_PROJECTION).load_many(r["studentRoll"] for r in at_risk)
+    preview = []
+    for r in at_risk:
+        s = students.get(r["studentRoll"])
+        if s:
+            preview.append({
+                "key": (r["studentRoll"], r.get("month"), r.get("year")),
+                "roll": r["studentRoll"],
+                "name": s["fullName"],
+                "percentage": r["attendancePercentage"]
+            })
+    return preview
+
+def _is_at_risk(percentage: Optional[float]) -> bool:
+    return percentage is not None and percentage < AT_RISK_THRESHOLD
+
+class DashboardState:
+    """Live dashboard counters, seeded once and then kept current by the write tools.
+    
+    Reads are served from memory. Writes made outside this process (e.g. by the
+    ERP frontend) are picked up by a periodic background resync, which also
+    logs any drift found against a full recount.
+    """
+
+    def __init__(self):
+        self.counts = {"students": 0, "faculty": 0, "courses": 0, "pendingLeaveRequests": 0, "studentsAtRisk": 0}
+        self.at_risk_preview: List[Dict[str, Any]] = []
+        self.seeded_at: Optional[float] = None
+        # Bumped by every write hook, so seed() can tell whether a write raced its recount
+        self.generation = 0
+        self._resync_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _counts_from(erp_counts: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+        return {
+            "students": erp_counts["students"]["active"],
+            "faculty": erp_counts["faculty"]["active"],
+            "courses": erp_counts["courses"]["active"],
+            "pendingLeaveRequests": erp_counts["leave_requests"]["pending"],
+            "studentsAtRisk": erp_counts["attendance"]["at_risk"]
+        }
+
+    async def seed(self):
+        """Load counters and the at-risk preview with a full recount.
+        
+        A write made while the recount runs may or may not be included in it, so
+        the recount is repeated until one completes without a write hook firing.
+        If writes keep racing, a seeded state keeps its live counters (the next
+        resync tries again) and an unseeded one takes the last recount.
+        """
+        for _ in range(DASHBOARD_SEED_ATTEMPTS):
+            generation = self.generation
+            erp_counts, preview = await asyncio.gather(get_erp_counts(), _load_at_risk_preview())
+            if self.generation == generation:
+                break
+        else:
+            if self.seeded_at is not None:
+                logger.info("Dashboard recount raced with writes; keeping live counters")
+                self.seeded_at = asyncio.get_running_loop().time()
+                return
+        self.counts = self._counts_from(erp_counts)
+        self.at_risk_preview = preview
+        self.seeded_at = asyncio.get_running_loop().time()
+
+    async def verify(self) -> Dict[str, Any]:
+        """Compare the live counters against a full recount"""
+        expected = self._counts_from(await get_erp_counts())
+        drift = {
+            key: {"live": self.counts[key], "recount": expected[key]}
+            for key in expected if self.counts[key] != expected[key]
+        }
+        return {"consistent": not drift, "drift": drift}
+
+    async def _resync(self):
+        try:
+            report = await self.verify()
+            if not report["consistent"]:
+                logger.warning(f"Dashboard counters drifted, reseeding: {report['drift']}")
+            await self.seed()
+        except Exception as e:
+            logger.error(f"Dashboard resync failed: {str(e)}")
+        finally:
+            self._resync_task = None
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Return the dashboard from memory, seeding on first use"""
+        if self.seeded_at is None:
+            await self.seed()
+        elif (self._resync_task is None
+              and asyncio.get_running_loop().time() - self.seeded_at > DASHBOARD_RESYNC_SECONDS):
+            self._resync_task = asyncio.create_task(self._resync())
+        return {
+            "generatedAt": datetime.now().isoformat(),
+            "summary": {
+                "students": self.counts["students"],
+                "faculty": self.counts["faculty"],
+                "courses": self.counts["courses"],
+            },
+            "alerts": {
+                "pendingLeaveRequests": self.counts["pendingLeaveRequests"],
+                "studentsAtRiskCount": self.counts["studentsAtRisk"],
+                "studentsAtRisk": [
+                    {"roll": p["roll"], "name": p["name"], "percentage": p["percentage"]}
+                    for p in self.at_risk_preview
+                ],
+            },
+        }
+
+    # Write hooks, called by the tool functions after a successful write
+    def active_changed(self, collection: str, before: Optional[bool], after: Optional[bool], count: int = 1):
+        """Adjust an active count for created (before=None), updated or deactivated records"""
+        self.generation += 1
+        if self.seeded_at is None:
+            return
+        self.counts[collection] += (int(after is True) - int(before is True)) * count
+
+    def leave_status_changed(self, before: Optional[str], after: Optional[str]):
+        self.generation += 1
+        if self.seeded_at is None:
+            return
+        self.counts["pendingLeaveRequests"] += int(after == "pending") - int(before == "pending")
+
+    def student_renamed(self, roll: int, name: str):
+        self.generation += 1
+        for entry in self.at_risk_preview:
+            if entry["roll"] == roll:
+                entry["name"] = name
+
+    async def attendance_changed(self, roll: int, month: str, year: int, name: str,
+                                 before: Optional[float], after: Optional[float]):
+        """Track a student's month moving into, within or out of the at-risk set"""
+        self.generation += 1
+        if self.seeded_at is None:
+            return
+        was_at_risk, now_at_risk = _is_at_risk(before), _is_at_risk(after)
+        self.counts["studentsAtRisk"] += int(now_at_risk) - int(was_at_risk)
+        
+        key = (roll, month, year)
+        entry = next((p for p in self.at_risk_preview if p["key"] == key), None)
+        if entry and now_at_risk:
+            entry["percentage"] = after
+        elif entry:
+            self.at_risk_preview.remove(entry)
+            if self.counts["studentsAtRisk"] > len(self.at_risk_preview):
+                self.at_risk_preview = await _load_at_risk_preview()
+        elif now_at_risk and len(self.at_risk_preview) < DASHBOARD_PREVIEW_SIZE:
+            self.at_risk_preview.append({"key": key, "roll": roll, "name": name, "percentage": after})
+
+dashboard_state = DashboardState()
+
+async def _get_dashboard_data() -> str:
+    """Return the live dashboard data"""
+    return to_json(await dashboard_state.snapshot())
 
 # Analytics and Complex Queries
+@tool
 async def get_erp_analytics(args: Dict[str, Any]) -> List[TextContent]:
     """Get comprehensive ERP analytics and insights"""
     try:
+        counts = await get_erp_counts()
         analytics = {}
         
-        # Student analytics
-        total_students = await students_collection.count_documents({"isActive": True})
-        analytics["students"] = {
-            "total": total_students,
-            "active": total_students,
-            "inactive": await students_collection.count_documents({"isActive": False})
-        }
-        
-        # Faculty analytics
-        total_faculty = await faculty_collection.count_documents({"isActive": True})
-        analytics["faculty"] = {
-            "total": total_faculty,
-            "active": total_faculty,
-            "inactive": await faculty_collection.count_documents({"isActive": False})
-        }
-        
-        # Course analytics
-        total_courses = await courses_collection.count_documents({"isActive": True})
-        analytics["courses"] = {
-            "total": total_courses,
-            "active": total_courses,
-            "inactive": await courses_collection.count_documents({"isActive": False})
-        }
+        for key in ("students", "faculty", "courses"):
+            analytics[key] = {
+                "total": counts[key]["active"],
+                "active": counts[key]["active"],
+                "inactive": counts[key]["inactive"]
+            }
         
-        # Attendance analytics
-        attendance_records = await attendance_collection.count_documents({})
         analytics["attendance"] = {
-            "total_records": attendance_records
+            "total_records": counts["attendance"]["total_records"]
         }
         
-        # Leave request analytics
-        pending_requests = await leave_requests_collection.count_documents({"status": "pending"})
-        approved_requests = await leave_requests_collection.count_documents({"status": "approved"})
-        rejected_requests = await leave_requests_collection.count_documents({"status": "rejected"})
-        
+        leave_counts = counts["leave_requests"]
         analytics["leave_requests"] = {
-            "pending": pending_requests,
-            "approved": approved_requests,
-            "rejected": rejected_requests,
-            "total": pending_requests + approved_requests + rejected_requests
+            **leave_counts,
+            "total": sum(leave_counts.values())
         }
         
-        # Timetable analytics
-        total_timetables = await timetables_collection.count_documents({"isActive": True})
         analytics["timetables"] = {
-            "total": total_timetables
+            "total": counts["timetables"]["active"]
         }
         
-        return [TextContent(type="text", text=json.dumps(analytics, default=str))]
+        return [TextContent(type="text", text=to_json(analytics))]
     except Exception as e:
         return [TextContent(type="text", text=f"Error getting analytics: {str(e)}")]
 
+# Faculty workload: one pass over the timetables for the periods, one over
+# the faculty for their courses, joined here. Neither side is repeated per faculty.
+async def faculty_workload(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Courses in charge and weekly periods (by slot type) for each active faculty.
+
+    A slot counts towards a faculty when it names them, or when it names no
+    faculty and its course is one they are in charge of. Faculty are listed
+    by total periods, capped at limit (default 100); the distribution covers
+    all of them.
+    """
+    limit = parameters.get("limit", 100)
+    periods_pipeline = [
+        {"$match": {"isActive": True}},
+        {"$unwind": "$slots"},
+        {"$match": {"slots.type": {"$ne": "break"}}},
+        {"$group": {
+            "_id": {"faculty": "$slots.faculty", "course": "$slots.course",
+                    "type": {"$ifNull": ["$slots.type", "other"]}},
+            "periods": {"$sum": 1}
+        }},
+        # Slots that name no faculty go to their active course's faculty in charge
+        {"$lookup": {"from": "courses", "localField": "_id.course", "foreignField": "_id", "as": "course"}},
+        {"$set": {"course": {"$filter": {"input": "$course", "cond": "$$this.isActive"}}}},
+        {"$set": {"faculty": {"$ifNull": ["$_id.faculty", {"$arrayElemAt": ["$course.facultyInCharge", 0]}]}}},
+        {"$match": {"faculty": {"$ne": None}}},
+        {"$group": {"_id": {"faculty": "$faculty", "type": "$_id.type"}, "periods": {"$sum": "$periods"}}},
+        {"$group": {"_id": "$_id.faculty", "periods": {"$push": {"k": "$_id.type", "v": "$periods"}}}}
+    ]
+    faculty_pipeline = [
+        {"$match": {"isActive": True}},
+        {"$lookup": {
+            "from": "courses",
+            "localField": "_id",
+            "foreignField": "facultyInCharge",
+            "as": "courses"
+        }},
+        {"$project": {
+            "fullName": 1,
+            "courses": {"$map": {
+                "input": {"$filter": {"input": "$courses", "cond": "$$this.isActive"}},
+                "in": {"code": "$$this.code", "title": "$$this.title"}
+            }}
+        }}
+    ]
+    period_rows, faculty_rows = await asyncio.gather(
+        _aggregate(timetables_collection, periods_pipeline),
+        _aggregate(faculty_collection, faculty_pipeline)
+    )
+    periods_by_faculty = {row["_id"]: {p["k"]: p["v"] for p in row["periods"]} for row in period_rows}
+    
+    workload = []
+    for faculty in faculty_rows:
+        weekly_periods = periods_by_faculty.get(faculty["_id"], {})
+        workload.append({
+            "faculty_id": faculty["_id"],
+            "name": faculty.get("fullName"),
+            "courses_count": len(faculty["courses"]),
+            "courses": faculty["courses"],
+            "weekly_periods": weekly_periods,
+            "total_periods": sum(weekly_periods.values())
+        })
+    if not workload:
+        return {"faculty": [], "distribution": {"faculty_count": 0}}
+    
+    totals = [row["total_periods"] for row in workload]
+    mean_periods = sum(totals) / len(totals)
+    distribution = {
+        "faculty_count": len(workload),
+        "without_periods": totals.count(0),
+        "total_periods": sum(totals),
+        "mean_periods": round(mean_periods, 2),
+        "min_periods": min(totals),
+        "max_periods": max(totals),
+        "stddev_periods": round(math.sqrt(sum((t - mean_periods) ** 2 for t in totals) / len(totals)), 2),
+        "mean_courses": round(sum(row["courses_count"] for row in workload) / len(workload), 2)
+    }
+    workload.sort(key=lambda row: (-row["total_periods"], str(row["faculty_id"])))
+    return {"faculty": workload[:limit], "distribution": distribution}
+
+# Course enrollment: students are enrolled in the courses timetabled for
+# their semester (a course not yet on any timetable falls back to its own
+# semester). Four fixed aggregations, run concurrently, whatever the course count.
+async def course_enrollment_stats() -> List[Dict[str, Any]]:
+    """Enrollment and average attendance of every active course"""
+    courses_pipeline = [
+        {"$match": {"isActive": True}},
+        {"$project": {"code": 1, "title": 1, "semester": 1, "credits": 1, "facultyInCharge": 1}}
+    ]
+    scheduled_pipeline = [
+        {"$match": {"isActive": True}},
+        {"$unwind": "$slots"},
+        {"$match": {"slots.type": {"$ne": "break"}}},
+        {"$group": {"_id": {"code": "$slots.courseCode", "semester": "$semester"}, "periods": {"$sum": 1}}}
+    ]
+    enrolled_pipeline = [
+        {"$match": {"isActive": True, "semester": {"$ne": None}}},
+        {"$group": {"_id": "$semester", "students": {"$sum": 1}}}
+    ]
+    attendance_pipeline = [
+        {"$group": {"_id": "$studentRoll", "present": {"$sum": "$presentDays"}, "total": {"$sum": "$totalDays"}}},
+        {"$match": {"total": {"$gt": 0}}},
+        {"$lookup": {"from": "students", "localField": "_id", "foreignField": "roll", "as": "student"}},
+        {"$unwind": "$student"},
+        {"$match": {"student.isActive": True, "student.semester": {"$ne": None}}},
+        {"$group": {
+            "_id": "$student.semester",
+            "students": {"$sum": 1},
+            "percentage_sum": {"$sum": {"$multiply": [{"$divide": ["$present", "$total"]}, 100]}}
+        }}
+    ]
+    courses, scheduled, enrolled, attendance = await asyncio.gather(
+        _aggregate(courses_collection, courses_pipeline),
+        _aggregate(timetables_collection, scheduled_pipeline),
+        _aggregate(students_collection, enrolled_pipeline),
+        _aggregate(attendance_collection, attendance_pipeline)
+    )
+    
+    semesters_by_code: Dict[str, Dict[int, int]] = {}
+    for group in scheduled:
+        semesters_by_code.setdefault(group["_id"]["code"], {})[group["_id"]["semester"]] = group["periods"]
+    enrolled_by_semester = {group["_id"]: group["students"] for group in enrolled}
+    attendance_by_semester = {group["_id"]: group for group in attendance}
+    
+    result = []
+    for course in courses:
+        periods = semesters_by_code.get(course["code"], {})
+        semesters = sorted(periods) or [course["semester"]]
+        with_attendance = sum(attendance_by_semester.get(s, {}).get("students", 0) for s in semesters)
+        percentage_sum = sum(attendance_by_semester.get(s, {}).get("percentage_sum", 0) for s in semesters)
+        result.append({
+            "course_code": course["code"],
+            "course_title": course["title"],
+            "semester": course["semester"],
+            "credits": course["credits"],
+            "faculty": course.get("facultyInCharge"),
+            "timetabled_semesters": sorted(periods),
+            "weekly_periods": sum(periods.values()),
+            "enrolled_students": sum(enrolled_by_semester.get(s, 0) for s in semesters),
+            "students_with_attendance": with_attendance,
+            "average_attendance_percentage": round(percentage_sum / with_attendance, 2) if with_attendance else None
+        })
+    return result
+
+# Leave request trends, grouped server-side so only one row per group is returned
+LEAVE_STATUSES = ("approved", "rejected", "pending")
+# Upper bound (inclusive) and label of each leave-duration bucket; longer leaves fall in "8+ days"
+LEAVE_DURATION_BUCKETS = [(1, "1 day"), (3, "2-3 days"), (7, "4-7 days")]
+LEAVE_TREND_KEYS = {
+    "month": {"$dateToString": {"format": "%Y-%m", "date": "$startDate"}},
+    "week": {"$dateToString": {"format": "%G-W%V", "date": "$startDate"}},
+    "student": "$studentRoll",
+    "duration": {"$switch": {
+        "branches": [{"case": {"$lte": ["$totalDays", bound]}, "then": label} for bound, label in LEAVE_DURATION_BUCKETS],
+        "default": "8+ days"
+    }},
+}
+
+async def leave_request_trends(parameters: Dict[str, Any]) -> Any:
+    """Per-group status counts of leave requests.
+
+    group_by is month (default), week, student or duration. Student groups are
+    ranked by total and capped at limit (default 20); other groups are in key
+    order. year restricts to requests starting in that year.
+    """
+    group_by = parameters.get("group_by", "month")
+    if group_by not in LEAVE_TREND_KEYS:
+        raise ValueError(f"group_by must be one of {', '.join(LEAVE_TREND_KEYS)}")
+    
+    pipeline = []
+    if "year" in parameters:
+        year = parameters["year"]
+        pipeline.append({"$match": {"startDate": {"$gte": datetime(year, 1, 1), "$lt": datetime(year + 1, 1, 1)}}})
+    pipeline.append({"$group": {
+        "_id": LEAVE_TREND_KEYS[group_by],
+        "total": {"$sum": 1},
+        **{status: {"$sum": {"$cond": [{"$eq": ["$status", status]}, 1, 0]}} for status in LEAVE_STATUSES}
+    }})
+    if group_by == "student":
+        pipeline += [{"$sort": {"total": -1, "_id": 1}}, {"$limit": parameters.get("limit", 20)}]
+    else:
+        pipeline.append({"$sort": {"_id": 1}})
+    
+    groups = await leave_requests_collection.aggregate(
+        pipeline, allowDiskUse=True, maxTimeMS=OPERATION_MAX_TIME_MS
+    ).to_list(length=None)
+    if group_by == "student":
+        return [{"roll": g.pop("_id"), **g} for g in groups]
+    if group_by == "duration":
+        order = [label for _, label in LEAVE_DURATION_BUCKETS] + ["8+ days"]
+        groups.sort(key=lambda g: order.index(g["_id"]))
+    return {g.pop("_id"): g for g in groups}
+
+@tool
 async def complex_query(args: Dict[str, Any]) -> List[TextContent]:
     """Execute complex queries across multiple collections"""
     try:
@@ -1369,13 +3287,14 @@ async def complex_query(args: Dict[str, Any]) -> List[TextContent]:
         
         if query_type == "students_with_low_attendance":
             # Find students with attendance below threshold
-            threshold = parameters.get("threshold", 75)
-            cursor = attendance_collection.find({"attendancePercentage": {"$lt": threshold}})
-            records = await cursor.to_list(length=1000)
+            threshold = parameters.get("threshold", AT_RISK_THRESHOLD)
+            records, page = await _find_page(attendance_collection, {"attendancePercentage": {"$lt": threshold}},
+                                             parameters, sort_key="attendancePercentage")
+            students = await StudentLoader(STUDENT_NAME_PROJECTION).load_many(r["studentRoll"] for r in records)
             
             result = []
             for record in records:
-                student = await students_collection.find_one({"roll": record["studentRoll"]})
+                student = students.get(record["studentRoll"])
                 if student:
                     result.append({
                         "roll": record["studentRoll"],
@@ -1385,114 +3304,26 @@ async def complex_query(args: Dict[str, Any]) -> List[TextContent]:
                         "year": record["year"]
                     })
             
-            return [TextContent(type="text", text=json.dumps(result, default=str))]
+            return _page_response(result, page)
         
         elif query_type == "faculty_workload":
-            # Calculate faculty workload based on courses and timetables
-            faculty_courses = {}
-            cursor = courses_collection.find({"isActive": True})
-            courses = await cursor.to_list(length=1000)
-            
-            for course in courses:
-                if course.get("facultyInCharge"):
-                    faculty_id = str(course["facultyInCharge"])
-                    if faculty_id not in faculty_courses:
-                        faculty_courses[faculty_id] = []
-                    faculty_courses[faculty_id].append(course)
-            
-            result = []
-            for faculty_id, courses_list in faculty_courses.items():
-                faculty = await faculty_collection.find_one({"_id": ObjectId(faculty_id)})
-                if faculty:
-                    result.append({
-                        "faculty_id": faculty_id,
-                        "name": faculty["fullName"],
-                        "courses_count": len(courses_list),
-                        "courses": [{"code": c["code"], "title": c["title"]} for c in courses_list]
-                    })
-            
-            return [TextContent(type="text", text=json.dumps(result, default=str))]
+            workload = await faculty_workload(parameters)
+            return [TextContent(type="text", text=to_json(workload))]
         
         elif query_type == "course_enrollment_stats":
-            # Get course enrollment statistics
-            cursor = courses_collection.find({"isActive": True})
-            courses = await cursor.to_list(length=1000)
-            
-            result = []
-            for course in courses:
-                # Count students enrolled in this course (based on attendance records)
-                student_count = await attendance_collection.distinct("studentRoll")
-                result.append({
-                    "course_code": course["code"],
-                    "course_title": course["title"],
-                    "semester": course["semester"],
-                    "credits": course["credits"],
-                    "faculty": course.get("facultyInCharge")
-                })
-            
-            return [TextContent(type="text", text=json.dumps(result, default=str))]
+            stats = await course_enrollment_stats()
+            return [TextContent(type="text", text=to_json(stats))]
         
         elif query_type == "leave_request_trends":
-            # Analyze leave request trends
-            cursor = leave_requests_collection.find()
-            requests = await cursor.to_list(length=1000)
-            
-            # Group by month
-            monthly_trends = {}
-            for request in requests:
-                year = request['startDate'].year
-                month = request['startDate'].month
-                month_key = f"{year}-{month:02d}"
-                if month_key not in monthly_trends:
-                    monthly_trends[month_key] = {"total": 0, "approved": 0, "rejected": 0, "pending": 0}
-                
-                monthly_trends[month_key]["total"] += 1
-                monthly_trends[month_key][request["status"]] += 1
-            
-            return [TextContent(type="text", text=json.dumps(monthly_trends, default=str))]
+            trends = await leave_request_trends(parameters)
+            return [TextContent(type="text", text=to_json(trends))]
         
         elif query_type == "timetable_conflicts":
-            # Check for timetable conflicts
-            cursor = timetables_collection.find({"isActive": True})
-            timetables = await cursor.to_list(length=1000)
-            
-            conflicts = []
-            for timetable in timetables:
-                # Check for room-period conflicts within the same day
-                room_period_map = {}
-                for slot in timetable["slots"]:
-                    if slot.get("room") and slot.get("period"):
-                        room = slot["room"]
-                        period = slot["period"]
-                        key = f"{room}-{period}"
-                        if key in room_period_map:
-                            conflicts.append({
-                                "day": timetable["dayOfWeek"],
-                                "semester": timetable["semester"],
-                                "room": room,
-                                "period": period,
-                                "conflict": f"Room {room} used in multiple slots at period {period}"
-                            })
-                        room_period_map[key] = slot
-                
-                # Check for faculty conflicts (same faculty teaching at same period)
-                faculty_period_map = {}
-                for slot in timetable["slots"]:
-                    if slot.get("faculty") and slot.get("period"):
-                        faculty = slot["faculty"]
-                        period = slot["period"]
-                        key = f"{faculty}-{period}"
-                        if key in faculty_period_map:
-                            conflicts.append({
-                                "day": timetable["dayOfWeek"],
-                                "semester": timetable["semester"],
-                                "faculty": str(faculty),
-                                "period": period,
-                                "conflict": f"Faculty {faculty} assigned to multiple slots at period {period}"
-                            })
-                        faculty_period_map[key] = slot
-            
-            return [TextContent(type="text", text=json.dumps(conflicts, default=str))]
+            # Rooms or faculty double-booked at the same day and period, across all semesters
+            async with timetable_occupancy.lock:
+                await timetable_occupancy.ensure_current()
+                conflicts = timetable_occupancy.report()
+            return [TextContent(type="text", text=to_json(conflicts))]
         
         else:
             return [TextContent(type="text", text=f"Unknown query type: {query_type}")]
@@ -1501,6 +3332,7 @@ async def complex_query(args: Dict[str, Any]) -> List[TextContent]:
         return [TextContent(type="text", text=f"Error executing complex query: {str(e)}")]
 
 # Advanced Feature Implementations
+@tool
 async def search_faculty(args: Dict[str, Any]) -> List[TextContent]:
     """Search faculty by various criteria"""
     query = {}
@@ -1515,25 +3347,29 @@ async def search_faculty(args: Dict[str, Any]) -> List[TextContent]:
     if "isActive" in args:
         query["isActive"] = args["isActive"]
     
-    cursor = faculty_collection.find(query)
-    results = await cursor.to_list(length=100)
-    return [TextContent(type="text", text=json.dumps(results, default=str))]
+    if "text" in args:
+        results = await _text_search(faculty_collection, args["text"], query, args.get("limit", TEXT_SEARCH_LIMIT))
+        page = {"count": len(results), "truncated": False, "next_cursor": None}
+    else:
+        results, page = await _find_page(faculty_collection, query, args)
+    return _page_response(results, page)
 
+@tool
 async def get_students_at_risk(args: Dict[str, Any]) -> List[TextContent]:
     """Get students with low attendance"""
-    threshold = args.get("threshold", 75)
-    limit = args.get("limit", 20)
+    threshold = args.get("threshold", AT_RISK_THRESHOLD)
     query = {"attendancePercentage": {"$lt": threshold}}
     if "month" in args:
         query["month"] = args["month"]
     if "year" in args:
         query["year"] = args["year"]
     
-    cursor = attendance_collection.find(query).limit(limit)
-    records = await cursor.to_list(length=limit)
+    records, page = await _find_page(attendance_collection, query, args, default_limit=20,
+                                     sort_key="attendancePercentage")
+    students = await StudentLoader(STUDENT_NAME_PROJECTION).load_many(r["studentRoll"] for r in records)
     result = []
     for r in records:
-        student = await students_collection.find_one({"roll": r["studentRoll"]})
+        student = students.get(r["studentRoll"])
         if student:
             result.append({
                 "roll": r["studentRoll"],
@@ -1542,17 +3378,26 @@ async def get_students_at_risk(args: Dict[str, Any]) -> List[TextContent]:
                 "month": r.get("month"),
                 "year": r.get("year"),
             })
-    return [TextContent(type="text", text=json.dumps(result, default=str))]
+    return _page_response(result, page)
 
+@tool
 async def get_pending_actions(args: Dict[str, Any]) -> List[TextContent]:
     """Get items requiring attention"""
     pending_leaves = await leave_requests_collection.find({"status": "pending"}).to_list(length=50)
     low_att = await attendance_collection.find({"attendancePercentage": {"$lt": 75}}).to_list(length=20)
     
+    include_leave_details = args.get("include_leave_details", True)
+    
+    # Resolve every roll needed below in a single batch
+    rolls = [r["studentRoll"] for r in low_att[:10]]
+    if include_leave_details:
+        rolls.extend(lr["studentRoll"] for lr in pending_leaves)
+    students = await StudentLoader(STUDENT_NAME_PROJECTION).load_many(rolls)
+    
     leave_details = []
-    if args.get("include_leave_details", True):
+    if include_leave_details:
         for lr in pending_leaves:
-            student = await students_collection.find_one({"roll": lr["studentRoll"]})
+            student = students.get(lr["studentRoll"])
             leave_details.append({
                 "id": str(lr["_id"]),
                 "student_roll": lr["studentRoll"],
@@ -1564,7 +3409,7 @@ async def get_pending_actions(args: Dict[str, Any]) -> List[TextContent]:
     
     at_risk = []
     for r in low_att[:10]:
-        s = await students_collection.find_one({"roll": r["studentRoll"]})
+        s = students.get(r["studentRoll"])
         if s:
             at_risk.append({"roll": r["studentRoll"], "name": s["fullName"], "percentage": r["attendancePercentage"]})
     
@@ -1574,36 +3419,240 @@ async def get_pending_actions(args: Dict[str, Any]) -> List[TextContent]:
         "students_at_risk_count": len(low_att),
         "students_at_risk_preview": at_risk,
     }
-    return [TextContent(type="text", text=json.dumps(summary, default=str))]
+    return [TextContent(type="text", text=to_json(summary))]
 
-async def bulk_create_students(args: Dict[str, Any]) -> List[TextContent]:
-    """Create multiple students"""
-    students = args["students"]
+# Bulk write engine
+BULK_BATCH_SIZE = 1000
+MAX_BULK_BATCH_SIZE = 10000
+
+async def _bulk_insert(collection, records: List[Dict[str, Any]], build, label,
+                       duplicate_message: str, batch_size: int = BULK_BATCH_SIZE) -> Dict[str, Any]:
+    """Insert records with unordered insert_many batches, reporting errors per input record.
+    
+    build turns an input record into a document and label names it in error
+    messages (e.g. "Roll 1001"). Write errors are mapped back to their input
+    record through the index reported by BulkWriteError.
+    """
+    batch_size = min(max(int(batch_size), 1), MAX_BULK_BATCH_SIZE)
     created = 0
     errors = []
-    for s in students:
+    docs, doc_labels = [], []
+    for record in records:
         try:
-            data = {
-                "roll": s["roll"],
-                "fullName": s["fullName"],
-                "email": s["email"],
-                "phone": s["phone"],
-                "isActive": True,
-                "createdAt": datetime.now(),
-                "updatedAt": datetime.now(),
-            }
-            await students_collection.insert_one(data)
-            created += 1
-        except DuplicateKeyError:
-            errors.append(f"Roll {s['roll']} or email already exists")
+            docs.append(build(record))
+            doc_labels.append(label(record))
         except Exception as e:
-            errors.append(f"Roll {s['roll']}: {str(e)}")
+            errors.append(f"{label(record)}: {str(e)}")
+    
+    for start in range(0, len(docs), batch_size):
+        batch = docs[start:start + batch_size]
+        try:
+            result = await collection.insert_many(batch, ordered=False)
+            created += len(result.inserted_ids)
+        except BulkWriteError as e:
+            created += e.details.get("nInserted", 0)
+            for write_error in e.details.get("writeErrors", []):
+                record_label = doc_labels[start + write_error["index"]]
+                if write_error.get("code") == 11000:
+                    errors.append(f"{record_label} {duplicate_message}")
+                else:
+                    errors.append(f"{record_label}: {write_error.get('errmsg', 'write failed')}")
+    
+    return {"created": created, "total": len(records), "errors": errors}
+
+@tool
+async def bulk_create_students(args: Dict[str, Any]) -> List[TextContent]:
+    """Create multiple students"""
+    now = datetime.now()
+    result = await _bulk_insert(
+        students_collection,
+        args["students"],
+        build=lambda s: {
+            "roll": s["roll"],
+            "fullName": s["fullName"],
+            "email": s["email"],
+            "phone": s["phone"],
+            "semester": s.get("semester"),
+            "isActive": True,
+            "createdAt": now,
+            "updatedAt": now,
+        },
+        label=lambda s: f"Roll {s.get('roll')}",
+        duplicate_message="or email already exists",
+        batch_size=args.get("batch_size", BULK_BATCH_SIZE)
+    )
+    entity_cache.invalidate_keys("students", "roll", [s.get("roll") for s in args["students"]])
+    dashboard_state.active_changed("students", None, True, count=result["created"])
+    return [TextContent(type="text", text=to_json(result))]
+
+@tool
+async def bulk_create_faculty(args: Dict[str, Any]) -> List[TextContent]:
+    """Create multiple faculty members"""
+    now = datetime.now()
+    result = await _bulk_insert(
+        faculty_collection,
+        args["faculty"],
+        build=lambda f: {
+            "employeeId": f["employeeId"],
+            "fullName": f["fullName"],
+            "email": f["email"],
+            "designation": f["designation"],
+            "subjectsHandled": f.get("subjectsHandled", []),
+            "isActive": True,
+            "createdAt": now,
+            "updatedAt": now,
+        },
+        label=lambda f: f"Employee ID {f.get('employeeId')}",
+        duplicate_message="or email already exists",
+        batch_size=args.get("batch_size", BULK_BATCH_SIZE)
+    )
+    entity_cache.invalidate_keys("faculties", "employeeId", [f.get("employeeId") for f in args["faculty"]])
+    dashboard_state.active_changed("faculty", None, True, count=result["created"])
+    return [TextContent(type="text", text=to_json(result))]
+
+@tool
+async def bulk_create_courses(args: Dict[str, Any]) -> List[TextContent]:
+    """Create multiple courses"""
+    courses = args["courses"]
+    
+    # Verify every referenced faculty in one query
+    faculty_ids = {}
+    for c in courses:
+        if c.get("facultyInCharge") and ObjectId.is_valid(c["facultyInCharge"]):
+            faculty_ids[c["facultyInCharge"]] = ObjectId(c["facultyInCharge"])
+    existing = set()
+    if faculty_ids:
+        cursor = faculty_collection.find({"_id": {"$in": list(faculty_ids.values())}}, {"_id": 1})
+        existing = {str(f["_id"]) async for f in cursor}
+    
+    def faculty_in_charge(value: Optional[str]) -> Optional[ObjectId]:
+        if not value:
+            return None
+        if value not in faculty_ids:
+            raise ValueError(f"Invalid faculty ID format: {value}")
+        if value not in existing:
+            raise ValueError(f"Faculty with ID {value} not found")
+        return faculty_ids[value]
+    
+    now = datetime.now()
+    result = await _bulk_insert(
+        courses_collection,
+        courses,
+        build=lambda c: {
+            "code": c["code"],
+            "title": c["title"],
+            "credits": c["credits"],
+            "semester": c["semester"],
+            "description": c.get("description", ""),
+            "facultyInCharge": faculty_in_charge(c.get("facultyInCharge")),
+            "isActive": True,
+            "createdAt": now,
+            "updatedAt": now,
+        },
+        label=lambda c: f"Course {c.get('code')}",
+        duplicate_message="already exists",
+        batch_size=args.get("batch_size", BULK_BATCH_SIZE)
+    )
+    entity_cache.invalidate_keys("courses", "code", [c.get("code") for c in courses])
+    dashboard_state.active_changed("courses", None, True, count=result["created"])
+    return [TextContent(type="text", text=to_json(result))]
+
+# Export streaming helpers
+EXPORT_DIR = os.getenv("ERP_EXPORT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "exports"))
+EXPORT_PAGE_SIZE = 5000
+MAX_EXPORT_PAGE_SIZE = 50000
+EXPORT_BATCH_SIZE = 1000
+
+def _parse_export_id(value: Any) -> Any:
+    """Accept a resume _id as an ObjectId hex string or a raw value"""
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    return value
+
+def _resolve_export_path(name: str) -> str:
+    """Resolve an output file inside EXPORT_DIR, rejecting paths that escape it"""
+    root = os.path.realpath(EXPORT_DIR)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"output_path must be inside the export directory ({root})")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+def _csv_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: str(v) if not isinstance(v, (str, int, float, bool)) else v for k, v in doc.items()}
+
+async def _stream_export(cursor, fmt: str, out, fields: Optional[List[str]] = None,
+                         limit: Optional[int] = None, transform=None) -> Dict[str, Any]:
+    """Write cursor documents to out in fmt, one batch at a time.
+    
+    Only the current batch is held in memory. When limit is set the cursor is
+    expected to yield one extra document, which only signals that more remain.
+    CSV headers are written only when fields is not supplied (i.e. not resuming).
+    """
+    import csv
+    import io
+    
+    chunk = io.StringIO()
+    csv_writer = None
+    rows = written = 0
+    last_id = None
+    has_more = False
+    
+    def flush():
+        data = chunk.getvalue()
+        chunk.seek(0)
+        chunk.truncate(0)
+        out.write(data)
+        return len(data.encode("utf-8"))
     
-    result = {"created": created, "total": len(students), "errors": errors}
-    return [TextContent(type="text", text=json.dumps(result, default=str))]
+    start = asyncio.get_running_loop().time()
+    async for doc in cursor:
+        if limit is not None and rows == limit:
+            has_more = True
+            break
+        if transform:
+            doc = transform(doc)
+        if fmt == "csv":
+            if csv_writer is None:
+                write_header = fields is None
+                fields = fields or list(doc.keys())
+                csv_writer = csv.DictWriter(chunk, fieldnames=fields, extrasaction="ignore")
+                if write_header:
+                    csv_writer.writeheader()
+            csv_writer.writerow(_csv_row(doc))
+        elif fmt == "ndjson":
+            chunk.write(to_json(doc))
+            chunk.write("\n")
+        else:
+            chunk.write("[" if rows == 0 else ", ")
+            chunk.write(to_json(doc))
+        rows += 1
+        last_id = doc["_id"]
+        if rows % EXPORT_BATCH_SIZE == 0:
+            written += flush()
+    if fmt == "json":
+        chunk.write("]" if rows else "[]")
+    written += flush()
+    elapsed = asyncio.get_running_loop().time() - start
+    
+    return {
+        "rows": rows,
+        "bytes_written": written,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed > 0 else None,
+        "last_id": last_id,
+        "fields": fields,
+        "has_more": has_more
+    }
 
+@tool
 async def export_collection(args: Dict[str, Any]) -> List[TextContent]:
-    """Export collection as JSON or CSV"""
+    """Export collection as JSON, NDJSON or CSV, streamed in _id order.
+    
+    With output_path the whole export is written incrementally to a file under
+    EXPORT_DIR (resumable with resume_after). Otherwise one page is returned
+    with a continuation token for the next page.
+    """
     coll_name = args["collection"]
     fmt = args.get("format", "json")
     filters = args.get("filters", {})
@@ -1617,38 +3666,73 @@ async def export_collection(args: Dict[str, Any]) -> List[TextContent]:
         "timetables": timetables_collection,
     }
     coll = coll_map.get(coll_name)
-    if not coll:
+    if coll is None:
         return [TextContent(type="text", text=f"Unknown collection: {coll_name}")]
+    transform = decode_attendance if coll_name == "attendances" else None
     
-    cursor = coll.find(filters)
-    docs = await cursor.to_list(length=5000)
-    
-    if fmt == "json":
-        return [TextContent(type="text", text=json.dumps(docs, indent=2, default=str))]
-    
-    if fmt == "csv" and docs:
-        import csv
+    try:
+        if args.get("continuation_token"):
+            state = _decode_page_token(args["continuation_token"])
+            after, fields = state["after"], state.get("fields")
+        else:
+            after, fields = args.get("resume_after"), None
+        
+        query = filters if after is None else _after_filter(filters, _parse_export_id(after))
+        cursor = coll.find(query).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+        
+        if args.get("output_path"):
+            if fmt == "json":
+                return [TextContent(type="text", text="Use ndjson or csv format when writing to output_path")]
+            path = _resolve_export_path(args["output_path"])
+            resuming = after is not None and os.path.exists(path)
+            if fmt == "csv" and resuming:
+                import csv
+                with open(path, newline="") as existing:
+                    fields = next(csv.reader(existing), None)
+            with open(path, "a" if resuming else "w", newline="") as f:
+                stats = await _stream_export(cursor, fmt, f, fields, transform=transform)
+            stats.pop("has_more")
+            stats.pop("fields")
+            summary = {"collection": coll_name, "format": fmt, "path": path, "resumed": resuming, **stats}
+            return [TextContent(type="text", text=to_json(summary))]
+        
         import io
-        keys = list(docs[0].keys())
+        page_size = min(max(int(args.get("page_size", EXPORT_PAGE_SIZE)), 1), MAX_EXPORT_PAGE_SIZE)
         output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=keys, extrasaction="ignore")
-        writer.writeheader()
-        for d in docs:
-            row = {k: str(v) if not isinstance(v, (str, int, float, bool)) else v for k, v in d.items()}
-            writer.writerow(row)
-        return [TextContent(type="text", text=output.getvalue())]
+        stats = await _stream_export(cursor.limit(page_size + 1), fmt, output, fields, limit=page_size,
+                                     transform=transform)
+    except ValueError as e:
+        return [TextContent(type="text", text=f"Error exporting collection: {str(e)}")]
+    
+    if stats["rows"] == 0 and after is None:
+        return [TextContent(type="text", text="No data to export")]
     
-    return [TextContent(type="text", text="No data to export")]
+    page = {
+        "collection": coll_name,
+        "format": fmt,
+        "rows": stats["rows"],
+        "bytes_written": stats["bytes_written"],
+        "rows_per_sec": stats["rows_per_sec"],
+        "last_id": stats["last_id"],
+        "complete": not stats["has_more"],
+        "continuation_token": _encode_page_token({"after": stats["last_id"], "fields": stats["fields"]}) if stats["has_more"] else None
+    }
+    return [
+        TextContent(type="text", text=output.getvalue()),
+        TextContent(type="text", text=to_json(page))
+    ]
 
+@tool
 async def get_executive_summary(args: Dict[str, Any]) -> List[TextContent]:
     """Generate executive summary report"""
     include_recs = args.get("include_recommendations", True)
     
-    total_students = await students_collection.count_documents({"isActive": True})
-    total_faculty = await faculty_collection.count_documents({"isActive": True})
-    total_courses = await courses_collection.count_documents({"isActive": True})
-    pending_leaves = await leave_requests_collection.count_documents({"status": "pending"})
-    at_risk_count = await attendance_collection.count_documents({"attendancePercentage": {"$lt": 75}})
+    counts = await get_erp_counts()
+    total_students = counts["students"]["active"]
+    total_faculty = counts["faculty"]["active"]
+    total_courses = counts["courses"]["active"]
+    pending_leaves = counts["leave_requests"]["pending"]
+    at_risk_count = counts["attendance"]["at_risk"]
     
     summary = [
         f"# ERP Executive Summary",
@@ -1675,22 +3759,247 @@ async def get_executive_summary(args: Dict[str, Any]) -> List[TextContent]:
     
     return [TextContent(type="text", text="\n".join(summary))]
 
+build_tool_registry()
+startup_phase("tools")
+
+# Resource change notifications: a change stream on the ERP database is mapped
+# to the resource URIs it affects, and subscribed sessions are sent debounced
+# resources/updated notifications. Change streams need a replica set.
+NOTIFY_DEBOUNCE_SECONDS = _float_setting("ERP_NOTIFY_DEBOUNCE_SECONDS", 0.5)
+WATCH_RETRY_SECONDS = 5
+COLLECTION_RESOURCES = {
+    "students": ["erp://students", "erp://dashboard"],
+    "faculties": ["erp://faculty", "erp://dashboard"],
+    "courses": ["erp://courses", "erp://dashboard"],
+    "attendances": ["erp://attendance", "erp://dashboard"],
+    "leaverequests": ["erp://leave-requests", "erp://dashboard"],
+    "timetables": ["erp://timetables"],
+}
+# Collections whose documents feed erp://student/{roll}, and the field holding the roll
+STUDENT_RESOURCE_ROLL_FIELDS = {"students": "roll", "attendances": "studentRoll", "leaverequests": "studentRoll"}
+
+def changed_resources(change: Dict[str, Any]) -> List[str]:
+    """Resource URIs affected by one change stream event"""
+    collection = change.get("ns", {}).get("coll")
+    uris = list(COLLECTION_RESOURCES.get(collection, []))
+    roll_field = STUDENT_RESOURCE_ROLL_FIELDS.get(collection)
+    roll = (change.get("fullDocument") or {}).get(roll_field) if roll_field else None
+    if roll is not None:
+        uris.append(f"erp://student/{roll}")
+    return uris
+
+class ResourceNotifier:
+    """Per-URI subscriptions and debounced resources/updated delivery"""
+
+    def __init__(self, debounce: float = NOTIFY_DEBOUNCE_SECONDS):
+        self.debounce = debounce
+        # Sessions are held weakly, so a client that disconnects without
+        # unsubscribing does not keep its session (or its URIs) alive
+        self.subscriptions: Dict[str, weakref.WeakSet] = {}
+        self.pending: set = set()
+        self.sent = 0
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def subscribe(self, uri: str, session):
+        self.subscriptions.setdefault(uri.partition("?")[0], weakref.WeakSet()).add(session)
+
+    def unsubscribe(self, uri: str, session):
+        sessions = self.subscriptions.get(uri.partition("?")[0])
+        if sessions:
+            sessions.discard(session)
+            if not sessions:
+                del self.subscriptions[uri.partition("?")[0]]
+
+    def sessions(self, uri: str) -> list:
+        """Live sessions subscribed to uri; the URI is dropped once they have all closed"""
+        sessions = self.subscriptions.get(uri)
+        if sessions is None:
+            return []
+        live = list(sessions)
+        if not live:
+            del self.subscriptions[uri]
+        return live
+
+    def changed(self, uris: List[str]):
+        """Queue subscribed URIs; a burst of changes is delivered once per debounce window"""
+        subscribed = [uri for uri in uris if self.sessions(uri)]
+        if not subscribed:
+            return
+        self.pending.update(subscribed)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self):
+        await asyncio.sleep(self.debounce)
+        uris, self.pending = self.pending, set()
+        self._flush_task = None
+        for uri in uris:
+            for session in self.sessions(uri):
+                try:
+                    await session.send_resource_updated(AnyUrl(uri))
+                    self.sent += 1
+                except Exception as e:
+                    logger.info(f"Dropping subscription to {uri} after failed notification: {e}")
+                    self.unsubscribe(uri, session)
+
+    async def watch(self):
+        """Follow the database change stream, resuming after transient errors"""
+        pipeline = [{"$project": {"ns": 1, "fullDocument.roll": 1, "fullDocument.studentRoll": 1}}]
+        resume_token = None
+        while True:
+            try:
+                async with db.watch(pipeline, full_document="updateLookup", resume_after=resume_token) as stream:
+                    logger.info("Watching ERP collections for resource change notifications")
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self.changed(changed_resources(change))
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == 40573:
+                    logger.warning("Change streams need a replica set; resource notifications are disabled")
+                    return
+                logger.warning(f"Change stream failed, retrying in {WATCH_RETRY_SECONDS}s: {e}")
+            except Exception as e:
+                logger.warning(f"Change stream failed, retrying in {WATCH_RETRY_SECONDS}s: {e}")
+            await asyncio.sleep(WATCH_RETRY_SECONDS)
+
+resource_notifier = ResourceNotifier()
+
+@server.subscribe_resource()
+async def handle_subscribe_resource(uri: AnyUrl) -> None:
+    """Subscribe the calling session to resources/updated notifications for uri"""
+    resource_notifier.subscribe(str(uri), server.request_context.session)
+
+@server.unsubscribe_resource()
+async def handle_unsubscribe_resource(uri: AnyUrl) -> None:
+    resource_notifier.unsubscribe(str(uri), server.request_context.session)
+
+startup_phase("notifications")
+
 # Main server execution
+async def prepare_database():
+    """Warm the pool, ensure indexes and seed dashboard state once a client has initialized"""
+    try:
+        await warm_pool()
+    except Exception as e:
+        logger.warning(f"Could not warm the connection pool: {e}")
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Could not ensure indexes: {e}")
+    try:
+        await dashboard_state.seed()
+    except Exception as e:
+        logger.warning(f"Could not seed dashboard state, will retry on first read: {e}")
+
+def start_background_tasks() -> List[asyncio.Task]:
+    """Start database preparation, the change stream watcher and the optional Prometheus export"""
+    tasks = [asyncio.create_task(prepare_database())]
+    if server.subscriptions:
+        tasks.append(asyncio.create_task(resource_notifier.watch()))
+    metrics_file = os.getenv("ERP_METRICS_FILE")
+    if metrics_file:
+        interval = _float_setting("ERP_METRICS_INTERVAL", 15)
+        tasks.append(asyncio.create_task(metrics.export_prometheus(metrics_file, interval)))
+    return tasks
+
 async def main():
-    """Main server execution"""
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="erp-mcp-server",
-                server_version="1.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(resources_changed=True),
-                    experimental_capabilities={}
-                ),
-            ),
-        )
+    """Serve one client over stdio"""
+    # Database work starts only after the initialize handshake has been answered
+    background: List[asyncio.Task] = []
+    async def on_initialized(notification: InitializedNotification):
+        if not background:
+            background.extend(start_background_tasks())
+    server.notification_handlers[InitializedNotification] = on_initialized
+    
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+    finally:
+        for task in background:
+            task.cancel()
+
+# Streamable HTTP transport: many clients share one process, one connection pool
+# and one set of caches. With several workers each process is independent, so
+# sessions run stateless and resource subscriptions are not offered.
+HTTP_STATELESS = os.getenv("ERP_HTTP_STATELESS", "").lower() in ("1", "true", "yes")
+HTTP_JSON_RESPONSE = os.getenv("ERP_HTTP_JSON_RESPONSE", "").lower() in ("1", "true", "yes")
+
+class StreamableHTTPEndpoint:
+    """ASGI endpoint handing /mcp requests to the session manager (an instance, so Starlette passes raw ASGI calls)"""
+
+    def __init__(self, session_manager):
+        self.session_manager = session_manager
+
+    async def __call__(self, scope, receive, send):
+        await self.session_manager.handle_request(scope, receive, send)
+
+def create_http_app():
+    """Starlette app serving MCP at /mcp; used directly or as a uvicorn factory for multiple workers"""
+    from starlette.applications import Starlette
+    from starlette.routing import Route
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    
+    server.subscriptions = not HTTP_STATELESS
+    session_manager = StreamableHTTPSessionManager(server, json_response=HTTP_JSON_RESPONSE, stateless=HTTP_STATELESS)
+    
+    @asynccontextmanager
+    async def lifespan(app):
+        async with session_manager.run():
+            background = start_background_tasks()
+            try:
+                yield
+            finally:
+                for task in background:
+                    task.cancel()
+    
+    return Starlette(routes=[Route("/mcp", endpoint=StreamableHTTPEndpoint(session_manager))], lifespan=lifespan)
+
+def serve_http(host: str, port: int, workers: int):
+    import uvicorn
+    
+    if workers > 1:
+        # Workers re-import this module, so pass stateless mode through the environment
+        os.environ["ERP_HTTP_STATELESS"] = "1"
+        uvicorn.run("server:create_http_app", factory=True, host=host, port=port, workers=workers,
+                    app_dir=os.path.dirname(os.path.abspath(__file__)))
+    else:
+        uvicorn.run(create_http_app(), host=host, port=port)
+
+async def profile_startup() -> Dict[str, Any]:
+    """Answer an initialize handshake over in-memory streams and report where startup time went"""
+    from mcp.shared.memory import create_connected_server_and_client_session
+    
+    start = time.perf_counter()
+    async with create_connected_server_and_client_session(server) as session:
+        startup_phase("initialize", start)
+        db_client_created = client.created
+        start = time.perf_counter()
+        await session.list_tools()
+        startup_phase("list tools", start)
+    return {
+        "importMs": round((_last_startup_phase - _IMPORT_STARTED) * 1000, 2),
+        "initializedAfterMs": round((_last_startup_phase - _IMPORT_STARTED) * 1000 + STARTUP_TIMINGS["initialize"], 2),
+        "phasesMs": STARTUP_TIMINGS,
+        "dbClientCreatedBeforeInitialize": db_client_created
+    }
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="ERP MCP server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio")
+    parser.add_argument("--host", default=os.getenv("ERP_HTTP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=_int_setting("ERP_HTTP_PORT", 8000))
+    parser.add_argument("--workers", type=int, default=_int_setting("ERP_HTTP_WORKERS", 1),
+                        help="HTTP worker processes; more than one runs sessions stateless")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report import and initialize timings as JSON and exit")
+    cli_args = parser.parse_args()
+    if cli_args.profile_startup:
+        print(to_json(asyncio.run(profile_startup()), indent=True))
+    elif cli_args.transport == "http":
+        serve_http(cli_args.host, cli_args.port, cli_args.workers)
+    else:
+        asyncio.run(main())
@@ -24,4 +24,4 @@ fi
 
 # Start the server
 echo "Starting MCP server..."
-python server.py
+python server.py "$@"
@@ -1,10 +1,15 @@
 import asyncio
 import json
+import os
+import sys
+import time
 from server import (
     get_student, create_student, search_students,
     get_faculty, create_faculty,
     get_course, create_course,
-    get_erp_analytics, complex_query
+    get_erp_analytics, complex_query,
+    record_attendance, create_leave_request, update_leave_request,
+    mark_attendance_day, dashboard_state, resource_notifier
 )
 
 async def test_basic_functionality():
@@ -62,5 +67,93 @@ async def test_basic_functionality():
     
     print("\nTest completed!")
 
+async def test_dashboard_state_consistency():
+    """Check the live dashboard counters against a full recount after writes.
+    
+    Run against a local single-node replica set, e.g.
+    MONGODB_URI="mongodb://localhost:27017/?replicaSet=rs0"
+    """
+    print("\nTesting dashboard state consistency...")
+    await dashboard_state.seed()
+    
+    await create_student({
+        "roll": 1002,
+        "fullName": "Jane Roe",
+        "email": "jane.roe@test.com",
+        "phone": "+1234567891"
+    })
+    await record_attendance({
+        "student_roll": 1002,
+        "month": "January 2025",
+        "year": 2025,
+        "attendance_data": [
+            {"date": "2025-01-02", "status": "P"},
+            {"date": "2025-01-03", "status": "A"}
+        ]
+    })
+    result = await create_leave_request({
+        "student_roll": 1002,
+        "start_date": "2025-01-06",
+        "end_date": "2025-01-07",
+        "reason": "Medical"
+    })
+    print(f"Leave request result: {result[0].text}")
+    
+    report = await dashboard_state.verify()
+    print(f"Dashboard consistency: {report}")
+    assert report["consistent"], report["drift"]
+
+class RecordingSession:
+    """Stands in for an MCP session and records resources/updated notifications"""
+    
+    def __init__(self):
+        self.updated = []
+    
+    async def send_resource_updated(self, uri):
+        self.updated.append(str(uri))
+
+async def test_resource_notifications():
+    """Check that writes reach subscribers as debounced resources/updated notifications.
+    
+    Change streams need a replica set; run against a local single-node one, e.g.
+    MONGODB_URI="mongodb://localhost:27017/?replicaSet=rs0"
+    """
+    print("\nTesting resource change notifications...")
+    session = RecordingSession()
+    for uri in ("erp://attendance", "erp://student/1002", "erp://timetables"):
+        resource_notifier.subscribe(uri, session)
+    
+    watcher = asyncio.create_task(resource_notifier.watch())
+    await asyncio.sleep(1)
+    for day in ("2025-01-08", "2025-01-09", "2025-01-10"):
+        await mark_attendance_day({"student_roll": 1002, "date": day, "status": "P"})
+    await asyncio.sleep(resource_notifier.debounce + 1)
+    watcher.cancel()
+    
+    print(f"Notifications: {session.updated}")
+    assert sorted(session.updated) == ["erp://attendance", "erp://student/1002"], session.updated
+
+STARTUP_BUDGET_MS = float(os.getenv("ERP_STARTUP_BUDGET_MS", "2000"))
+
+async def test_startup_time():
+    """Check that a fresh process answers initialize within the startup budget without touching MongoDB"""
+    print("\nTesting startup time...")
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py"), "--profile-startup",
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+    )
+    stdout, _ = await process.communicate()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    report = json.loads(stdout)
+    print(f"Startup: {elapsed_ms:.0f} ms wall, {report}")
+    
+    assert process.returncode == 0
+    assert not report["dbClientCreatedBeforeInitialize"], report
+    assert elapsed_ms < STARTUP_BUDGET_MS, f"startup took {elapsed_ms:.0f} ms, budget {STARTUP_BUDGET_MS:.0f} ms"
+
 if __name__ == "__main__":
+    asyncio.run(test_startup_time())
     asyncio.run(test_basic_functionality())
+    asyncio.run(test_dashboard_state_consistency())
+    asyncio.run(test_resource_notifications())